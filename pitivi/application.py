@@ -30,8 +30,6 @@ from gi.repository import Gtk
 
 from pitivi.configure import RELEASES_URL
 from pitivi.configure import VERSION
-from pitivi.effects import EffectsManager
-from pitivi.mainwindow import MainWindow
 from pitivi.pluginmanager import PluginManager
 from pitivi.project import ProjectManager
 from pitivi.settings import get_dir
@@ -42,10 +40,12 @@ from pitivi.shortcuts import show_shortcuts
 from pitivi.undo.project import ProjectObserver
 from pitivi.undo.undo import UndoableActionLog
 from pitivi.utils import loggable
+from pitivi.utils import mainloop
+from pitivi.utils import tracing
 from pitivi.utils.loggable import Loggable
+from pitivi.utils.mainloop import MainLoopMonitor
 from pitivi.utils.misc import path_from_uri
 from pitivi.utils.misc import quote_uri
-from pitivi.utils.proxy import ProxyManager
 from pitivi.utils.system import get_system
 from pitivi.utils.threads import ThreadMaster
 from pitivi.utils.timeline import Zoomable
@@ -58,6 +58,7 @@ class Pitivi(Gtk.Application, Loggable):
         action_log (UndoableActionLog): The undo/redo log for the current project.
         effects (EffectsManager): The effects which can be applied to a clip.
         gui (MainWindow): The main window of the app.
+        mainloop_monitor (MainLoopMonitor): The monitor of the main loop stalls.
         recent_manager (Gtk.RecentManager): Manages recently used projects.
         project_manager (ProjectManager): The holder of the current project.
         settings (GlobalSettings): The application-wide settings.
@@ -76,8 +77,10 @@ class Pitivi(Gtk.Application, Loggable):
 
         self.settings = None
         self.threads = None
-        self.effects = None
+        self._effects = None
+        self._proxy_manager = None
         self.system = None
+        self.mainloop_monitor = MainLoopMonitor()
         self.project_manager = ProjectManager(self)
 
         self.action_log = None
@@ -97,6 +100,22 @@ class Pitivi(Gtk.Application, Loggable):
         self.shortcuts = ShortcutsManager(self)
 
     def write_action(self, action, **kwargs):
+        journal = self.project_manager.journal
+        if self._scenario_file is None and journal is None:
+            return
+
+        if not isinstance(action, Gst.Structure):
+            structure = Gst.Structure.new_empty(action)
+
+            for key, value in kwargs.items():
+                key = key.replace("_", "-")
+                structure[key] = value
+
+            action = structure
+
+        if journal:
+            journal.record(action)
+
         if self._scenario_file is None:
             return
 
@@ -113,15 +132,6 @@ class Pitivi(Gtk.Application, Loggable):
             self._scenario_file.write(st.to_string() + "\n")
             self._last_action_time = now
 
-        if not isinstance(action, Gst.Structure):
-            structure = Gst.Structure.new_empty(action)
-
-            for key, value in kwargs.items():
-                key = key.replace("_", "-")
-                structure[key] = value
-
-            action = structure
-
         self._scenario_file.write(action.to_string() + "\n")
         self._scenario_file.flush()
 
@@ -135,6 +145,8 @@ class Pitivi(Gtk.Application, Loggable):
         # show a crazy unreadable mess when surrounded by gst debug statements.
         enable_crack_output = "GST_DEBUG" in os.environ
         loggable.init('PITIVI_DEBUG', enable_color, enable_crack_output)
+        tracing.init('PITIVI_TRACE')
+        mainloop.init(self.mainloop_monitor, 'PITIVI_MAINLOOP_MONITOR')
 
         self.info('starting up')
         self._setup()
@@ -143,8 +155,6 @@ class Pitivi(Gtk.Application, Loggable):
     def _setup(self):
         self.settings = GlobalSettings()
         self.threads = ThreadMaster()
-        self.effects = EffectsManager()
-        self.proxy_manager = ProxyManager(self)
         self.system = get_system()
         self.plugin_manager = PluginManager(self)
 
@@ -158,6 +168,22 @@ class Pitivi(Gtk.Application, Loggable):
         self._createActions()
         self._syncDoUndo()
 
+    @property
+    def effects(self):
+        """EffectsManager: The effects manager, created when first used."""
+        if self._effects is None:
+            from pitivi.effects import EffectsManager
+            self._effects = EffectsManager()
+        return self._effects
+
+    @property
+    def proxy_manager(self):
+        """ProxyManager: The manager of the proxies, created when first used."""
+        if self._proxy_manager is None:
+            from pitivi.utils.proxy import ProxyManager
+            self._proxy_manager = ProxyManager(self)
+        return self._proxy_manager
+
     def _createActions(self):
         self.shortcuts.register_group("app", _("General"), position=10)
         self.undo_action = Gio.SimpleAction.new("undo", None)
@@ -200,16 +226,24 @@ class Pitivi(Gtk.Application, Loggable):
                 self.gui.present()
             # No need to show the welcome wizard.
             return
-        self.create_main_window()
+        self.create_main_window(lazy_editor=True)
         self.gui.show_perspective(self.gui.greeter)
         self.gui.show()
 
-    def create_main_window(self):
-        if self.gui:
-            return
-        self.gui = MainWindow(self)
-        self.gui.setup_ui()
-        self.add_window(self.gui)
+    def create_main_window(self, lazy_editor=False):
+        """Creates the main window, if it does not exist yet.
+
+        Args:
+            lazy_editor (Optional[bool]): Whether the editor perspective
+                should be created only after the main window is displayed.
+        """
+        if not self.gui:
+            from pitivi.mainwindow import MainWindow
+            self.gui = MainWindow(self)
+            self.gui.setup_ui(lazy_editor=lazy_editor)
+            self.add_window(self.gui)
+        if not lazy_editor:
+            self.gui.ensure_editor()
 
     def do_open(self, giofiles, unused_count, unused_hint):
         assert giofiles
@@ -237,6 +271,7 @@ class Pitivi(Gtk.Application, Loggable):
         if self.gui:
             self.gui.destroy()
         self.threads.stopAllThreads()
+        self.mainloop_monitor.stop()
         self.settings.storeSettings()
         self.quit()
         return True
@@ -282,7 +317,10 @@ class Pitivi(Gtk.Application, Loggable):
                     raise e
                 pass
             self.recent_manager.add_item(uri)
-        self.action_log = UndoableActionLog()
+        self.action_log = UndoableActionLog(
+            max_depth=self.settings.undoMaxDepth,
+            max_bytes=self.settings.undoMaxBytes,
+            coalesce_interval=self.settings.undoCoalesceInterval)
         self.action_log.connect("pre-push", self._action_log_pre_push_cb)
         self.action_log.connect("commit", self._actionLogCommit)
         self.action_log.connect("move", self._action_log_move_cb)
@@ -23,6 +23,7 @@ and not impact startup.
 
 Package maintainers should look at the bottom section of this file.
 """
+import importlib.util
 import os
 import sys
 from gettext import gettext as _
@@ -142,6 +143,11 @@ class GIDependency(Dependency):
 class ClassicDependency(Dependency):
 
     def _try_importing_component(self):
+        if self.version_required_string is None:
+            # Only the presence matters, avoid paying for the import
+            # at startup, the module is imported when it's first used.
+            return importlib.util.find_spec(self.modulename)
+
         try:
             __import__(self.modulename)
             module = sys.modules[self.modulename]
@@ -448,7 +454,6 @@ HARD_DEPENDENCIES = [GICheck("3.20.0"),
                      GIDependency("Gio", "2.0"),
                      GstPluginDependency("gtk"),
                      GstPluginDependency("gdkpixbuf"),
-                     ClassicDependency("matplotlib"),
                      GIDependency("Peas", "1.0"),
                      ]
 
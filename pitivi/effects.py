@@ -28,6 +28,8 @@
      that are too cumbersome to use as such
   _ Complex Audio/Video Effects
 """
+import hashlib
+import json
 import os
 import re
 from gettext import gettext as _
@@ -43,12 +45,16 @@ from gi.repository import Pango
 
 from pitivi.configure import get_pixmap_dir
 from pitivi.configure import get_ui_dir
+from pitivi.configure import VERSION
 from pitivi.settings import GlobalSettings
+from pitivi.settings import xdg_cache_home
 from pitivi.utils.loggable import Loggable
+from pitivi.utils.threads import Thread
 from pitivi.utils.ui import EFFECT_TARGET_ENTRY
 from pitivi.utils.ui import SPACING
 from pitivi.utils.widgets import FractionWidget
 from pitivi.utils.widgets import GstElementSettingsWidget
+from pitivi.utils.widgets import PROPS_TO_IGNORE
 
 (VIDEO_EFFECT, AUDIO_EFFECT) = list(range(1, 3))
 
@@ -144,6 +150,12 @@ HIDDEN_EFFECTS = [
     # Overlaying an image onto a video stream can already be done.
     "gdkpixbufoverlay"]
 
+# The version of the format of the cached effects catalogue.
+EFFECTS_CATALOGUE_VERSION = 1
+
+# How long to wait for the GL effects check pipeline, in seconds.
+GL_CHECK_TIMEOUT = 5
+
 GlobalSettings.addConfigSection('effect-library')
 
 (COL_NAME_TEXT,
@@ -220,96 +232,253 @@ class EffectInfo(object):
             return False
 
 
+def get_registry_fingerprint():
+    """Computes a fingerprint of the installed GStreamer plugins.
+
+    The fingerprint changes when plugins are installed, updated or removed,
+    and when the language or the version of Pitivi changes, since they
+    affect the effects catalogue.
+
+    Returns:
+        str: The fingerprint.
+    """
+    digest = hashlib.sha1()
+    digest.update(("%d %s %s %s\n" % (EFFECTS_CATALOGUE_VERSION,
+                                      VERSION,
+                                      Gst.version_string(),
+                                      " ".join(GLib.get_language_names()))).encode())
+    plugins = Gst.Registry.get().get_plugin_list()
+    for plugin in sorted(plugins, key=lambda plugin: plugin.get_name()):
+        filename = plugin.get_filename()
+        try:
+            mtime = os.stat(filename).st_mtime if filename else 0
+        except OSError:
+            mtime = 0
+        digest.update(("%s %s %s %s\n" % (plugin.get_name(),
+                                          plugin.get_version(),
+                                          filename,
+                                          mtime)).encode())
+    return digest.hexdigest()
+
+
+def check_gl_effects():
+    """Checks whether the GL effects can be used.
+
+    A pipeline with "gleffects" is set to PAUSED, blocking until it
+    succeeds or fails.
+
+    Returns:
+        bool: False if the GL effects cannot be used.
+    """
+    try:
+        pipeline = Gst.parse_launch("videotestsrc ! glupload ! gleffects ! fakesink")
+    except GLib.Error:
+        return False
+
+    try:
+        if pipeline.set_state(Gst.State.PAUSED) == Gst.StateChangeReturn.FAILURE:
+            return False
+        message = pipeline.get_bus().timed_pop_filtered(
+            GL_CHECK_TIMEOUT * Gst.SECOND,
+            Gst.MessageType.ASYNC_DONE | Gst.MessageType.ERROR)
+        # Only an error hides the GL effects.
+        return not message or message.type != Gst.MessageType.ERROR
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+
+
+def build_effects_catalogue():
+    """Scans the GStreamer registry for effects.
+
+    Returns:
+        dict: The catalogue, which can be serialized as JSON.
+    """
+    useless_words = ["Video", "Audio", "audio", "effect",
+                     _("Video"), _("Audio"), _("Audio").lower(), _("effect")]
+    uselessRe = re.compile(" |".join(useless_words))
+
+    registry = Gst.Registry.get()
+    factories = registry.get_feature_list(Gst.ElementFactory)
+    longnames = set()
+    duplicate_longnames = set()
+    for factory in factories:
+        longname = factory.get_longname()
+        if longname in longnames:
+            duplicate_longnames.add(longname)
+        else:
+            longnames.add(longname)
+
+    effects = []
+    hidden_effects = []
+    for factory in factories:
+        klass = factory.get_klass()
+        name = factory.get_name()
+        if ("Effect" not in klass or
+                any(black in name for black in BLACKLISTED_PLUGINS)):
+            continue
+
+        media_type = None
+        if "Audio" in klass:
+            media_type = AUDIO_EFFECT
+        elif "Video" in klass:
+            media_type = VIDEO_EFFECT
+        if not media_type:
+            hidden_effects.append(name)
+            continue
+
+        longname = factory.get_longname()
+        if longname in duplicate_longnames:
+            # Workaround https://bugzilla.gnome.org/show_bug.cgi?id=760566
+            # Add name which identifies the element and is unique.
+            longname = "%s %s" % (longname, name)
+        human_name = uselessRe.sub("", longname).title()
+        effects.append((name, media_type, human_name, factory.get_description()))
+
+    gl_element_factories = registry.get_feature_list_by_plugin("opengl")
+    gl_effects = [element_factory.get_name()
+                  for element_factory in gl_element_factories]
+    return {"effects": effects,
+            "hidden_effects": hidden_effects,
+            "gl_effects": gl_effects,
+            "gl_usable": bool(gl_effects) and check_gl_effects()}
+
+
+class EffectsCatalogueBuilder(Thread):
+    """Thread building the effects catalogue and saving it in the cache.
+
+    Attributes:
+        fingerprint (str): The fingerprint of the GStreamer registry.
+        path (str): The path of the cache file.
+        catalogue (dict): The catalogue, once built.
+    """
+
+    def __init__(self, fingerprint, path):
+        Thread.__init__(self)
+        self.fingerprint = fingerprint
+        self.path = path
+        self.catalogue = None
+
+    def process(self):
+        try:
+            catalogue = build_effects_catalogue()
+        except Exception as e:
+            # Not cached, so it's built again at the next start.
+            self.error("Failed to build the effects catalogue: %s", e)
+            self.catalogue = {"effects": [], "hidden_effects": [],
+                              "gl_effects": [], "gl_usable": False}
+            return
+        catalogue["fingerprint"] = self.fingerprint
+        tmp_path = self.path + ".part"
+        try:
+            with open(tmp_path, "w") as cache:
+                json.dump(catalogue, cache)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.warning("Cannot write the effects catalogue %s: %s", self.path, e)
+        self.catalogue = catalogue
+
+
 class EffectsManager(Loggable):
     """Keeps info about effects and their categories.
 
+    The catalogue of the effects is loaded from the cache. When the
+    installed GStreamer plugins changed, it is rebuilt in the background
+    and the accessors wait for it.
+
     Attributes:
-        video_effects (List[Gst.ElementFactory]): The available video effects.
-        audio_effects (List[Gst.ElementFactory]): The available audio effects.
+        video_effects (List[str]): The names of the available video effects.
+        audio_effects (List[str]): The names of the available audio effects.
     """
 
     def __init__(self):
         Loggable.__init__(self)
-        self.video_effects = []
-        self.audio_effects = []
+        self._video_effects = []
+        self._audio_effects = []
         self.gl_effects = []
         self._effects = {}
+        self._builder = None
 
-        useless_words = ["Video", "Audio", "audio", "effect",
-                         _("Video"), _("Audio"), _("Audio").lower(), _("effect")]
-        uselessRe = re.compile(" |".join(useless_words))
-
-        registry = Gst.Registry.get()
-        factories = registry.get_feature_list(Gst.ElementFactory)
-        longnames = set()
-        duplicate_longnames = set()
-        for factory in factories:
-            longname = factory.get_longname()
-            if longname in longnames:
-                duplicate_longnames.add(longname)
-            else:
-                longnames.add(longname)
-        for factory in factories:
-            klass = factory.get_klass()
-            name = factory.get_name()
-            if ("Effect" not in klass or
-                    any(black in name for black in BLACKLISTED_PLUGINS)):
-                continue
+        fingerprint = get_registry_fingerprint()
+        catalogue = self._load_catalogue(fingerprint)
+        if catalogue:
+            self._set_catalogue(catalogue)
+            return
 
-            media_type = None
-            if "Audio" in klass:
-                self.audio_effects.append(factory)
-                media_type = AUDIO_EFFECT
-            elif "Video" in klass:
-                self.video_effects.append(factory)
-                media_type = VIDEO_EFFECT
-            if not media_type:
-                HIDDEN_EFFECTS.append(name)
-                continue
+        self.info("Building the effects catalogue in the background")
+        self._builder = EffectsCatalogueBuilder(fingerprint, self._get_cache_path())
+        self._builder.connect("done", self._builder_done_cb)
+        self._builder.start()
+
+    @property
+    def video_effects(self):
+        self.ensure_catalogue()
+        return self._video_effects
 
-            longname = factory.get_longname()
-            if longname in duplicate_longnames:
-                # Workaround https://bugzilla.gnome.org/show_bug.cgi?id=760566
-                # Add name which identifies the element and is unique.
-                longname = "%s %s" % (longname, name)
-            human_name = uselessRe.sub("", longname).title()
+    @property
+    def audio_effects(self):
+        self.ensure_catalogue()
+        return self._audio_effects
+
+    @staticmethod
+    def _get_cache_path():
+        return os.path.join(xdg_cache_home(), "effects.json")
+
+    def _load_catalogue(self, fingerprint):
+        """Loads the cached catalogue, if it matches the fingerprint."""
+        path = self._get_cache_path()
+        try:
+            with open(path) as cache:
+                catalogue = json.load(cache)
+        except (OSError, ValueError) as e:
+            self.debug("Cannot load the effects catalogue %s: %s", path, e)
+            return None
+
+        if not isinstance(catalogue, dict) or catalogue.get("fingerprint") != fingerprint:
+            self.debug("The effects catalogue is outdated")
+            return None
+        return catalogue
+
+    def _set_catalogue(self, catalogue):
+        for name, media_type, human_name, description in catalogue["effects"]:
             effect = EffectInfo(name,
                                 media_type,
                                 categories=self._getEffectCategories(name),
                                 human_name=human_name,
-                                description=factory.get_description())
+                                description=description)
             self._effects[name] = effect
+            if media_type == AUDIO_EFFECT:
+                self._audio_effects.append(name)
+            else:
+                self._video_effects.append(name)
+        HIDDEN_EFFECTS.extend(catalogue["hidden_effects"])
 
-        gl_element_factories = registry.get_feature_list_by_plugin("opengl")
-        self.gl_effects = [element_factory.get_name()
-                           for element_factory in gl_element_factories]
-        if self.gl_effects:
-            # Checking whether the GL effects can be used
-            # by setting a pipeline with "gleffects" to PAUSED.
-            pipeline = Gst.parse_launch("videotestsrc ! glupload ! gleffects ! fakesink")
-            bus = pipeline.get_bus()
-            bus.add_signal_watch()
-            bus.connect("message", self._gl_pipeline_message_cb, pipeline)
-            res = pipeline.set_state(Gst.State.PAUSED)
-            assert res == Gst.StateChangeReturn.ASYNC
-
-    def _gl_pipeline_message_cb(self, bus, message, pipeline):
-        """Handles a `message` event on the pipeline for checking gl effects."""
-        done = False
-        if message.type == Gst.MessageType.ASYNC_DONE:
-            self.debug("GL effects check pipeline successfully PAUSED")
-            done = True
-        elif message.type == Gst.MessageType.ERROR:
-            # The pipeline cannot be set to PAUSED.
-            error, detail = message.parse_error()
-            self.debug("Hiding the GL effects because: %s, %s", error, detail)
+        self.gl_effects = catalogue["gl_effects"]
+        if not catalogue["gl_usable"]:
+            self.debug("Hiding the GL effects because they cannot be used")
             HIDDEN_EFFECTS.extend(self.gl_effects)
-            done = True
 
-        if done:
-            bus.remove_signal_watch()
-            bus.disconnect_by_func(self._gl_pipeline_message_cb)
-            pipeline.set_state(Gst.State.NULL)
+    def ensure_catalogue(self):
+        """Waits for the catalogue being built, if any.
+
+        Needed before using `HIDDEN_EFFECTS`, which is completed with the
+        effects found when building the catalogue.
+        """
+        builder = self._builder
+        if not builder:
+            return
+
+        builder.join()
+        self._builder = None
+        self._set_catalogue(builder.catalogue)
+
+    def _builder_done_cb(self, builder):
+        # Called in the builder thread.
+        GLib.idle_add(self.__catalogue_built_cb, builder)
+
+    def __catalogue_built_cb(self, builder):
+        if builder is self._builder:
+            self.ensure_catalogue()
+        return False
 
     def getInfo(self, bin_description):
         """Gets the info for an effect which can be applied.
@@ -320,6 +489,7 @@ class EffectsManager(Loggable):
         Returns:
             EffectInfo: The info corresponding to the name, or None.
         """
+        self.ensure_catalogue()
         name = EffectInfo.name_from_bin_description(bin_description)
         return self._effects.get(name)
 
@@ -481,9 +651,8 @@ class EffectListWidget(Gtk.Box, Loggable):
         self._addFactories(self.app.effects.audio_effects, AUDIO_EFFECT)
         return False
 
-    def _addFactories(self, elements, effectType):
-        for element in elements:
-            name = element.get_name()
+    def _addFactories(self, names, effectType):
+        for name in names:
             if name in HIDDEN_EFFECTS:
                 continue
             effect_info = self.app.effects.getInfo(name)
@@ -606,9 +775,6 @@ class EffectListWidget(Gtk.Box, Loggable):
             text in model.get_value(iter, COL_NAME_TEXT).lower()
 
 
-PROPS_TO_IGNORE = ['name', 'qos', 'silent', 'message', 'parent']
-
-
 class EffectsPropertiesManager(GObject.Object, Loggable):
     """Provides and caches UIs for editing effects.
 
@@ -22,12 +22,11 @@ from gettext import gettext as _
 from urllib.parse import unquote
 
 from gi.repository import Gio
+from gi.repository import GLib
+from gi.repository import GObject
 from gi.repository import Gtk
 
 from pitivi.configure import get_pixmap_dir
-from pitivi.dialogs.about import AboutDialog
-from pitivi.dialogs.prefs import PreferencesDialog
-from pitivi.editorperspective import EditorPerspective
 from pitivi.greeterperspective import GreeterPerspective
 from pitivi.settings import GlobalSettings
 from pitivi.utils.loggable import Loggable
@@ -73,8 +72,18 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
 
     Attributes:
         app (Pitivi): The app.
+        greeter (GreeterPerspective): The perspective for opening projects.
+        editor (EditorPerspective): The perspective for editing projects,
+            None until `ensure_editor` is called.
+
+    Signals:
+        editor-created: The editor perspective has been created.
     """
 
+    __gsignals__ = {
+        "editor-created": (GObject.SignalFlags.RUN_LAST, None, ()),
+    }
+
     def __init__(self, app):
         gtksettings = Gtk.Settings.get_default()
         gtksettings.set_property("gtk-application-prefer-dark-theme", True)
@@ -95,7 +104,8 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
 
         self.app = app
         self.greeter = GreeterPerspective(app)
-        self.editor = EditorPerspective(app)
+        self.editor = None
+        self.__ensure_editor_id = 0
         self.__perspective = None
         self.help_action = None
         self.about_action = None
@@ -107,8 +117,14 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
                                     self.__new_project_failed_cb)
         app.project_manager.connect("project-closed", self.__project_closed_cb)
 
-    def setup_ui(self):
-        """Sets up the various perspectives's UI."""
+    def setup_ui(self, lazy_editor=False):
+        """Sets up the various perspectives's UI.
+
+        Args:
+            lazy_editor (Optional[bool]): Whether to create the editor
+                perspective only when the main loop is idle, so the greeter
+                can be displayed without importing the entire editor.
+        """
         self.log("Setting up the perspectives.")
 
         self.set_icon_name("pitivi")
@@ -116,7 +132,10 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
         self.__set_keyboard_shortcuts()
 
         self.greeter.setup_ui()
-        self.editor.setup_ui()
+        if lazy_editor:
+            self.__ensure_editor_id = GLib.idle_add(self.__ensure_editor_idle_cb)
+        else:
+            self.ensure_editor()
 
         width = self.app.settings.mainWindowWidth
         height = self.app.settings.mainWindowHeight
@@ -130,6 +149,29 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
         self.connect("configure-event", self.__configure_cb)
         self.connect("delete-event", self.__delete_cb)
 
+    def ensure_editor(self):
+        """Creates the editor perspective, if not already created.
+
+        Must be called before a project is loaded, because the widgets of the
+        editor need to be notified when the project starts loading.
+        """
+        if self.__ensure_editor_id:
+            GLib.source_remove(self.__ensure_editor_id)
+            self.__ensure_editor_id = 0
+        if self.editor:
+            return
+
+        self.log("Creating the editor perspective")
+        from pitivi.editorperspective import EditorPerspective
+        self.editor = EditorPerspective(self.app)
+        self.editor.setup_ui()
+        self.emit("editor-created")
+
+    def __ensure_editor_idle_cb(self):
+        self.__ensure_editor_id = 0
+        self.ensure_editor()
+        return False
+
     def __check_screen_constraints(self):
         """Measures the approximate minimum size required by the main window.
 
@@ -180,6 +222,7 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
         show_user_manual()
 
     def __about_cb(self, unused_action, unused_param):
+        from pitivi.dialogs.about import AboutDialog
         about_dialog = AboutDialog(self.app)
         about_dialog.show()
 
@@ -188,6 +231,9 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
         self.__perspective.menu_button.set_active(active)
 
     def __preferences_cb(self, unused_action, unused_param):
+        # The editor modules add their own preferences when imported.
+        self.ensure_editor()
+        from pitivi.dialogs.prefs import PreferencesDialog
         PreferencesDialog(self.app).run()
 
     def __configure_cb(self, unused_widget, unused_event):
@@ -203,9 +249,10 @@ class MainWindow(Gtk.ApplicationWindow, Loggable):
         self.app.settings.mainWindowHeight = size.height
 
     def __delete_cb(self, unused_widget, unused_data=None):
-        self.app.settings.mainWindowHPanePosition = self.editor.secondhpaned.get_position()
-        self.app.settings.mainWindowMainHPanePosition = self.editor.mainhpaned.get_position()
-        self.app.settings.mainWindowVPanePosition = self.editor.toplevel_widget.get_position()
+        if self.editor:
+            self.app.settings.mainWindowHPanePosition = self.editor.secondhpaned.get_position()
+            self.app.settings.mainWindowMainHPanePosition = self.editor.mainhpaned.get_position()
+            self.app.settings.mainWindowVPanePosition = self.editor.toplevel_widget.get_position()
 
         if not self.app.shutdown():
             return True
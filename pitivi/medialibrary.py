@@ -182,10 +182,6 @@ class AssetThumbnail(Loggable):
 
     icons_by_name = {}
 
-    for status in [PROXIED, IN_PROGRESS, ASSET_PROXYING_ERROR, UNSUPPORTED]:
-        EMBLEMS[status] = GdkPixbuf.Pixbuf.new_from_file_at_size(
-            os.path.join(get_pixmap_dir(), "%s.svg" % status), 64, 64)
-
     def __init__(self, asset, proxy_manager):
         Loggable.__init__(self)
         self.__asset = asset
@@ -304,6 +300,13 @@ class AssetThumbnail(Loggable):
             cls.icons_by_name[icon_name] = (small_icon, large_icon)
         return cls.icons_by_name[icon_name]
 
+    @classmethod
+    def __get_emblem(cls, state):
+        if state not in cls.EMBLEMS:
+            cls.EMBLEMS[state] = GdkPixbuf.Pixbuf.new_from_file_at_size(
+                os.path.join(get_pixmap_dir(), "%s.svg" % state), 64, 64)
+        return cls.EMBLEMS[state]
+
     @classmethod
     def __get_icon(cls, icon_name, size):
         icon_theme = Gtk.IconTheme.get_default()
@@ -340,7 +343,7 @@ class AssetThumbnail(Loggable):
         self.large_thumb = self.src_large.copy()
 
         for thumb in [self.small_thumb, self.large_thumb]:
-            emblem = self.EMBLEMS[self.state]
+            emblem = self.__get_emblem(self.state)
             if thumb.get_height() < emblem.get_height() or \
                     thumb.get_width() < emblem.get_width():
                 width = min(emblem.get_width(), thumb.get_width())
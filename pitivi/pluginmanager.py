@@ -166,11 +166,23 @@ class PluginManager(Loggable):
     def __extension_added_cb(unused_set, unused_plugin_info, extension):
         extension.activate()
 
-    def __window_added_cb(self, unused_app, unused_window):
+    def __window_added_cb(self, unused_app, window):
         """Handles the addition of a window to the application."""
+        self.app.disconnect_by_func(self.__window_added_cb)
+        if getattr(window, "editor", True) is None:
+            # The plugins can use the editor perspective, which is
+            # created later when the greeter is displayed first.
+            window.connect("editor-created", self.__editor_created_cb)
+            return
+        self.__setup_plugins()
+
+    def __editor_created_cb(self, window):
+        window.disconnect_by_func(self.__editor_created_cb)
+        self.__setup_plugins()
+
+    def __setup_plugins(self):
         self._load_plugins()
         self.engine.connect("notify::loaded-plugins", self.__loaded_plugins_cb)
-        self.app.disconnect_by_func(self.__window_added_cb)
 
     def __loaded_plugins_cb(self, engine, unused_pspec):
         """Handles the changing of the loaded plugin list."""
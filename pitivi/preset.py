@@ -18,9 +18,11 @@
 # Boston, MA 02110-1301, USA.
 import json
 import os.path
+import weakref
 from gettext import gettext as _
 
 from gi.repository import Gio
+from gi.repository import GLib
 from gi.repository import GObject
 from gi.repository import Gst
 from gi.repository import GstPbutils
@@ -28,23 +30,183 @@ from gi.repository import Gtk
 
 from pitivi.configure import get_audiopresets_dir
 from pitivi.configure import get_videopresets_dir
+from pitivi.settings import xdg_cache_home
 from pitivi.settings import xdg_config_home
 from pitivi.settings import xdg_data_home
 from pitivi.utils.loggable import Loggable
+from pitivi.utils.threads import Thread
 from pitivi.utils.ui import alter_style_class
 
+# Bump when changing the format of the presets index.
+PRESETS_INDEX_VERSION = 1
+
+# How long to wait for the changes in a presets dir to settle, in milliseconds.
+PRESETS_REFRESH_DELAY = 500
+
 
 class DeserializeException(Exception):
     pass
 
 
+def get_dirs_mtimes(dirs, subdirs=False):
+    """Gets the modification times of the specified dirs.
+
+    Args:
+        dirs (List[str]): The paths of the dirs.
+        subdirs (Optional[bool]): Whether to include the direct subdirs.
+
+    Returns:
+        dict: The modification times in nanoseconds, or None for the
+        missing dirs, by path.
+    """
+    mtimes = {}
+    for path in dirs:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+            continue
+        if not subdirs:
+            continue
+        try:
+            children = sorted(os.scandir(path), key=lambda entry: entry.name)
+        except OSError:
+            continue
+        for child in children:
+            try:
+                if child.is_dir():
+                    mtimes[child.path] = child.stat().st_mtime_ns
+            except OSError:
+                continue
+    return mtimes
+
+
+class PresetsIndex(Loggable):
+    """Index of the presets files, stored in a single cache file.
+
+    Each section holds the entries read by a presets manager and the
+    modification times of the dirs they have been read from. A section is
+    used only as long as these dirs have not been modified since.
+
+    Attributes:
+        path (str): The path of the cache file.
+    """
+
+    _default = None
+
+    def __init__(self, path):
+        Loggable.__init__(self)
+        self.path = path
+        self._sections = None
+
+    @classmethod
+    def get_default(cls):
+        """Gets the index stored in the cache dir."""
+        if cls._default is None:
+            cls._default = cls(os.path.join(xdg_cache_home(), "presets.json"))
+        return cls._default
+
+    def _ensure_loaded(self):
+        if self._sections is not None:
+            return
+
+        self._sections = {}
+        try:
+            with open(self.path) as index:
+                data = json.load(index)
+        except (OSError, ValueError) as e:
+            self.debug("Cannot load the presets index %s: %s", self.path, e)
+            return
+
+        if not isinstance(data, dict) or data.get("version") != PRESETS_INDEX_VERSION:
+            self.debug("Ignoring the outdated presets index %s", self.path)
+            return
+        self._sections = data["sections"]
+
+    def get(self, section, mtimes):
+        """Gets the entries of a section, if they are up to date.
+
+        Args:
+            section (str): The name of the section.
+            mtimes (dict): The current modification times of the dirs.
+
+        Returns:
+            List[list]: The entries, or None if they are missing or outdated.
+        """
+        self._ensure_loaded()
+        cached = self._sections.get(section)
+        if not cached or cached["mtimes"] != mtimes:
+            return None
+        return cached["entries"]
+
+    def update(self, section, mtimes, entries):
+        """Stores the entries of a section."""
+        self._ensure_loaded()
+        self._sections[section] = {"mtimes": mtimes, "entries": entries}
+        self._save()
+
+    def invalidate(self, section):
+        """Forgets the entries of a section."""
+        self._ensure_loaded()
+        if self._sections.pop(section, None) is not None:
+            self._save()
+
+    def _save(self):
+        tmp_path = self.path + ".part"
+        try:
+            with open(tmp_path, "w") as index:
+                json.dump({"version": PRESETS_INDEX_VERSION,
+                           "sections": self._sections}, index)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.warning("Cannot write the presets index %s: %s", self.path, e)
+
+
+class PresetsScanner(Thread):
+    """Thread reading the presets files of a presets manager.
+
+    Attributes:
+        scan_func (function): The function reading the presets files.
+        entries (List[list]): The entries read previously, reused for the
+            files which have not been modified since.
+        generation (int): The generation of the presets when started.
+        scan (dict): The result of `scan_func`, once done.
+    """
+
+    def __init__(self, scan_func, entries, generation):
+        Thread.__init__(self)
+        self.scan_func = scan_func
+        self.entries = entries
+        self.generation = generation
+        self.scan = None
+
+    def process(self):
+        self.scan = self.scan_func(self.entries)
+
+
+def _presets_dir_changed_cb(unused_monitor, unused_file, unused_other_file,
+                            unused_event_type, manager_ref):
+    # The monitors only keep a weak reference to the manager, so they
+    # are disposed together with it.
+    manager = manager_ref()
+    if manager:
+        manager.schedule_refresh()
+
+
 class PresetManager(GObject.Object, Loggable):
     """Abstract class for storing a list of presets.
 
     Subclasses must provide a filename attribute.
 
+    The presets are loaded from the presets index when the presets dirs
+    did not change, otherwise the presets files are read and the index
+    updated. The dirs are monitored to reload the changed presets files in
+    the background.
+
     Attributes:
         filename (str): The name of the file where the presets will be stored.
+        index_section (str): The section of the presets index holding the
+            presets, or None to always read the presets files.
         cur_preset (str): The currently selected preset. Note that a preset
             has to be selected before it can be changed.
         ordered (Gtk.ListStore): A list holding (name, preset_dict) tuples.
@@ -57,6 +219,8 @@ class PresetManager(GObject.Object, Loggable):
         "preset-loaded": (GObject.SignalFlags.RUN_LAST, None, ()),
     }
 
+    index_section = None
+
     def __init__(self, default_path=None, user_path=None, system=None):
         GObject.Object.__init__(self)
         Loggable.__init__(self)
@@ -83,6 +247,17 @@ class PresetManager(GObject.Object, Loggable):
         self.ignore_update_requests = False
         self.system = system
 
+        # The modification times of the presets dirs and the entries
+        # read from them, as in the presets index.
+        self._mtimes = {}
+        self._entries = []
+        # Incremented when the presets files are changed by us.
+        self._index_generation = 0
+        self._scanner = None
+        self._refresh_pending = False
+        self._refresh_id = 0
+        self._monitors = {}
+
     def setupUi(self, combo, button):
         self.combo = combo
         self.button = button
@@ -170,37 +345,194 @@ class PresetManager(GObject.Object, Loggable):
         self.action_new.set_enabled(can_create_new)
 
     def loadAll(self):
-        self._loadFromDir(self.default_path, extra={"readonly": True})
-        if os.path.isfile(self.user_path):
+        """Loads the presets, from the presets index when it's up to date.
+
+        When the index is used, the presets files are checked in the
+        background, in case they have been modified in place.
+        """
+        if self.user_path and os.path.isfile(self.user_path):
             # We used to save presets as a single file instead of a directory
             os.rename(self.user_path, "%s.old" % self.user_path)
-        self._loadFromDir(self.user_path)
 
-    def _loadFromDir(self, presets_dir, extra={}):
+        mtimes = self._get_presets_mtimes()
+        entries = None
+        if self.index_section:
+            entries = PresetsIndex.get_default().get(self.index_section, mtimes)
+        if entries is None:
+            scan = self._scan_presets()
+            self._update_index(scan)
+            self._set_entries(scan)
+        else:
+            self.debug("Loading the presets from the index")
+            self._mtimes = mtimes
+            self._entries = entries
+            self._set_entries({"mtimes": mtimes, "entries": entries})
+            self._refresh()
+        self._monitor_dirs()
+
+    def _get_presets_dirs(self):
+        """Gets the dirs containing the presets files, by priority."""
+        return [path for path in (self.default_path, self.user_path) if path]
+
+    def _get_presets_mtimes(self):
+        return get_dirs_mtimes(self._get_presets_dirs())
+
+    def _scan_presets(self, known_entries=None):
+        """Reads the presets files.
+
+        Can be called in a thread, it only accesses the file system.
+
+        Args:
+            known_entries (Optional[List[list]]): The entries read
+                previously, reused for the files which did not change.
+
+        Returns:
+            dict: The modification times of the presets dirs and the
+            entries read from them.
+        """
+        mtimes = self._get_presets_mtimes()
+        known = {entry[0]: entry for entry in known_entries or []}
+        entries = []
+        for presets_dir in self._get_presets_dirs():
+            readonly = presets_dir == self.default_path
+            entries.extend(self._read_presets_dir(presets_dir, readonly, known))
+        return {"mtimes": mtimes, "entries": entries}
+
+    def _read_presets_dir(self, presets_dir, readonly, known):
+        """Reads the presets files in a dir.
+
+        Returns:
+            List[list]: The [filepath, mtime, readonly, parser] entries.
+        """
         try:
             files = os.listdir(presets_dir)
         except FileNotFoundError:
             self.debug("Presets directory missing: %s", presets_dir)
-            return
+            return []
+        entries = []
         for uri in files:
             filepath = os.path.join(presets_dir, uri)
-            if filepath.endswith("json"):
-                with open(filepath) as section:
-                    parser = json.loads(section.read())
-                name = parser["name"]
-                if parser.get("removed"):
-                    self._forgetPreset(name)
-                    continue
-                try:
-                    preset = self._deserializePreset(parser)
-                except DeserializeException as e:
-                    self.debug("Failed to load preset %s: %s", filepath, e)
-                    continue
-                preset["filepath"] = filepath
-                for key, value in extra.items():
-                    preset[key] = value
+            if not filepath.endswith("json"):
+                continue
+            try:
+                mtime = os.stat(filepath).st_mtime_ns
+                entry = known.get(filepath)
+                if not entry or entry[1] != mtime:
+                    with open(filepath) as section:
+                        parser = json.loads(section.read())
+                    entry = [filepath, mtime, readonly, parser]
+            except (OSError, ValueError) as e:
+                self.warning("Failed to read preset %s: %s", filepath, e)
+                continue
+            entries.append(entry)
+        return entries
+
+    def _set_entries(self, scan):
+        """Updates the presets to match the entries read from the files."""
+        presets = {}
+        for filepath, unused_mtime, readonly, parser in scan["entries"]:
+            name = parser["name"]
+            if parser.get("removed"):
+                presets.pop(name, None)
+                continue
+            try:
+                preset = self._deserializePreset(parser)
+            except DeserializeException as e:
+                self.debug("Failed to load preset %s: %s", filepath, e)
+                continue
+            preset["filepath"] = filepath
+            if readonly:
+                preset["readonly"] = True
+            presets[name] = preset
+
+        for name, values in list(self.presets.items()):
+            if name != self.cur_preset and "filepath" in values and name not in presets:
+                self._forgetPreset(name)
+        for name, preset in presets.items():
+            if name == self.cur_preset and name in self.presets:
+                # Leave alone the selected preset, it might be edited.
+                continue
+            if self.presets.get(name) != preset:
                 self._addPreset(name, preset)
 
+    def _update_index(self, scan):
+        self._mtimes = scan["mtimes"]
+        self._entries = scan["entries"]
+        if self.index_section:
+            PresetsIndex.get_default().update(self.index_section,
+                                              self._mtimes, self._entries)
+
+    def _invalidate_index(self):
+        """Marks the presets index as outdated after changing a preset file."""
+        self._index_generation += 1
+        if self.index_section:
+            PresetsIndex.get_default().invalidate(self.index_section)
+
+    def _monitor_dirs(self):
+        """Monitors the existing presets dirs for changes."""
+        paths = [path for path, mtime in self._mtimes.items() if mtime is not None]
+        for path in set(self._monitors) - set(paths):
+            self._monitors.pop(path).cancel()
+
+        manager_ref = weakref.ref(self)
+        for path in paths:
+            if path in self._monitors:
+                continue
+            try:
+                monitor = Gio.File.new_for_path(path).monitor_directory(
+                    Gio.FileMonitorFlags.NONE, None)
+            except GLib.Error as e:
+                self.debug("Cannot monitor presets directory %s: %s", path, e)
+                continue
+            monitor.connect("changed", _presets_dir_changed_cb, manager_ref)
+            self._monitors[path] = monitor
+
+    def schedule_refresh(self):
+        """Reloads the presets files in the background, soon."""
+        if self._refresh_id:
+            GLib.source_remove(self._refresh_id)
+        self._refresh_id = GLib.timeout_add(PRESETS_REFRESH_DELAY,
+                                            self.__refresh_timeout_cb)
+
+    def __refresh_timeout_cb(self):
+        self._refresh_id = 0
+        self._refresh()
+        return False
+
+    def _refresh(self):
+        """Reloads the presets files in the background."""
+        if self._scanner:
+            self._refresh_pending = True
+            return
+
+        self._refresh_pending = False
+        self._scanner = PresetsScanner(self._scan_presets, self._entries,
+                                       self._index_generation)
+        self._scanner.connect("done", self._scanner_done_cb)
+        self._scanner.start()
+
+    def _scanner_done_cb(self, scanner):
+        # Called in the scanner thread.
+        GLib.idle_add(self.__scanned_cb, scanner)
+
+    def __scanned_cb(self, scanner):
+        self._scanner = None
+        if scanner.generation != self._index_generation:
+            # The presets files have been changed meanwhile.
+            self._refresh()
+            return False
+
+        scan = scanner.scan
+        if scan["mtimes"] != self._mtimes or scan["entries"] != self._entries:
+            self.debug("The presets files changed")
+            self._update_index(scan)
+            self._set_entries(scan)
+            self._monitor_dirs()
+
+        if self._refresh_pending:
+            self._refresh()
+        return False
+
     def saveAll(self):
         """Writes changes to disk for all presets."""
         for preset_name, values in self.ordered:
@@ -220,6 +552,7 @@ class PresetManager(GObject.Object, Loggable):
             raw["name"] = preset_name
             serialized = json.dumps(raw, indent=4)
             fout.write(serialized)
+        self._invalidate_index()
 
     def _buildFilePath(self, preset_name):
         file_name = self.system.getUniqueFilename(preset_name + ".json")
@@ -355,6 +688,7 @@ class PresetManager(GObject.Object, Loggable):
                 self._markRemoved(name)
             else:
                 os.remove(filepath)
+                self._invalidate_index()
 
         self.cur_preset = None
         self._forgetPreset(name)
@@ -375,6 +709,7 @@ class PresetManager(GObject.Object, Loggable):
         filepath = self._createUserPresetPath(name)
         with open(filepath, "w") as fout:
             fout.write(data)
+        self._invalidate_index()
 
     def prependPreset(self, name, values):
         self.presets[name] = values
@@ -424,6 +759,8 @@ class PresetManager(GObject.Object, Loggable):
 
 class VideoPresetManager(PresetManager):
 
+    index_section = "video"
+
     def __init__(self, system):
         default_path = get_videopresets_dir()
         user_path = os.path.join(xdg_data_home(), 'video_presets')
@@ -460,6 +797,8 @@ class VideoPresetManager(PresetManager):
 
 class AudioPresetManager(PresetManager):
 
+    index_section = "audio"
+
     def __init__(self, system):
         default_path = get_audiopresets_dir()
         user_path = os.path.join(xdg_data_home(), 'audio_presets')
@@ -491,6 +830,10 @@ class EncodingTargetManager(PresetManager):
 
     Uses the GstEncodingTarget API to discover and access the EncodingProfiles.
 
+    When loaded from the presets index, the EncodingProfiles are loaded
+    only when the presets are selected, so the model holds None for the
+    presets not loaded yet.
+
     Attributes:
         _project (Project): The project.
     """
@@ -499,6 +842,8 @@ class EncodingTargetManager(PresetManager):
         "profile-selected": (GObject.SignalFlags.RUN_LAST, None, (GstPbutils.EncodingProfile,)),
     }
 
+    index_section = "render"
+
     def __init__(self, project):
         PresetManager.__init__(self)
         self._project = project
@@ -509,28 +854,197 @@ class EncodingTargetManager(PresetManager):
                 self._removed_profiles = json.loads(f.read())
         except FileNotFoundError:
             self._removed_profiles = []
+        # The paths of the target files defining the presets, by name.
+        self._preset_files = {}
 
-    def _add_target(self, target):
+    @staticmethod
+    def _get_target_presets(target):
+        """Gets the (preset name, EncodingProfile) pairs of the target."""
         profiles = target.get_profiles()
         for profile in profiles:
             name = target.get_name().split(';')[0]
             if len(profiles) != 1 and profile.get_name().lower() != 'default':
                 name += '_' + profile.get_name()
+            yield name, profile
 
+    def _add_target(self, target):
+        for name, profile in self._get_target_presets(target):
             if name in self._removed_profiles:
                 continue
 
-            self.presets[name] = profile
             self._addPreset(name, profile)
 
-    def loadAll(self):
-        """Loads profiles from GstEncodingTarget and add them to self.combo.
+    @staticmethod
+    def _get_system_presets_dirs():
+        """Gets the system dirs where GstEncodingTarget looks for targets."""
+        return [os.path.join(data_dir, "gstreamer-1.0", "encoding-profiles")
+                for data_dir in reversed(GLib.get_system_data_dirs())]
+
+    def _get_presets_dirs(self):
+        """Gets the dirs where GstEncodingTarget looks for targets.
+
+        Override from PresetManager
+        """
+        dirs = self._get_system_presets_dirs()
+        dirs.append(os.path.join(GLib.get_user_data_dir(), "gstreamer-1.0", "encoding-profiles"))
+        dirs.extend(path
+                    for path in os.environ.get("GST_ENCODING_TARGET_PATH", "").split(os.pathsep)
+                    if path)
+        return dirs
+
+    def _get_presets_mtimes(self):
+        # The targets are in a subdir for each category.
+        return get_dirs_mtimes(self._get_presets_dirs(), subdirs=True)
+
+    def _scan_presets(self, known_entries=None):
+        """Loads the targets files.
 
         Override from PresetManager
+
+        Returns:
+            dict: The modification times of the targets dirs, the
+            [name, filepath, mtime] entries of the presets, and the
+            (filepath, EncodingProfile) pairs of the presets loaded, by name.
+        """
+        mtimes = self._get_presets_mtimes()
+        dirs = self._get_presets_dirs()
+        known = {}
+        for entry in known_entries or []:
+            known.setdefault(entry[1], []).append(entry)
+        entries = []
+        profiles = {}
+        for category_dir, mtime in mtimes.items():
+            if category_dir in dirs or mtime is None:
+                continue
+            if os.path.basename(category_dir) == GstPbutils.ENCODING_CATEGORY_FILE_EXTENSION:
+                continue
+            try:
+                files = sorted(os.listdir(category_dir))
+            except OSError as e:
+                self.debug("Cannot list targets directory %s: %s", category_dir, e)
+                continue
+            for filename in files:
+                if not filename.endswith(".gep"):
+                    continue
+                filepath = os.path.join(category_dir, filename)
+                try:
+                    file_mtime = os.stat(filepath).st_mtime_ns
+                except OSError:
+                    continue
+                file_entries = known.get(filepath)
+                if file_entries and file_entries[0][2] == file_mtime:
+                    entries.extend(file_entries)
+                    continue
+                try:
+                    target = GstPbutils.EncodingTarget.load_from_file(filepath)
+                except GLib.Error as e:
+                    self.debug("Failed to load target %s: %s", filepath, e)
+                    continue
+                if target.get_category() == GstPbutils.ENCODING_CATEGORY_FILE_EXTENSION:
+                    continue
+                for name, profile in self._get_target_presets(target):
+                    entries.append([name, filepath, file_mtime])
+                    profiles[name] = (filepath, profile)
+
+        system_dirs = self._get_system_presets_dirs()
+        if not any(os.path.dirname(os.path.dirname(filepath)) in system_dirs
+                   for unused_name, filepath, unused_mtime in entries):
+            # GStreamer also looks for the targets in its own data dir,
+            # which is not exposed, so we have to load all the targets.
+            self.debug("No system targets found, listing all the targets")
+            self._list_all_targets(entries, profiles)
+        return {"mtimes": mtimes, "entries": entries, "profiles": profiles}
+
+    def _list_all_targets(self, entries, profiles):
+        """Adds the presets of the targets not found in the scanned dirs.
+
+        The added entries have no filepath, so they are loaded every time.
         """
+        names = {entry[0] for entry in entries}
         for target in GstPbutils.encoding_list_all_targets():
-            if target.get_category() != GstPbutils.ENCODING_CATEGORY_FILE_EXTENSION:
-                self._add_target(target)
+            if target.get_category() == GstPbutils.ENCODING_CATEGORY_FILE_EXTENSION:
+                continue
+            for name, profile in self._get_target_presets(target):
+                if name in names:
+                    continue
+                names.add(name)
+                entries.append([name, None, None])
+                profiles[name] = (None, profile)
+
+    def _update_index(self, scan):
+        """Updates the presets index, unless it cannot hold all the presets.
+
+        Override from PresetManager
+        """
+        if all(filepath for unused_name, filepath, unused_mtime in scan["entries"]):
+            PresetManager._update_index(self, scan)
+            return
+
+        # The presets without a filepath cannot be loaded lazily.
+        self._mtimes = scan["mtimes"]
+        self._entries = scan["entries"]
+        PresetsIndex.get_default().invalidate(self.index_section)
+
+    def _set_entries(self, scan):
+        """Updates the presets to match the targets files.
+
+        Override from PresetManager
+        """
+        preset_files = {}
+        for name, filepath, unused_mtime in scan["entries"]:
+            if name not in self._removed_profiles:
+                preset_files[name] = filepath
+
+        for name in list(self.presets):
+            if name != self.cur_preset and name not in preset_files:
+                self._forgetPreset(name)
+
+        profiles = scan.get("profiles", {})
+        for name, filepath in preset_files.items():
+            if name == self.cur_preset and name in self.presets:
+                continue
+            profile = None
+            if name in profiles and profiles[name][0] == filepath:
+                profile = profiles[name][1]
+            elif name in self.presets and self._preset_files.get(name) == filepath:
+                # Unchanged, keep the profile if it has been loaded.
+                continue
+            self._addPreset(name, profile)
+        self._preset_files = preset_files
+
+    def get_profile(self, name):
+        """Gets the EncodingProfile of a preset, loading it if needed.
+
+        Args:
+            name (str): The name of the preset.
+
+        Returns:
+            GstPbutils.EncodingProfile: The profile, or None if it cannot
+            be loaded.
+        """
+        profile = self.presets.get(name)
+        filepath = self._preset_files.get(name)
+        if profile or not filepath:
+            return profile
+
+        self.debug("Loading preset %s from %s", name, filepath)
+        try:
+            target = GstPbutils.EncodingTarget.load_from_file(filepath)
+        except GLib.Error as e:
+            self.warning("Failed to load target %s: %s", filepath, e)
+            return None
+        for preset_name, profile in self._get_target_presets(target):
+            if preset_name != name:
+                continue
+            self.presets[name] = profile
+            for row in self.ordered:
+                if row[0] == name:
+                    row[1] = profile
+                    break
+            return profile
+
+        self.warning("Preset %s not found in %s", name, filepath)
+        return None
 
     def createPreset(self, name, values=None):
         self.saveCurrentPreset(name, validate_name=False)
@@ -566,6 +1080,7 @@ class EncodingTargetManager(PresetManager):
                                                new_name,
                                                [self._project.container_profile])
         target.save()
+        self._invalidate_index()
 
         self._add_target(target)
 
@@ -582,8 +1097,11 @@ class EncodingTargetManager(PresetManager):
         if active_iter:
             # The user selected a preset.
             name = combo.props.model.get_value(active_iter, 0)
-            profile = combo.props.model.get_value(active_iter, 1)
-            self.emit("profile-selected", profile)
+            profile = self.get_profile(name)
+            if profile:
+                self.emit("profile-selected", profile)
+            else:
+                name = None
         self.cur_preset = name
 
     def _save_removed_profiles(self):
@@ -23,6 +23,7 @@ import os
 import pwd
 import shutil
 import tarfile
+import tempfile
 import time
 import uuid
 from gettext import gettext as _
@@ -39,15 +40,16 @@ from gi.repository import GstVideo
 from gi.repository import Gtk
 
 from pitivi.configure import get_ui_dir
-from pitivi.medialibrary import AssetThumbnail
 from pitivi.preset import AudioPresetManager
 from pitivi.preset import VideoPresetManager
-from pitivi.render import Encoders
 from pitivi.settings import get_dir
 from pitivi.settings import xdg_cache_home
-from pitivi.timeline.previewers import ThumbnailCache
+from pitivi.undo.journal import create_recovery_scenario
+from pitivi.undo.journal import read_journal
+from pitivi.undo.journal import UndoJournal
 from pitivi.undo.project import AssetAddedIntention
 from pitivi.undo.project import AssetProxiedIntention
+from pitivi.utils import tracing
 from pitivi.utils.loggable import Loggable
 from pitivi.utils.misc import fixate_caps_with_default_values
 from pitivi.utils.misc import isWritable
@@ -57,6 +59,7 @@ from pitivi.utils.misc import scale_pixbuf
 from pitivi.utils.misc import unicode_error_dialog
 from pitivi.utils.pipeline import Pipeline
 from pitivi.utils.ripple_update_group import RippleUpdateGroup
+from pitivi.utils.threads import Thread
 from pitivi.utils.ui import audio_channels
 from pitivi.utils.ui import audio_rates
 from pitivi.utils.ui import beautify_time_delta
@@ -94,6 +97,63 @@ SCALED_THUMB_HEIGHT = 54
 SCALED_THUMB_DIR = "96x54"
 ORIGINAL_THUMB_DIR = "original"
 
+# The max number of operations in the undo journal before a full backup
+# is saved, to keep the recovery time reasonable.
+JOURNAL_MAX_ENTRIES = 200
+
+
+def commit_file(tmp_path, path):
+    """Replaces atomically a file with a completely written temporary file.
+
+    Args:
+        tmp_path (str): The path of the temporary file, which must be on the
+            same filesystem as `path`.
+        path (str): The path of the file to be replaced.
+    """
+    with open(tmp_path, "rb") as tmp_file:
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, path)
+
+
+class ProjectFileWriter(Thread):
+    """Thread writing a serialized project to its final location.
+
+    The project is serialized by GES on the main thread in a staging file,
+    preferably in memory, and copied by this thread so the main loop does
+    not wait for the disk.
+
+    Attributes:
+        staging_path (str): The path of the serialized project.
+        uri (str): The URI where the project has to be written.
+        serialize_duration (float): The time spent by GES serializing the
+            project on the main thread, in seconds.
+        write_duration (float): The time spent writing the file, in seconds.
+        error (Exception): The error which occurred while writing, if any.
+    """
+
+    def __init__(self, staging_path, uri, serialize_duration):
+        Thread.__init__(self)
+        self.staging_path = staging_path
+        self.uri = uri
+        self.serialize_duration = serialize_duration
+        self.write_duration = 0
+        self.error = None
+
+    def process(self):
+        start = time.monotonic()
+        path = path_from_uri(self.uri)
+        tmp_path = path + ".part"
+        try:
+            shutil.copyfile(self.staging_path, tmp_path)
+            commit_file(tmp_path, path)
+        except OSError as e:
+            self.error = e
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        finally:
+            os.remove(self.staging_path)
+        self.write_duration = time.monotonic() - start
+
 
 class ProjectManager(GObject.Object, Loggable):
     """The project manager.
@@ -105,6 +165,12 @@ class ProjectManager(GObject.Object, Loggable):
         app (Pitivi): The app.
         current_project (Project): The current project displayed by the app.
         disable_save (bool): Whether save-as is enforced when saving.
+        journal (UndoJournal): The journal of the operations done since the
+            current project has been saved last time, if any.
+        save_duration (float): The time the main loop has been blocked by
+            the last save, in seconds.
+        write_duration (float): The time spent writing the file of the last
+            save, in seconds.
     """
 
     __gsignals__ = {
@@ -126,9 +192,15 @@ class ProjectManager(GObject.Object, Loggable):
         self.app = app
         self.current_project = None
         self.disable_save = False
+        self.journal = None
+        self.save_duration = 0
+        self.write_duration = 0
         self._backup_lock = 0
+        self._backup_writer = None
+        self._backup_journal_mark = None
         self.exitcode = 0
         self.__start_loading_time = 0
+        self.__load_span = None
 
     def _tryUsingBackupFile(self, uri):
         backup_path = self._makeBackupURI(path_from_uri(uri))
@@ -242,7 +314,14 @@ class ProjectManager(GObject.Object, Loggable):
         assert self.current_project is None
 
         is_validate_scenario = self._isValidateScenario(uri)
+        recovery_scenario = None
         if not is_validate_scenario:
+            recovery_scenario = self._try_using_journal(uri)
+        if recovery_scenario:
+            is_validate_scenario = True
+            scenario = recovery_scenario
+            uri = None
+        elif not is_validate_scenario:
             uri = self._tryUsingBackupFile(uri)
             scenario = None
         else:
@@ -251,6 +330,7 @@ class ProjectManager(GObject.Object, Loggable):
 
         # Load the project:
         self.__start_loading_time = time.time()
+        self.__load_span = tracing.begin("load-project", uri=uri)
         project = Project(self.app, uri=uri, scenario=scenario)
         self.emit("new-project-loading", project)
 
@@ -258,6 +338,8 @@ class ProjectManager(GObject.Object, Loggable):
         project.connect("loaded", self._projectLoadedCb)
 
         if not project.createTimeline():
+            tracing.end(self.__load_span, failed=True)
+            self.__load_span = None
             self.emit("new-project-failed", uri,
                       _('This might be due to a bug or an unsupported project file format. '
                         'If you were trying to add a media file to your project, '
@@ -274,6 +356,54 @@ class ProjectManager(GObject.Object, Loggable):
 
         return project
 
+    def _try_using_journal(self, uri):
+        """Creates a scenario for recovering the project from its journal.
+
+        Returns:
+            str: The path of the recovery scenario, if the user wants to
+                recover the project from the journal.
+        """
+        if has_validate is not True:
+            # The journal can be replayed only with GstValidate.
+            return None
+
+        journal_path = self._make_journal_path(uri)
+        base_uri, actions = read_journal(journal_path)
+        if not actions:
+            return None
+
+        try:
+            time_diff = os.path.getmtime(journal_path) - \
+                os.path.getmtime(path_from_uri(base_uri))
+        except OSError as e:
+            self.warning("Cannot use the journal %s: %s", journal_path, e)
+            return None
+        if time_diff <= 0:
+            return None
+        if not self._restoreFromBackupDialog(time_diff):
+            self._remove_journal(journal_path)
+            return None
+
+        cache_dir = get_dir(os.path.join(xdg_cache_home(), "scenarios"))
+        scenario_name = "recovery-%s.scenario" % time.strftime("%Y%m%d-%H%M%S")
+        scenario_path = os.path.join(cache_dir, scenario_name)
+        if not create_recovery_scenario(journal_path, scenario_path):
+            return None
+
+        self.info("Recovering from journal %s with %d actions based on %s",
+                  journal_path, len(actions), base_uri)
+        # The recovered project is loaded as a new project, so the journal
+        # would not be reset when it's loaded. The scenario has everything.
+        self._remove_journal(journal_path)
+        return scenario_path
+
+    def _remove_journal(self, journal_path):
+        """Removes a journal so recovering from it is not offered again."""
+        try:
+            os.remove(journal_path)
+        except OSError as e:
+            self.warning("Cannot remove the journal %s: %s", journal_path, e)
+
     def _restoreFromBackupDialog(self, time_diff):
         """Asks if we need to load the autosaved project backup.
 
@@ -377,19 +507,21 @@ class ProjectManager(GObject.Object, Loggable):
                           _("You do not have permissions to write to this folder."))
                 return False
 
+        # Make sure a previous backup does not overwrite this save.
+        self.wait_backup_written()
         try:
-            # "overwrite" is always True: our GTK filechooser save dialogs are
-            # set to always ask the user on our behalf about overwriting, so
-            # if saveProject is actually called, that means overwriting is OK.
-            saved = self.current_project.save(
-                self.current_project.ges_timeline, uri,
-                formatter_type, overwrite=True)
+            with tracing.span("save-project", uri=uri, backup=backup):
+                if backup:
+                    saved = self._save_backup(uri, formatter_type)
+                else:
+                    saved = self._save_atomically(uri, formatter_type)
         except Exception as e:
             saved = False
             self.emit("save-project-failed", uri, e)
 
         if saved:
             if not backup:
+                self._reset_journal(uri)
                 # Do not emit the signal when autosaving a backup file
                 self.current_project.setModificationState(False)
                 self.debug('Saved project: %s', uri)
@@ -400,10 +532,103 @@ class ProjectManager(GObject.Object, Loggable):
                 self.disable_save = False
                 self.emit("project-saved", self.current_project, uri)
             else:
-                self.debug('Saved backup: %s', uri)
+                self.debug('Saving backup: %s', uri)
+
+        return saved
 
+    def _save_atomically(self, uri, formatter_type):
+        """Saves the current project without ever truncating the file at `uri`.
+
+        Returns:
+            bool: Whether the project has been saved successfully.
+        """
+        start = time.monotonic()
+        tmp_uri = uri + ".part"
+        tmp_path = path_from_uri(tmp_uri)
+        try:
+            # "overwrite" is always True: our GTK filechooser save dialogs are
+            # set to always ask the user on our behalf about overwriting, so
+            # if saveProject is actually called, that means overwriting is OK.
+            saved = self.current_project.save(
+                self.current_project.ges_timeline, tmp_uri,
+                formatter_type, overwrite=True)
+            serialized = time.monotonic()
+            if saved:
+                commit_file(tmp_path, path_from_uri(uri))
+        finally:
+            if os.path.exists(tmp_path):
+                # Saving failed, do not leave it next to the project.
+                os.remove(tmp_path)
+        self._report_save_latency(uri, serialized - start,
+                                  time.monotonic() - serialized)
         return saved
 
+    def _save_backup(self, uri, formatter_type):
+        """Serializes the current project and writes it in the background.
+
+        Returns:
+            bool: Whether the project has been serialized successfully.
+        """
+        start = time.monotonic()
+        # The runtime dir is normally in memory, so GES does not wait for
+        # the disk when serializing the project.
+        staging_dir = GLib.get_user_runtime_dir()
+        fd, staging_path = tempfile.mkstemp(suffix=".xges", prefix="pitivi-backup-",
+                                            dir=staging_dir)
+        os.close(fd)
+        try:
+            saved = self.current_project.save(
+                self.current_project.ges_timeline,
+                Gst.filename_to_uri(staging_path), formatter_type, overwrite=True)
+        except Exception:
+            os.remove(staging_path)
+            raise
+        if not saved:
+            os.remove(staging_path)
+            return False
+
+        writer = ProjectFileWriter(staging_path, uri, time.monotonic() - start)
+        writer.connect("done", self.__backup_writer_done_cb)
+        self._backup_writer = writer
+        # The operations done from now on are not in the backup.
+        self._backup_journal_mark = self.journal.mark() if self.journal else None
+        writer.start()
+        return True
+
+    def __backup_writer_done_cb(self, writer):
+        # Called in the writer thread.
+        GLib.idle_add(self.__backup_written, writer)
+
+    def wait_backup_written(self):
+        """Blocks until the backup being written, if any, is on the disk."""
+        writer = self._backup_writer
+        if writer:
+            writer.join()
+            self.__backup_written(writer)
+
+    def __backup_written(self, writer):
+        if writer is not self._backup_writer:
+            # Already handled.
+            return False
+        self._backup_writer = None
+
+        if writer.error:
+            self.emit("save-project-failed", writer.uri, writer.error)
+            return False
+
+        self.debug('Saved backup: %s', writer.uri)
+        self._report_save_latency(writer.uri, writer.serialize_duration,
+                                  writer.write_duration)
+        if self.current_project:
+            self._reset_journal(writer.uri, self._backup_journal_mark)
+        return False
+
+    def _report_save_latency(self, uri, save_duration, write_duration):
+        self.save_duration = save_duration
+        self.write_duration = write_duration
+        self.info("Saved %s: main loop blocked for %.3fs, writing took %.3fs",
+                  uri, save_duration, write_duration)
+
     def exportProject(self, project, uri):
         """Exports a project and all its media files to a *.tar archive."""
         # Save the project to a temporary file.
@@ -487,6 +712,7 @@ class ProjectManager(GObject.Object, Loggable):
                 "Could not close project - this could be because there were unsaved changes and the user cancelled when prompted about them")
             return False
 
+        self.wait_backup_written()
         self.current_project.finalize()
 
         project = self.current_project
@@ -506,6 +732,9 @@ class ProjectManager(GObject.Object, Loggable):
         except Exception:
             self.fixme("Handle better the errors and not get to this point")
         self._cleanBackup(project.uri)
+        if self.journal:
+            self.journal.release()
+            self.journal = None
         self.exitcode = project.release()
 
         return True
@@ -521,6 +750,7 @@ class ProjectManager(GObject.Object, Loggable):
         assert self.current_project is None
 
         self.__start_loading_time = time.time()
+        load_span = tracing.begin("new-blank-project")
         project = Project(self.app)
         self.emit("new-project-loading", project)
 
@@ -539,6 +769,7 @@ class ProjectManager(GObject.Object, Loggable):
         self.emit("new-project-loaded", self.current_project)
         project.loaded = True
         self.time_loaded = time.time()
+        tracing.end(load_span)
 
         return project
 
@@ -576,10 +807,51 @@ class ProjectManager(GObject.Object, Loggable):
             self._backup_lock -= 5
             return True
         else:
-            self.saveProject(backup=True)
+            if self._journal_has_changes():
+                self.debug("The journal has %d entries, no backup needed",
+                           self.journal.entries)
+            else:
+                self.saveProject(backup=True)
             self._backup_lock = 0
         return False
 
+    def _journal_has_changes(self):
+        """Checks whether the journal is enough for recovering the project."""
+        return bool(self.journal) and self.journal.complete and \
+            self.journal.entries < JOURNAL_MAX_ENTRIES
+
+    def _reset_journal(self, base_uri, mark=None):
+        """Starts journaling the operations done after a save.
+
+        Args:
+            base_uri (str): The URI of the saved project file, which can
+                be the backup file.
+            mark (Optional[int]): The journal mark taken when the project
+                has been serialized, if it has been written asynchronously.
+        """
+        if has_validate is not True or not self.app.action_log:
+            return
+
+        path = self._make_journal_path(self.current_project.uri or base_uri)
+        if self.journal and self.journal.path != path:
+            self.journal.release()
+            self.journal = None
+        if not self.journal:
+            self.journal = UndoJournal(path, self.app.action_log)
+        self.journal.reset(base_uri, mark)
+
+    def _make_journal_path(self, uri):
+        """Generates the path of the journal of a project.
+
+        Args:
+            uri (str): The project URI.
+
+        Returns:
+            str: The path of the journal of the operations done since the
+                project or its backup has been saved last time.
+        """
+        return path_from_uri(uri) + ".journal~"
+
     def _cleanBackup(self, uri):
         if uri is None:
             return
@@ -621,6 +893,10 @@ class ProjectManager(GObject.Object, Loggable):
         project.loaded = True
         self.time_loaded = time.time()
         self.info("Loaded in %s", self.time_loaded - self.__start_loading_time)
+        tracing.end(self.__load_span)
+        self.__load_span = None
+        if project.uri:
+            self._reset_journal(project.uri)
 
 
 class Project(Loggable, GES.Project):
@@ -701,6 +977,9 @@ class Project(Loggable, GES.Project):
         # regenerate the proxy.
         self.__awaited_deleted_proxy_targets = set()
 
+        # The tracing spans of the assets being discovered, by asset id.
+        self.__asset_spans = {}
+
         # Project property default values
         self.register_meta(GES.MetaFlag.READWRITE, "author", "")
 
@@ -720,6 +999,8 @@ class Project(Loggable, GES.Project):
         self.container_profile.add_profile(self.audio_profile)
         self.add_encoding_profile(self.container_profile)
 
+        # The render module is not needed until a project is created.
+        from pitivi.render import Encoders
         self.muxer = Encoders().default_muxer
         self.vencoder = Encoders().default_video_encoder
         self.aencoder = Encoders().default_audio_encoder
@@ -842,6 +1123,7 @@ class Project(Loggable, GES.Project):
     @staticmethod
     def __pick_thumb_from_assets_thumbs(assets):
         """Picks project thumbnail from assets thumbnails."""
+        from pitivi.timeline.previewers import ThumbnailCache
         for asset in assets:
             thumb_cache = ThumbnailCache.get(asset)
             thumb = thumb_cache.get_preview_thumbnail()
@@ -880,6 +1162,7 @@ class Project(Loggable, GES.Project):
         n_normal_thumbs = 0
         n_large_thumbs = 0
 
+        from pitivi.medialibrary import AssetThumbnail
         for uri in assets_uri:
             path_128, path_256 = AssetThumbnail.get_asset_thumbnails_path(uri)
 
@@ -1243,6 +1526,8 @@ class Project(Loggable, GES.Project):
             return
 
         self._prepare_asset_processing(asset)
+        self.__asset_spans[asset.props.id] = tracing.begin(
+            "asset-discovery", uri=asset.props.id)
 
     def __regenerate_missing_proxy(self, asset):
         self.info("Re generating deleted proxy file %s.", asset.props.id)
@@ -1304,6 +1589,8 @@ class Project(Loggable, GES.Project):
             self.debug("Ignoring asset: %s", asset.props.id)
             return
 
+        tracing.end(self.__asset_spans.pop(asset.props.id, None))
+
         if asset not in self.loading_assets:
             self.debug("Asset %s is not in loading assets, "
                        " it must not be proxied", asset.get_id())
@@ -1327,6 +1614,7 @@ class Project(Loggable, GES.Project):
 
     def do_loading_error(self, error, asset_id, unused_type):
         """Handles `GES.Project::error-loading-asset` emitted by self."""
+        tracing.end(self.__asset_spans.pop(asset_id, None), failed=True)
         asset = None
         for asset in self.loading_assets:
             if asset.get_id() == asset_id:
@@ -1378,6 +1666,7 @@ class Project(Loggable, GES.Project):
         if container_profile == self.container_profile:
             return False
 
+        from pitivi.render import Encoders
         muxer = self._getElementFactoryName(
             Encoders().muxers, container_profile)
         if muxer is None:
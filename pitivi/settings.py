@@ -18,6 +18,7 @@
 # Boston, MA 02110-1301, USA.
 import configparser
 import os
+import weakref
 
 from gi.repository import Gdk
 from gi.repository import GLib
@@ -118,7 +119,9 @@ class GlobalSettings(GObject.Object, Loggable):
     - environment variables.
 
     Modules declare which settings they wish to access by calling the
-    addConfigOption() class method during initialization.
+    addConfigOption() class method during initialization. Modules imported
+    lazily can declare settings later, they are read right away from the
+    already parsed configuration file.
 
     Attributes:
         options (dict): The available settings.
@@ -129,6 +132,8 @@ class GlobalSettings(GObject.Object, Loggable):
     environment = set()
     defaults = {}
 
+    _instances = weakref.WeakSet()
+
     def __init__(self):
         GObject.Object.__init__(self)
         Loggable.__init__(self)
@@ -137,6 +142,7 @@ class GlobalSettings(GObject.Object, Loggable):
         self._config = configparser.ConfigParser()
         self._readSettingsFromConfigurationFile()
         self._readSettingsFromEnvironmentVariables()
+        GlobalSettings._instances.add(self)
 
     def reload_attribute_from_file(self, section, attrname):
         """Reads and sets an attribute from the configuration file.
@@ -230,6 +236,16 @@ class GlobalSettings(GObject.Object, Loggable):
 
                 setattr(cls, section + option, value)
 
+    def _read_late_option(self, section, attrname):
+        """Reads an option registered after the settings have been loaded."""
+        type_, key, env = self.options[section][attrname]
+        if self._config.has_option(section, key):
+            setattr(self, attrname, self._read_value(section, key, type_))
+        if env:
+            value = get_env_by_type(type_, env)
+            if value is not None:
+                setattr(self, attrname, value)
+
     def _readSettingsFromEnvironmentVariables(self):
         """Reads settings from their registered environment variables."""
         for section, attrname, typ, key, env, value in self.iterAllOptions():
@@ -308,12 +324,9 @@ class GlobalSettings(GObject.Object, Loggable):
                         environment=None, default=None, notify=False,):
         """Adds a configuration option.
 
-        This function should be called during module initialization, before
-        the config file is actually read. By default, only options registered
-        beforehand will be loaded.
-
-        If you want to add configuration options after initialization,
-        use the `readSettingSectionFromFile` method to force reading later on.
+        This function should be called during module initialization. When
+        the module is imported lazily, after the config file has been read,
+        the option is read right away in the existing settings instances.
 
         Args:
             attrname (str): The attribute of this class for accessing the option.
@@ -353,10 +366,12 @@ class GlobalSettings(GObject.Object, Loggable):
                                ())
         else:
             setattr(cls, attrname, default)
-        if section and key:
-            cls.options[section][attrname] = type_, key, environment
         cls.environment.add(environment)
         cls.defaults[attrname] = default
+        if section and key:
+            cls.options[section][attrname] = type_, key, environment
+            for instance in list(cls._instances):
+                instance._read_late_option(section, attrname)
 
     @classmethod
     def addConfigSection(cls, section):
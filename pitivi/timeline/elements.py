@@ -17,10 +17,11 @@
 # License along with this program; if not, write to the
 # Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
 # Boston, MA 02110-1301, USA.
+import bisect
+import math
 import os
 from gettext import gettext as _
 
-import numpy
 from gi.repository import Gdk
 from gi.repository import GdkPixbuf
 from gi.repository import GES
@@ -28,8 +29,6 @@ from gi.repository import GObject
 from gi.repository import Gst
 from gi.repository import GstController
 from gi.repository import Gtk
-from matplotlib.backends.backend_gtk3cairo import FigureCanvasGTK3Cairo as FigureCanvas
-from matplotlib.figure import Figure
 
 from pitivi.configure import get_pixmap_dir
 from pitivi.effects import ALLOWED_ONLY_ONCE_EFFECTS
@@ -58,6 +57,15 @@ KEYFRAME_NODE_COLOR = "#F57900"  # "Tango" medium orange
 SELECTED_KEYFRAME_NODE_COLOR = "#204A87"  # "Tango" dark sky blue
 HOVERED_KEYFRAME_NODE_COLOR = "#3465A4"  # "Tango" medium sky blue
 
+# The half diagonal of the diamond representing a keyframe, in pixels.
+KEYFRAME_NODE_RADIUS = 5
+# The half diagonal of the diamond representing a selected or hovered
+# keyframe, in pixels.
+SPECIAL_KEYFRAME_NODE_RADIUS = 6
+# The maximum distance between the pointer and the line for the line
+# to be considered hovered, in pixels.
+KEYFRAME_LINE_PICK_RADIUS = 5
+
 CURSORS = {
     GES.Edge.EDGE_START: Gdk.Cursor.new(Gdk.CursorType.LEFT_SIDE),
     GES.Edge.EDGE_END: Gdk.Cursor.new(Gdk.CursorType.RIGHT_SIDE)
@@ -75,7 +83,69 @@ def get_pspec(element_factory_name, propname):
     return [prop for prop in element.list_properties() if prop.name == propname][0]
 
 
-class KeyframeCurve(FigureCanvas, Loggable):
+def get_rgba(color, alpha=1.0):
+    """Parses the specified color.
+
+    Args:
+        color (str): The color, for example "#EDD400".
+        alpha (Optional[float]): The opacity of the color.
+
+    Returns:
+        Gdk.RGBA: The parsed color.
+    """
+    rgba = Gdk.RGBA()
+    rgba.parse(color)
+    rgba.alpha = alpha
+    return rgba
+
+
+def decimate(points):
+    """Reduces a polyline to at most four points per pixel column.
+
+    The first, the lowest, the highest and the last points of each column
+    are kept, so the reduced polyline covers the same pixels.
+
+    Args:
+        points (List[Tuple[float, float]]): The points of the polyline,
+            sorted by x.
+
+    Returns:
+        List[Tuple[float, float]]: The points to be drawn.
+    """
+    result = []
+    count = len(points)
+    start = 0
+    while start < count:
+        column = math.floor(points[start][0])
+        end = start + 1
+        while end < count and math.floor(points[end][0]) == column:
+            end += 1
+
+        if end - start <= 4:
+            result.extend(points[start:end])
+        else:
+            lowest = min(range(start, end), key=lambda i: points[i][1])
+            highest = max(range(start, end), key=lambda i: points[i][1])
+            result.append(points[start])
+            for i in sorted({lowest, highest} - {start, end - 1}):
+                result.append(points[i])
+            result.append(points[end - 1])
+        start = end
+    return result
+
+
+class KeyframeCurve(Gtk.DrawingArea, Loggable):
+    """Widget for editing the keyframes of a property.
+
+    The keyframes are drawn with Cairo as diamonds linked by a line. When
+    a keyframe changes, only the area between its neighbours is redrawn,
+    and the dense curves are decimated to the resolution of the screen.
+
+    Attributes:
+        handling_motion (bool): Whether the mouse events go to the
+            keyframes logic.
+    """
+
     YLIM_OVERRIDES = {}
 
     __YLIM_OVERRIDES_VALUES = [("volume", "volume", (0.0, 0.2))]
@@ -92,13 +162,17 @@ class KeyframeCurve(FigureCanvas, Loggable):
         "leave": (GObject.SignalFlags.RUN_LAST, None, ()),
     }
 
+    LINE_COLOR = get_rgba(KEYFRAME_LINE_COLOR, KEYFRAME_LINE_ALPHA)
+    NODE_COLOR = get_rgba(KEYFRAME_NODE_COLOR)
+
     def __init__(self, timeline, binding):
-        figure = Figure()
-        FigureCanvas.__init__(self, figure)
+        Gtk.DrawingArea.__init__(self)
         Loggable.__init__(self)
 
         self._timeline = timeline
         self.__source = binding.props.control_source
+        # The control sources whose signals are connected.
+        self._sources = []
         self._connect_sources()
         self.__propertyName = binding.props.name
         self.__paramspec = binding.pspec
@@ -111,35 +185,6 @@ class KeyframeCurve(FigureCanvas, Loggable):
         # and values.
         self._line_xs = []
         self._line_ys = []
-
-        # facecolor to None for transparency
-        self._ax = figure.add_axes([0, 0, 1, 1], facecolor='None')
-        # Clear the Axes object.
-        self._ax.cla()
-        self._ax.grid(False)
-        self._ax.tick_params(axis='both',
-                             which='both',
-                             bottom=False,
-                             top=False,
-                             right=False,
-                             left=False)
-
-        # This seems to also be necessary for transparency ..
-        figure.patch.set_visible(False)
-
-        # The PathCollection object holding the keyframes dots.
-        sizes = [50]
-        self._keyframes = self._ax.scatter([], [], marker='D', s=sizes,
-                                           c=KEYFRAME_NODE_COLOR, zorder=2)
-
-        # matplotlib weirdness, simply here to avoid a warning ..
-        self._keyframes.set_picker(True)
-
-        # The Line2D object holding the lines between keyframes.
-        self.__line = self._ax.plot([], [],
-                                    alpha=KEYFRAME_LINE_ALPHA,
-                                    c=KEYFRAME_LINE_COLOR,
-                                    linewidth=KEYFRAME_LINE_HEIGHT, zorder=1)[0]
         self._update_plots()
 
         # Drag and drop logic
@@ -149,28 +194,34 @@ class KeyframeCurve(FigureCanvas, Loggable):
         self._offset = None
         # The (offset, value) of both keyframes of the clicked keyframe line.
         self.__clicked_line = ()
-        # Whether the mouse events go to the keyframes logic.
+        self.__ydata_drag_start = None
         self.handling_motion = False
 
         self.__hovered = False
 
-        self.connect("motion-notify-event", self.__gtkMotionEventCb)
-        self.connect("event", self._eventCb)
-        self.connect("notify::height-request", self.__heightRequestCb)
-
-        self.mpl_connect('button_press_event', self._mpl_button_press_event_cb)
-        self.mpl_connect('button_release_event', self._mpl_button_release_event_cb)
-        self.mpl_connect('motion_notify_event', self._mpl_motion_event_cb)
+        self.add_events(Gdk.EventMask.BUTTON_PRESS_MASK |
+                        Gdk.EventMask.BUTTON_RELEASE_MASK |
+                        Gdk.EventMask.POINTER_MOTION_MASK |
+                        Gdk.EventMask.LEAVE_NOTIFY_MASK)
+        self.connect("button-press-event", self._button_press_event_cb)
+        self.connect("button-release-event", self._button_release_event_cb)
+        self.connect("motion-notify-event", self._motion_notify_event_cb)
+        self.connect("leave-notify-event", self._leave_notify_event_cb)
 
     def release(self):
-        disconnectAllByFunc(self, self.__heightRequestCb)
-        disconnectAllByFunc(self, self.__gtkMotionEventCb)
-        disconnectAllByFunc(self, self._controlSourceChangedCb)
+        for source in self._sources:
+            disconnectAllByFunc(source, self._controlSourceChangedCb)
+        self._sources = []
 
     def _connect_sources(self):
-        self.__source.connect("value-added", self._controlSourceChangedCb)
-        self.__source.connect("value-removed", self._controlSourceChangedCb)
-        self.__source.connect("value-changed", self._controlSourceChangedCb)
+        self._connect_source(self.__source)
+
+    def _connect_source(self, source):
+        # The last argument tells whether the keyframe is set.
+        source.connect("value-added", self._controlSourceChangedCb, True)
+        source.connect("value-removed", self._controlSourceChangedCb, False)
+        source.connect("value-changed", self._controlSourceChangedCb, True)
+        self._sources.append(source)
 
     def _update_plots(self):
         values = self.__source.get_all()
@@ -184,38 +235,176 @@ class KeyframeCurve(FigureCanvas, Loggable):
             self._line_xs.append(value.timestamp)
             self._line_ys.append(value.value)
 
-        self._populate_lines()
+        self.queue_draw()
 
-    def _populate_lines(self):
-        self._ax.set_xlim(self._line_xs[0], self._line_xs[-1])
-        self.__computeYlim()
+    def _update_keyframe(self, timestamp, value):
+        """Updates the curve after a keyframe has been set or unset.
 
-        arr = numpy.array((self._line_xs, self._line_ys))
-        arr = arr.transpose()
-        self._keyframes.set_offsets(arr)
-        self.__line.set_xdata(self._line_xs)
-        self.__line.set_ydata(self._line_ys)
-        self.queue_draw()
+        Args:
+            timestamp (int): The timestamp of the keyframe.
+            value (Optional[float]): The value of the keyframe, or None if
+                the keyframe has been unset.
+        """
+        xs = self._line_xs
+        index = bisect.bisect_left(xs, timestamp)
+        exists = index < len(xs) and xs[index] == timestamp
+        next_index = index + 1 if exists else index
+        if index == 0 or next_index >= len(xs):
+            # The range of the curve changes, so all of it is affected.
+            self._update_plots()
+            return
 
-    # Private methods
-    def __computeYlim(self):
-        height = self.props.height_request
+        # Only the segments between the neighbours are affected.
+        previous_timestamp = xs[index - 1]
+        next_timestamp = xs[next_index]
+        if value is None:
+            if exists:
+                del xs[index]
+                del self._line_ys[index]
+        elif exists:
+            self._line_ys[index] = value
+        else:
+            xs.insert(index, timestamp)
+            self._line_ys.insert(index, value)
+        self._queue_draw_span(previous_timestamp, next_timestamp)
 
-        if height <= 0:
+    def _queue_draw_span(self, start, end):
+        """Queues the redraw of the curve between the specified timestamps."""
+        if len(self._line_xs) < 2:
             return
 
-        ylim_min = -(KEYFRAME_LINE_HEIGHT / height)
-        ylim_max = (self.__ylim_max * height) / (height - KEYFRAME_LINE_HEIGHT)
-        self._ax.set_ylim(ylim_min, ylim_max)
+        margin = SPECIAL_KEYFRAME_NODE_RADIUS + 1
+        x1 = math.floor(self._timestamp_to_x(start)) - margin
+        x2 = math.ceil(self._timestamp_to_x(end)) + margin
+        self.queue_draw_area(x1, 0, x2 - x1, self.get_allocated_height())
+
+    # Coordinates conversion, only valid when there are at least two
+    # keyframes.
+    def _timestamp_to_x(self, timestamp):
+        xs = self._line_xs
+        return (timestamp - xs[0]) * self.get_allocated_width() / (xs[-1] - xs[0])
+
+    def _x_to_timestamp(self, x):
+        xs = self._line_xs
+        width = max(1, self.get_allocated_width())
+        return int(round(xs[0] + x * (xs[-1] - xs[0]) / width))
+
+    def _value_to_y(self, value):
+        height = max(1, self.get_allocated_height() - 2 * KEYFRAME_LINE_HEIGHT)
+        ratio = (self.__ylim_max - value) / (self.__ylim_max - self.__ylim_min)
+        return KEYFRAME_LINE_HEIGHT + ratio * height
+
+    def _y_to_value(self, y):
+        height = max(1, self.get_allocated_height() - 2 * KEYFRAME_LINE_HEIGHT)
+        ratio = (y - KEYFRAME_LINE_HEIGHT) / height
+        return self.__ylim_max - ratio * (self.__ylim_max - self.__ylim_min)
+
+    def _get_keyframe_at(self, x, y):
+        """Gets the index of the keyframe at the specified position, if any."""
+        if len(self._line_xs) < 2:
+            return None
+
+        index = bisect.bisect_left(self._line_xs, self._x_to_timestamp(x))
+        keyframe_index = None
+        min_distance = KEYFRAME_NODE_RADIUS
+        for i in (index - 1, index):
+            if not 0 <= i < len(self._line_xs):
+                continue
+            distance = abs(self._timestamp_to_x(self._line_xs[i]) - x) + \
+                abs(self._value_to_y(self._line_ys[i]) - y)
+            if distance <= min_distance:
+                keyframe_index = i
+                min_distance = distance
+        return keyframe_index
+
+    def _get_segment_at(self, x, y):
+        """Gets the index of the segment start at the specified position.
+
+        Returns:
+            Optional[int]: The index of the keyframe at the left of the
+            hovered segment, or None if the line is not hovered.
+        """
+        xs = self._line_xs
+        if len(xs) < 2 or not 0 <= x <= self.get_allocated_width():
+            return None
+
+        index = bisect.bisect_right(xs, self._x_to_timestamp(x)) - 1
+        index = max(0, min(index, len(xs) - 2))
+        # Check the neighbour segments too, they can be close when steep.
+        for i in (index, index - 1, index + 1):
+            if not 0 <= i < len(xs) - 1:
+                continue
+            x1 = self._timestamp_to_x(xs[i])
+            y1 = self._value_to_y(self._line_ys[i])
+            x2 = self._timestamp_to_x(xs[i + 1])
+            y2 = self._value_to_y(self._line_ys[i + 1])
+            dx = x2 - x1
+            dy = y2 - y1
+            length = dx * dx + dy * dy
+            ratio = ((x - x1) * dx + (y - y1) * dy) / length if length else 0
+            ratio = max(0, min(ratio, 1))
+            distance = math.hypot(x1 + ratio * dx - x, y1 + ratio * dy - y)
+            if distance <= KEYFRAME_LINE_PICK_RADIUS:
+                return i
+        return None
+
+    def _draw_keyframe(self, cr, x, y, radius):
+        cr.move_to(x, y - radius)
+        cr.line_to(x + radius, y)
+        cr.line_to(x, y + radius)
+        cr.line_to(x - radius, y)
+        cr.close_path()
 
-    def __heightRequestCb(self, unused_self, unused_pspec):
-        self.__computeYlim()
+    def do_draw(self, cr):
+        xs = self._line_xs
+        if len(xs) < 2:
+            return
 
-    def __maybeCreateKeyframe(self, event):
-        line_contains = self.__line.contains(event)[0]
-        keyframe_existed = self._keyframes.contains(event)[0]
+        # Draw only the keyframes in the area to be redrawn, plus the
+        # ones right outside, for the segments crossing its edges.
+        clip_x1, unused_y1, clip_x2, unused_y2 = cr.clip_extents()
+        margin = SPECIAL_KEYFRAME_NODE_RADIUS + 1
+        first = bisect.bisect_right(xs, self._x_to_timestamp(clip_x1 - margin))
+        first = max(0, first - 1)
+        last = bisect.bisect_left(xs, self._x_to_timestamp(clip_x2 + margin))
+        last = min(len(xs), last + 1)
+        points = [(self._timestamp_to_x(xs[i]), self._value_to_y(self._line_ys[i]))
+                  for i in range(first, last)]
+        if not points:
+            return
+
+        line = decimate(points)
+        cr.move_to(*line[0])
+        for x, y in line[1:]:
+            cr.line_to(x, y)
+        cr.set_line_width(KEYFRAME_LINE_HEIGHT)
+        Gdk.cairo_set_source_rgba(cr, self.LINE_COLOR)
+        cr.stroke()
+
+        # Draw at most one keyframe per pixel column.
+        column = None
+        for x, y in points:
+            if math.floor(x) == column:
+                continue
+            column = math.floor(x)
+            self._draw_keyframe(cr, x, y, KEYFRAME_NODE_RADIUS)
+        Gdk.cairo_set_source_rgba(cr, self.NODE_COLOR)
+        cr.fill()
+
+    # Private methods
+    def __clamp_value(self, value):
+        return max(self.__ylim_min, min(value, self.__ylim_max))
+
+    def __contains(self, x, y):
+        return len(self._line_xs) >= 2 and \
+            0 <= x <= self.get_allocated_width() and \
+            0 <= y <= self.get_allocated_height()
+
+    def __maybeCreateKeyframe(self, x, y, timestamp):
+        line_contains = self._get_segment_at(x, y) is not None
+        keyframe_existed = self._get_keyframe_at(x, y) is not None
         if line_contains and not keyframe_existed:
-            self._create_keyframe(event.xdata)
+            self._create_keyframe(timestamp)
 
     def _create_keyframe(self, timestamp):
         res, value = self.__source.control_source_get_value(timestamp)
@@ -238,7 +427,7 @@ class KeyframeCurve(FigureCanvas, Loggable):
     def _move_keyframe_line(self, line, y_dest_value, y_start_value):
         delta = y_dest_value - y_start_value
         for offset, value in line:
-            value = max(self.__ylim_min, min(value + delta, self.__ylim_max))
+            value = self.__clamp_value(value + delta)
             self.__source.set(offset, value)
 
     def toggle_keyframe(self, offset):
@@ -255,39 +444,29 @@ class KeyframeCurve(FigureCanvas, Loggable):
             self.__source.set(offset, value)
 
     # Callbacks
-    def _controlSourceChangedCb(self, unused_control_source, unused_timed_value):
-        self._update_plots()
+    def _controlSourceChangedCb(self, unused_control_source, timed_value, is_set):
+        value = timed_value.value if is_set else None
+        self._update_keyframe(timed_value.timestamp, value)
         self._timeline.ges_timeline.get_parent().commit_timeline()
 
-    def __gtkMotionEventCb(self, unused_widget, unused_event):
-        # We need to do this here, because Matplotlib's callbacks can't stop
-        # signal propagation.
-        if self.handling_motion:
-            return True
+    def _leave_notify_event_cb(self, unused_widget, unused_event):
+        self._timeline.get_window().set_cursor(NORMAL_CURSOR)
         return False
 
-    def _eventCb(self, unused_element, event):
-        if event.type == Gdk.EventType.LEAVE_NOTIFY:
-            cursor = NORMAL_CURSOR
-            self._timeline.get_window().set_cursor(cursor)
-        return False
-
-    def _mpl_button_press_event_cb(self, event):
-        if event.button != 1:
-            return
+    def _button_press_event_cb(self, unused_widget, event):
+        res, button = event.get_button()
+        if not res or button != 1:
+            return False
 
-        result = self._keyframes.contains(event)
-        if result[0]:
+        keyframe_index = self._get_keyframe_at(event.x, event.y)
+        if keyframe_index is not None:
             # A keyframe has been clicked.
-            keyframe_index = result[1]['ind'][0]
-            offsets = self._keyframes.get_offsets()
-            offset = offsets[keyframe_index][0]
+            offset = self._line_xs[keyframe_index]
 
-            if event.guiEvent.type == Gdk.EventType._2BUTTON_PRESS:
-                index = result[1]['ind'][0]
-                if index == 0 or index == len(offsets) - 1:
+            if event.type == Gdk.EventType._2BUTTON_PRESS:
+                if keyframe_index in (0, len(self._line_xs) - 1):
                     # It's an edge keyframe. These should not be removed.
-                    return
+                    return False
 
                 # Rollback the last operation if it is "Move keyframe".
                 # This is needed because a double-click also triggers a
@@ -303,48 +482,48 @@ class KeyframeCurve(FigureCanvas, Loggable):
                                                     toplevel=True)
                 self._offset = offset
                 self.handling_motion = True
-            return
+            return False
 
-        result = self.__line.contains(event)
-        if result[0]:
+        segment_index = self._get_segment_at(event.x, event.y)
+        if segment_index is not None:
             # The line has been clicked.
             self.debug("The keyframe curve has been clicked")
             self._timeline.app.action_log.begin("Move keyframe curve segment",
                                                 toplevel=True)
-            x = event.xdata
-            offsets = self._keyframes.get_offsets()
-            keyframes = offsets[:, 0]
-            right = numpy.searchsorted(keyframes, x)
             # Remember the clicked line for drag&drop.
-            self.__clicked_line = (offsets[right - 1], offsets[right])
-            self.__ydata_drag_start = max(self.__ylim_min, min(event.ydata, self.__ylim_max))
+            self.__clicked_line = tuple(
+                (self._line_xs[i], self._line_ys[i])
+                for i in (segment_index, segment_index + 1))
+            self.__ydata_drag_start = self.__clamp_value(self._y_to_value(event.y))
             self.handling_motion = True
+        return False
 
-    def _mpl_motion_event_cb(self, event):
-        if event.ydata is not None and event.xdata is not None:
-            # The mouse event is in the figure boundaries.
+    def _motion_notify_event_cb(self, unused_widget, event):
+        timestamp = None
+        if self.__contains(event.x, event.y):
+            # The mouse event is in the curve boundaries.
+            timestamp = self._x_to_timestamp(event.x)
             if self._offset is not None:
                 self._dragged = True
-                keyframe_ts = self.__computeKeyframeNewTimestamp(event)
-                ydata = max(self.__ylim_min, min(event.ydata, self.__ylim_max))
+                keyframe_ts = self.__computeKeyframeNewTimestamp(timestamp)
+                ydata = self.__clamp_value(self._y_to_value(event.y))
 
                 self._move_keyframe(int(self._offset), keyframe_ts, ydata)
                 self._offset = keyframe_ts
-                self._update_tooltip(event)
                 hovering = True
             elif self.__clicked_line:
                 self._dragged = True
-                ydata = max(self.__ylim_min, min(event.ydata, self.__ylim_max))
+                ydata = self.__clamp_value(self._y_to_value(event.y))
                 self._move_keyframe_line(self.__clicked_line, ydata, self.__ydata_drag_start)
                 hovering = True
             else:
-                hovering = self.__line.contains(event)[0]
+                hovering = self._get_segment_at(event.x, event.y) is not None
         else:
             hovering = False
 
         if hovering:
             cursor = DRAG_CURSOR
-            self._update_tooltip(event)
+            self._update_tooltip(timestamp)
             if not self.__hovered:
                 self.emit("enter")
                 self.__hovered = True
@@ -356,28 +535,31 @@ class KeyframeCurve(FigureCanvas, Loggable):
                 self.__hovered = False
 
         self._timeline.get_window().set_cursor(cursor)
+        # Stop the propagation while dragging.
+        return self.handling_motion
 
-    def _mpl_button_release_event_cb(self, event):
-        if event.button != 1:
-            return
+    def _button_release_event_cb(self, unused_widget, event):
+        res, button = event.get_button()
+        if not res or button != 1:
+            return False
 
         # In order to make sure we seek to the exact position where we added a
-        # new keyframe, we don't use matplotlib's event.xdata, but rather
+        # new keyframe, we don't use the position on the curve, but rather
         # compute it the same way we do for the seek logic.
-        event_widget = Gtk.get_event_widget(event.guiEvent)
+        event_widget = Gtk.get_event_widget(event)
         x, unused_y = event_widget.translate_coordinates(self._timeline.layout.layers_vbox,
                                                          event.x, event.y)
         ges_clip = self._timeline.selection.getSingleClip(GES.Clip)
-        event.xdata = Zoomable.pixelToNs(x) - ges_clip.props.start + ges_clip.props.in_point
+        timestamp = Zoomable.pixelToNs(x) - ges_clip.props.start + ges_clip.props.in_point
 
         if self._offset is not None:
             # If dragging a keyframe, make sure the keyframe ends up exactly
             # where the mouse was released. Otherwise, the playhead will not
             # seek exactly on the keyframe.
             if self._dragged:
-                if event.ydata is not None:
-                    keyframe_ts = self.__computeKeyframeNewTimestamp(event)
-                    ydata = max(self.__ylim_min, min(event.ydata, self.__ylim_max))
+                if 0 <= event.y <= self.get_allocated_height():
+                    keyframe_ts = self.__computeKeyframeNewTimestamp(timestamp)
+                    ydata = self.__clamp_value(self._y_to_value(event.y))
                     self._move_keyframe(int(self._offset), keyframe_ts, ydata)
             self.debug("Keyframe released")
             self._timeline.app.action_log.commit("Move keyframe")
@@ -387,24 +569,28 @@ class KeyframeCurve(FigureCanvas, Loggable):
 
             if not self._dragged:
                 # The keyframe line was clicked, but not dragged
-                assert event.guiEvent.type == Gdk.EventType.BUTTON_RELEASE
-                self.__maybeCreateKeyframe(event)
+                assert event.type == Gdk.EventType.BUTTON_RELEASE
+                self.__maybeCreateKeyframe(event.x, event.y, timestamp)
 
         self.handling_motion = False
         self._offset = None
         self.__clicked_line = ()
         self._dragged = False
+        return False
+
+    def _update_tooltip(self, timestamp):
+        """Sets or clears the tooltip showing info about the hovered line.
 
-    def _update_tooltip(self, event):
-        """Sets or clears the tooltip showing info about the hovered line."""
+        Args:
+            timestamp (Optional[int]): The hovered timestamp, or None to
+                clear the tooltip.
+        """
         markup = None
-        if event:
-            if not event.xdata:
-                return
+        if timestamp is not None:
             if self._offset is not None:
                 xdata = self._offset
             else:
-                xdata = max(self._line_xs[0], min(event.xdata, self._line_xs[-1]))
+                xdata = max(self._line_xs[0], min(timestamp, self._line_xs[-1]))
             res, value = self.__source.control_source_get_value(xdata)
             assert res
             pmin = self.__paramspec.minimum
@@ -419,48 +605,46 @@ class KeyframeCurve(FigureCanvas, Loggable):
                 "{:.3f}".format(value))
         self.set_tooltip_markup(markup)
 
-    def __computeKeyframeNewTimestamp(self, event):
+    def __computeKeyframeNewTimestamp(self, timestamp):
         # The user can not change the timestamp of the first
         # and last keyframes.
-        values = self.__source.get_all()
-        if self._offset in (values[0].timestamp, values[-1].timestamp):
+        xs = self._line_xs
+        if self._offset in (xs[0], xs[-1]):
             return self._offset
 
-        if event.xdata != self._offset:
-            try:
-                kf = next(kf for kf in values if kf.timestamp == int(self._offset))
-            except StopIteration:
-                return event.xdata
-
-            i = values.index(kf)
-            keyframe_timestamp = int(event.xdata)
-            if keyframe_timestamp <= values[i - 1].timestamp:
-                keyframe_timestamp = values[i - 1].timestamp + 1
-            if keyframe_timestamp >= values[i + 1].timestamp:
-                keyframe_timestamp = values[i + 1].timestamp - 1
+        if timestamp != self._offset:
+            index = bisect.bisect_left(xs, int(self._offset))
+            if index >= len(xs) or xs[index] != int(self._offset):
+                return timestamp
+
+            keyframe_timestamp = int(timestamp)
+            if keyframe_timestamp <= xs[index - 1]:
+                keyframe_timestamp = xs[index - 1] + 1
+            if keyframe_timestamp >= xs[index + 1]:
+                keyframe_timestamp = xs[index + 1] - 1
             return keyframe_timestamp
 
-        return event.xdata
+        return timestamp
 
 
 class MultipleKeyframeCurve(KeyframeCurve):
     """Keyframe curve which controls multiple properties at once."""
 
+    SELECTED_NODE_COLOR = get_rgba(SELECTED_KEYFRAME_NODE_COLOR)
+    HOVERED_NODE_COLOR = get_rgba(HOVERED_KEYFRAME_NODE_COLOR)
+
     def __init__(self, timeline, bindings):
         self.__bindings = bindings
+        # The timestamps of the keyframes drawn as selected and as hovered.
+        self.__selected_keyframe = None
+        self.__hovered_keyframe = None
         super().__init__(timeline, bindings[0])
 
         self._timeline = timeline
         self._project = timeline.app.project_manager.current_project
         self._project.pipeline.connect("position", self._position_cb)
 
-        sizes = [80]
-        self.__selected_keyframe = self._ax.scatter([0], [0.5], marker='D', s=sizes,
-                                                    c=SELECTED_KEYFRAME_NODE_COLOR, zorder=3)
-        self.__hovered_keyframe = self._ax.scatter([0], [0.5], marker='D', s=sizes,
-                                                   c=HOVERED_KEYFRAME_NODE_COLOR, zorder=3)
         self.__update_selected_keyframe()
-        self.__hovered_keyframe.set_visible(False)
 
     def release(self):
         super().release()
@@ -468,10 +652,7 @@ class MultipleKeyframeCurve(KeyframeCurve):
 
     def _connect_sources(self):
         for binding in self.__bindings:
-            source = binding.props.control_source
-            source.connect("value-added", self._controlSourceChangedCb)
-            source.connect("value-removed", self._controlSourceChangedCb)
-            source.connect("value-changed", self._controlSourceChangedCb)
+            self._connect_source(binding.props.control_source)
 
     def _update_plots(self):
         timestamps = []
@@ -484,13 +665,14 @@ class MultipleKeyframeCurve(KeyframeCurve):
             # No plot for less than two points.
             return
 
-        self._line_xs = []
-        self._line_ys = []
-        for timestamp in timestamps:
-            self._line_xs.append(timestamp)
-            self._line_ys.append(0.5)
+        self._line_xs = timestamps
+        self._line_ys = [0.5] * len(timestamps)
 
-        self._populate_lines()
+        self.queue_draw()
+
+    def _update_keyframe(self, timestamp, value):
+        # A keyframe is shown as long as one of the sources has it.
+        self._update_plots()
 
     def _create_keyframe(self, timestamp):
         with self._timeline.app.action_log.started("Add keyframe",
@@ -516,8 +698,21 @@ class MultipleKeyframeCurve(KeyframeCurve):
     def _move_keyframe_line(self, line, y_dest_value, y_start_value):
         pass
 
-    def _mpl_button_release_event_cb(self, event):
-        if event.button == 1:
+    def do_draw(self, cr):
+        KeyframeCurve.do_draw(self, cr)
+
+        for timestamp, color in ((self.__selected_keyframe, self.SELECTED_NODE_COLOR),
+                                 (self.__hovered_keyframe, self.HOVERED_NODE_COLOR)):
+            if timestamp is None or len(self._line_xs) < 2:
+                continue
+            self._draw_keyframe(cr, self._timestamp_to_x(timestamp),
+                                self._value_to_y(0.5), SPECIAL_KEYFRAME_NODE_RADIUS)
+            Gdk.cairo_set_source_rgba(cr, color)
+            cr.fill()
+
+    def _button_release_event_cb(self, widget, event):
+        res, button = event.get_button()
+        if res and button == 1:
             if self._offset is not None and not self._dragged:
                 # A keyframe was clicked but not dragged, so we
                 # should select it by seeking to its position.
@@ -530,34 +725,43 @@ class MultipleKeyframeCurve(KeyframeCurve):
                 else:
                     self._project.pipeline.simple_seek(position)
 
-        super()._mpl_button_release_event_cb(event)
+        return super()._button_release_event_cb(widget, event)
 
-    def _mpl_motion_event_cb(self, event):
-        super()._mpl_motion_event_cb(event)
+    def _motion_notify_event_cb(self, widget, event):
+        res = super()._motion_notify_event_cb(widget, event)
 
-        result = self._keyframes.contains(event)
-        if result[0]:
+        keyframe_index = self._get_keyframe_at(event.x, event.y)
+        if keyframe_index is not None:
             # A keyframe is hovered
-            keyframe_index = result[1]['ind'][0]
-            offset = self._keyframes.get_offsets()[keyframe_index][0]
-            self.__show_special_keyframe(self.__hovered_keyframe, offset)
+            self.__set_hovered_keyframe(self._line_xs[keyframe_index])
         else:
-            self.__hide_special_keyframe(self.__hovered_keyframe)
+            self.__set_hovered_keyframe(None)
+        return res
 
-    def __show_special_keyframe(self, keyframe, offset):
-        offsets = numpy.array([[offset, 0.5]])
-        keyframe.set_offsets(offsets)
-        keyframe.set_visible(True)
-        self.queue_draw()
+    def __set_hovered_keyframe(self, timestamp):
+        if timestamp == self.__hovered_keyframe:
+            return
 
-    def __hide_special_keyframe(self, keyframe):
-        keyframe.set_visible(False)
-        self.queue_draw()
+        self.__queue_draw_keyframe(self.__hovered_keyframe)
+        self.__hovered_keyframe = timestamp
+        self.__queue_draw_keyframe(timestamp)
+
+    def __set_selected_keyframe(self, timestamp):
+        if timestamp == self.__selected_keyframe:
+            return
+
+        self.__queue_draw_keyframe(self.__selected_keyframe)
+        self.__selected_keyframe = timestamp
+        self.__queue_draw_keyframe(timestamp)
 
-    def _controlSourceChangedCb(self, control_source, timed_value):
-        super()._controlSourceChangedCb(control_source, timed_value)
+    def __queue_draw_keyframe(self, timestamp):
+        if timestamp is not None:
+            self._queue_draw_span(timestamp, timestamp)
+
+    def _controlSourceChangedCb(self, control_source, timed_value, is_set):
+        super()._controlSourceChangedCb(control_source, timed_value, is_set)
         self.__update_selected_keyframe()
-        self.__hide_special_keyframe(self.__hovered_keyframe)
+        self.__set_hovered_keyframe(None)
 
     def _position_cb(self, unused_pipeline, unused_position):
         self.__update_selected_keyframe()
@@ -574,21 +778,17 @@ class MultipleKeyframeCurve(KeyframeCurve):
             return
         source_position = position - source.props.start + source.props.in_point
 
-        offsets = self._keyframes.get_offsets()
-        keyframes = offsets[:, 0]
-
-        index = numpy.searchsorted(keyframes, source_position)
+        keyframes = self._line_xs
+        index = bisect.bisect_left(keyframes, source_position)
         if 0 <= index < len(keyframes) and keyframes[index] == source_position:
-            self.__show_special_keyframe(self.__selected_keyframe, source_position)
+            self.__set_selected_keyframe(source_position)
         else:
-            self.__hide_special_keyframe(self.__selected_keyframe)
+            self.__set_selected_keyframe(None)
 
-    def _update_tooltip(self, event):
+    def _update_tooltip(self, timestamp):
         markup = None
-        if event:
-            if not event.xdata:
-                return
-            markup = _("Timestamp: %s") % Gst.TIME_ARGS(event.xdata)
+        if timestamp is not None:
+            markup = _("Timestamp: %s") % Gst.TIME_ARGS(timestamp)
         self.set_tooltip_markup(markup)
 
 
@@ -621,9 +821,9 @@ class TimelineElement(Gtk.Layout, Zoomable, Loggable):
 
         self.props.vexpand = True
 
-        self.__previewer = self._getPreviewer()
-        if self.__previewer:
-            self.add(self.__previewer)
+        # The previewer is created only while the clip is close to the
+        # viewport, see `bind`.
+        self.__previewer = None
 
         self.__background = self._getBackground()
         if self.__background:
@@ -638,10 +838,32 @@ class TimelineElement(Gtk.Layout, Zoomable, Loggable):
         self.showDefaultKeyframes(lazy_render=True)
 
     def release(self):
-        if self.__previewer:
-            self.__previewer.release()
+        self.unbind()
 
     # Public API
+    def bind(self):
+        """Creates the previewer, as the element is close to the viewport."""
+        if self.__previewer:
+            return
+
+        self.__previewer = self._getPreviewer()
+        if not self.__previewer:
+            return
+
+        self.__previewer.set_size_request(self.__width, self.__height)
+        self.__previewer.set_selected(bool(self._ges_elem.selected))
+        self.add(self.__previewer)
+        self.__previewer.show_all()
+
+    def unbind(self):
+        """Releases the previewer, as the element is far from the viewport."""
+        if not self.__previewer:
+            return
+
+        self.__previewer.release()
+        self.remove(self.__previewer)
+        self.__previewer = None
+
     def setSize(self, width, height):
         width = max(0, width)
         self.set_size_request(width, height)
@@ -1086,12 +1308,29 @@ class Clip(Gtk.EventBox, Zoomable, Loggable):
         self._audioSource = None
         self._videoSource = None
 
+        # Whether the clip is close to the visible area of the timeline.
+        # The previewers exist only while this is True.
+        self.in_viewport = layer.is_in_viewport(ges_clip)
+
+        # The geometry applied by the last updatePosition.
+        self._current_x = None
+        self._current_y = None
+        self._current_width = None
+        self._current_height = None
+        self._current_parent_height = None
+        self._current_parent = None
+
         self._setupWidget()
         self.__force_position_update = True
+        # The types of the tracks of the children, to avoid looking them up
+        # when the position changes.
+        self.__track_types = GES.TrackType(0)
 
         for ges_timeline_element in self.ges_clip.get_children(False):
             self._add_child(ges_timeline_element)
             self.__connect_to_child(ges_timeline_element)
+            self.__bind_child(ges_timeline_element)
+        self.__update_track_types()
 
         # Connect to Widget signals.
         self.connect("button-release-event", self._button_release_event_cb)
@@ -1167,7 +1406,34 @@ class Clip(Gtk.EventBox, Zoomable, Loggable):
                 return effect
         return None
 
+    def set_in_viewport(self, in_viewport):
+        """Shows or hides the clip when it gets close to or far from the viewport.
+
+        Args:
+            in_viewport (bool): Whether the clip is close to the viewport.
+        """
+        if self.in_viewport == in_viewport:
+            return
+
+        self.in_viewport = in_viewport
+        for ges_timeline_element in self.ges_clip.get_children(False):
+            self.__bind_child(ges_timeline_element)
+        self.set_visible(in_viewport)
+        if in_viewport:
+            self.__force_position_update = True
+            self.updatePosition()
+
     def updatePosition(self):
+        if not self.in_viewport:
+            layer = self.layer
+            if layer and (bool(self.ges_clip.selected) or layer.is_in_viewport(self.ges_clip)):
+                # The clip has been moved close to the viewport.
+                self.set_in_viewport(True)
+                return
+            # Updated when it gets close to the viewport.
+            self.__force_position_update = True
+            return
+
         layer = self.layer
         if not layer or layer != self.get_parent():
             # Things are not settled yet.
@@ -1184,8 +1450,8 @@ class Clip(Gtk.EventBox, Zoomable, Loggable):
         parent_height = layer.props.height_request
         y = 0
         height = parent_height
-        has_video = self.ges_clip.find_track_elements(None, GES.TrackType.VIDEO, GObject.TYPE_NONE)
-        has_audio = self.ges_clip.find_track_elements(None, GES.TrackType.AUDIO, GObject.TYPE_NONE)
+        has_video = self.__track_types & GES.TrackType.VIDEO
+        has_audio = self.__track_types & GES.TrackType.AUDIO
         if not has_video or not has_audio:
             if layer.media_types == (GES.TrackType.AUDIO | GES.TrackType.VIDEO):
                 height = parent_height / 2
@@ -1195,23 +1461,33 @@ class Clip(Gtk.EventBox, Zoomable, Loggable):
         if self.__force_position_update or \
                 x != self._current_x or \
                 y != self._current_y or \
-                width != self._current_width or \
-                parent_height != self._current_parent_height or \
                 layer != self._current_parent:
-
             layer.move(self, x, y)
+
+        if self.__force_position_update or \
+                width != self._current_width or \
+                height != self._current_height or \
+                parent_height != self._current_parent_height:
+            # Moving a clip does not need its children to be resized.
             self.set_size_request(width, height)
 
             elements = self._elements_container.get_children()
             for child in elements:
                 child.setSize(width, height / len(elements))
 
-            self.__force_position_update = False
-            self._current_x = x
-            self._current_y = y
-            self._current_width = width
-            self._current_parent_height = parent_height
-            self._current_parent = layer
+        self.__force_position_update = False
+        self._current_x = x
+        self._current_y = y
+        self._current_width = width
+        self._current_height = height
+        self._current_parent_height = parent_height
+        self._current_parent = layer
+
+    def __update_track_types(self):
+        self.__track_types = GES.TrackType(0)
+        for child in self.ges_clip.get_children(False):
+            if isinstance(child, GES.TrackElement):
+                self.__track_types |= child.props.track_type
 
     def _setupWidget(self):
         pass
@@ -1322,18 +1598,27 @@ class Clip(Gtk.EventBox, Zoomable, Loggable):
         return False
 
     def _startChangedCb(self, unused_clip, unused_pspec):
-        self.updatePosition()
+        self.timeline.queue_position_update(self)
 
     def _durationChangedCb(self, unused_clip, unused_pspec):
-        self.updatePosition()
+        self.timeline.queue_position_update(self)
 
     def _layerChangedCb(self, ges_clip, unused_pspec):
-        self.updatePosition()
+        self.timeline.queue_position_update(self)
 
     def __disconnectFromChild(self, child):
         if child.ui:
             child.ui.release()
 
+    def __bind_child(self, child):
+        if not child.ui:
+            return
+
+        if self.in_viewport:
+            child.ui.bind()
+        else:
+            child.ui.unbind()
+
     def __connect_to_child(self, child):
         if child.ui:
             child.ui.connect("curve-enter", self.__curveEnterCb)
@@ -1353,6 +1638,8 @@ class Clip(Gtk.EventBox, Zoomable, Loggable):
         self.__force_position_update = True
         self._add_child(ges_timeline_element)
         self.__connect_to_child(ges_timeline_element)
+        self.__bind_child(ges_timeline_element)
+        self.__update_track_types()
         self.updatePosition()
 
     def _remove_child(self, ges_timeline_element):
@@ -1362,6 +1649,7 @@ class Clip(Gtk.EventBox, Zoomable, Loggable):
         self.__force_position_update = True
         self.__disconnectFromChild(ges_timeline_element)
         self._remove_child(ges_timeline_element)
+        self.__update_track_types()
         self.updatePosition()
 
 
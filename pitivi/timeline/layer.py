@@ -27,6 +27,7 @@ from gi.repository import Gtk
 from pitivi.timeline import elements
 from pitivi.undo.timeline import CommitTimelineFinalizingAction
 from pitivi.utils.loggable import Loggable
+from pitivi.utils.timeline import LayerClipsIndex
 from pitivi.utils.timeline import Zoomable
 from pitivi.utils.ui import LAYER_HEIGHT
 from pitivi.utils.ui import PADDING
@@ -232,7 +233,19 @@ class LayerControls(Gtk.EventBox, Loggable):
 
 
 class Layer(Gtk.Layout, Zoomable, Loggable):
-    """Container for the clips widgets of a layer."""
+    """Container for the clips widgets of a layer.
+
+    Only the clips close to the visible area of the timeline are shown
+    and have previewers, see `update_viewport`.
+
+    Attributes:
+        clips_index (LayerClipsIndex): The index of the clips of the layer,
+            for position and range queries.
+    """
+
+    # How far from the visible area the clips are still considered visible,
+    # in viewport sizes.
+    VIEWPORT_MARGIN = 1
 
     __gtype_name__ = "PitiviLayer"
 
@@ -246,8 +259,12 @@ class Layer(Gtk.Layout, Zoomable, Loggable):
         self.timeline = timeline
         self.app = timeline.app
 
+        self.clips_index = LayerClipsIndex(ges_layer)
         self._children = []
         self._changed = False
+        # The (start, end) interval of the timeline in which the clips are
+        # shown, or None if all of them should be shown.
+        self._viewport = None
 
         self.ges_layer.connect("clip-added", self._clipAddedCb)
         self.ges_layer.connect("clip-removed", self._clipRemovedCb)
@@ -289,6 +306,7 @@ class Layer(Gtk.Layout, Zoomable, Loggable):
             self._remove_clip(ges_clip)
         self.ges_layer.disconnect_by_func(self._clipAddedCb)
         self.ges_layer.disconnect_by_func(self._clipRemovedCb)
+        self.clips_index.release()
 
     def checkMediaTypes(self):
         if self.timeline.editing_context:
@@ -343,6 +361,7 @@ class Layer(Gtk.Layout, Zoomable, Loggable):
         widget.updatePosition()
         self._changed = True
         widget.show_all()
+        widget.set_visible(widget.in_viewport)
 
         ges_clip.connect_after("child-added", self._childAddedToClipCb)
         ges_clip.connect_after("child-removed", self._childRemovedFromClipCb)
@@ -372,10 +391,55 @@ class Layer(Gtk.Layout, Zoomable, Loggable):
         self.timeline.selection.unselect([ges_clip])
 
     def updatePosition(self):
+        self.update_viewport()
         for ges_clip in self.ges_layer.get_clips():
             if hasattr(ges_clip, "ui"):
                 ges_clip.ui.updatePosition()
 
+    def is_in_viewport(self, ges_clip):
+        """Checks whether the specified clip is close to the visible area.
+
+        Args:
+            ges_clip (GES.Clip): A clip of this layer.
+
+        Returns:
+            bool: Whether the clip should be shown.
+        """
+        if self._viewport is None:
+            return True
+
+        start, end = self._viewport
+        clip_start = ges_clip.props.start
+        return clip_start <= end and clip_start + ges_clip.props.duration >= start
+
+    def update_viewport(self):
+        """Shows the clips close to the visible area and hides the others."""
+        self._viewport = self._get_viewport()
+        for clip in self._children:
+            # Keep the selected clips so their keyframes and their position
+            # are updated properly when dragging them.
+            in_viewport = bool(clip.ges_clip.selected) or self.is_in_viewport(clip.ges_clip)
+            clip.set_in_viewport(in_viewport)
+
+    def _get_viewport(self):
+        hadj = self.timeline.hadj
+        vadj = self.timeline.vadj
+        if not hadj.props.page_size or not vadj.props.page_size:
+            # Not allocated yet.
+            return None
+
+        allocation = self.get_allocation()
+        margin = vadj.props.page_size * self.VIEWPORT_MARGIN
+        if allocation.y + allocation.height < vadj.props.value - margin or \
+                allocation.y > vadj.props.value + vadj.props.page_size + margin:
+            # The entire layer is far from the viewport.
+            return 0, -1
+
+        margin = hadj.props.page_size * self.VIEWPORT_MARGIN
+        start = self.pixelToNs(max(0, hadj.props.value - margin))
+        end = self.pixelToNs(hadj.props.value + hadj.props.page_size + margin)
+        return start, end
+
     def do_draw(self, cr):
         if self._changed:
             self._children.sort(key=lambda clip: clip.z_order)
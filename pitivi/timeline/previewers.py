@@ -35,6 +35,9 @@ from gi.repository import Gtk
 from pitivi.settings import get_dir
 from pitivi.settings import GlobalSettings
 from pitivi.settings import xdg_cache_home
+from pitivi.utils import loggable
+from pitivi.utils import tracing
+from pitivi.utils.loggable import Lazy
 from pitivi.utils.loggable import Loggable
 from pitivi.utils.misc import hash_file
 from pitivi.utils.misc import path_from_uri
@@ -42,7 +45,7 @@ from pitivi.utils.misc import quantize
 from pitivi.utils.misc import quote_uri
 from pitivi.utils.pipeline import MAX_BRINGING_TO_PAUSED_DURATION
 from pitivi.utils.proxy import get_proxy_target
-from pitivi.utils.system import CPUUsageTracker
+from pitivi.utils.system import SystemLoadSampler
 from pitivi.utils.timeline import Zoomable
 from pitivi.utils.ui import EXPANDED_SIZE
 
@@ -121,7 +124,8 @@ class ThumbnailBin(PreviewerBin):
         struct_name = struct.get_name()
         if struct_name == "pixbuf":
             stream_time = struct.get_value("stream-time")
-            self.log("%s new thumbnail %s", self.uri, stream_time)
+            if loggable.LOG_ENABLED:
+                self.log("%s new thumbnail %s", self.uri, stream_time)
             pixbuf = struct.get_value("pixbuf")
             self.thumb_cache[stream_time] = pixbuf
 
@@ -308,7 +312,10 @@ class PreviewGeneratorManager(Loggable):
             GES.TrackType.AUDIO: [],
             GES.TrackType.VIDEO: []
         }
+        # The tracing span of the current Previewer per GES.TrackType.
+        self._spans = {}
         self._running = True
+        self.__holding_load_sampler = False
 
     def add_previewer(self, previewer):
         """Adds the specified previewer to the queue.
@@ -328,9 +335,24 @@ class PreviewGeneratorManager(Loggable):
         else:
             self._previewers[track_type].insert(0, previewer)
 
+    def remove_previewer(self, previewer):
+        """Removes the specified previewer from the queue, if still waiting.
+
+        Args:
+            previewer (Previewer): The previewer being released.
+        """
+        previewers = self._previewers[previewer.track_type]
+        if previewer in previewers:
+            previewers.remove(previewer)
+
     def _start_previewer(self, previewer):
         self._current_previewers[previewer.track_type] = previewer
+        if tracing.is_enabled():
+            name = "waveform" if previewer.track_type == GES.TrackType.AUDIO else "thumbnails"
+            self._spans[previewer.track_type] = tracing.begin(
+                name, category="previewers", element=previewer.ges_elem.get_name())
         previewer.connect("done", self.__previewer_done_cb)
+        self.__update_load_sampler()
         previewer.start_generation()
 
     @contextlib.contextmanager
@@ -367,14 +389,25 @@ class PreviewGeneratorManager(Loggable):
 
     def __start_next_previewer(self, track_type):
         next_previewer = self._current_previewers.pop(track_type, None)
+        tracing.end(self._spans.pop(track_type, None))
         if next_previewer:
             next_previewer.disconnect_by_func(self.__previewer_done_cb)
 
-        if not self._running:
-            return
-
-        if self._previewers[track_type]:
+        if self._running and self._previewers[track_type]:
             self._start_previewer(self._previewers[track_type].pop())
+        else:
+            self.__update_load_sampler()
+
+    def __update_load_sampler(self):
+        """Samples the system load only while previews are generated."""
+        needed = bool(self._current_previewers)
+        if needed == self.__holding_load_sampler:
+            return
+        if needed:
+            SystemLoadSampler.get_default().hold()
+        else:
+            SystemLoadSampler.get_default().release()
+        self.__holding_load_sampler = needed
 
 
 class Previewer(Gtk.Layout):
@@ -460,7 +493,6 @@ class VideoPreviewer(Previewer, Zoomable, Loggable):
         self.pipeline = None
         self.gdkpixbufsink = None
 
-        self.cpu_usage_tracker = CPUUsageTracker()
         # Initial delay before generating the next thumbnail, in millis.
         self.interval = 500
 
@@ -530,16 +562,16 @@ class VideoPreviewer(Previewer, Zoomable, Loggable):
             self.stop_generation()
             return
 
-        usage_percent = self.cpu_usage_tracker.usage()
-        if usage_percent < self._max_cpu_usage:
+        load_sampler = SystemLoadSampler.get_default()
+        usage_percent = load_sampler.load.process
+        if usage_percent < load_sampler.get_cpu_budget(self._max_cpu_usage):
             self.interval *= 0.9
             self.log("Thumbnailing sped up to a %.1f ms interval for `%s`",
-                     self.interval, path_from_uri(self.uri))
+                     self.interval, Lazy(path_from_uri, self.uri))
         else:
             self.interval *= 1.1
             self.log("Thumbnailing slowed down to a %.1f ms interval for `%s`",
-                     self.interval, path_from_uri(self.uri))
-        self.cpu_usage_tracker.reset()
+                     self.interval, Lazy(path_from_uri, self.uri))
         self._thumb_cb_id = GLib.timeout_add(self.interval,
                                              self._create_next_thumb_cb,
                                              priority=GLib.PRIORITY_LOW)
@@ -554,7 +586,7 @@ class VideoPreviewer(Previewer, Zoomable, Loggable):
         self.__start_id = None
 
         if isinstance(self.ges_elem, GES.ImageSource):
-            self.debug("Generating thumbnail for image: %s", path_from_uri(self.uri))
+            self.debug("Generating thumbnail for image: %s", Lazy(path_from_uri, self.uri))
             self.__image_pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
                 Gst.uri_get_location(self.uri), -1, self.thumb_height, True)
             self.thumb_width = self.__image_pixbuf.props.width
@@ -569,7 +601,7 @@ class VideoPreviewer(Previewer, Zoomable, Loggable):
             # Update the thumbnails with what we already have, if anything.
             self._update_thumbnails()
             if self.queue:
-                self.debug("Generating thumbnails for video: %s, %s", path_from_uri(self.uri), self.queue)
+                self.debug("Generating thumbnails for video: %s, %s", Lazy(path_from_uri, self.uri), self.queue)
                 # When the pipeline status is set to PAUSED,
                 # the first thumbnail generation will be scheduled.
                 self._setup_pipeline()
@@ -741,7 +773,7 @@ class VideoPreviewer(Previewer, Zoomable, Loggable):
 
     def start_generation(self):
         self.debug("Waiting for UI to become idle for: %s",
-                   path_from_uri(self.uri))
+                   Lazy(path_from_uri, self.uri))
         self.__start_id = GLib.idle_add(self._start_thumbnailing_cb,
                                         priority=GLib.PRIORITY_LOW)
 
@@ -778,7 +810,10 @@ class VideoPreviewer(Previewer, Zoomable, Loggable):
 
     def release(self):
         """Stops preview generation and cleans the object."""
+        Previewer.manager.remove_previewer(self)
         self.stop_generation()
+        self.ges_elem.disconnect_by_func(self._inpoint_changed_cb)
+        self.ges_elem.disconnect_by_func(self._duration_changed_cb)
         Zoomable.__del__(self)
 
 
@@ -964,6 +999,8 @@ class AudioPreviewer(Previewer, Zoomable, Loggable):
 
         self.pipeline = None
         self._wavebin = None
+        # The GstCpuThrottlingClock of the pipeline.
+        self._clock = None
 
         self.ges_elem = ges_elem
 
@@ -1004,8 +1041,11 @@ class AudioPreviewer(Previewer, Zoomable, Loggable):
         # GstCpuThrottlingClock below.
         Gst.ElementFactory.make("uritranscodebin", None)
         clock = GObject.new(GObject.type_from_name("GstCpuThrottlingClock"))
-        clock.props.cpu_usage = self._max_cpu_usage
+        load_sampler = SystemLoadSampler.get_default()
+        clock.props.cpu_usage = load_sampler.get_cpu_budget(self._max_cpu_usage)
         self.pipeline.use_clock(clock)
+        self._clock = clock
+        load_sampler.connect("load-changed", self.__load_changed_cb)
         faked = self.pipeline.get_by_name("faked")
         faked.props.sync = True
         self._wavebin = self.pipeline.get_by_name("wave")
@@ -1123,7 +1163,14 @@ class AudioPreviewer(Previewer, Zoomable, Loggable):
 
         self.pipeline.set_state(Gst.State.PLAYING)
 
+    def __load_changed_cb(self, load_sampler):
+        self._clock.props.cpu_usage = load_sampler.get_cpu_budget(self._max_cpu_usage)
+
     def stop_generation(self):
+        if self._clock:
+            SystemLoadSampler.get_default().disconnect_by_func(self.__load_changed_cb)
+            self._clock = None
+
         if self.pipeline:
             self.pipeline.set_state(Gst.State.NULL)
             self.pipeline.get_bus().disconnect_by_func(self._busMessageCb)
@@ -1133,5 +1180,6 @@ class AudioPreviewer(Previewer, Zoomable, Loggable):
 
     def release(self):
         """Stops preview generation and cleans the object."""
+        Previewer.manager.remove_previewer(self)
         self.stop_generation()
         Zoomable.__del__(self)
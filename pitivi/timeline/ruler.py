@@ -88,6 +88,11 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
     Displays a series of consecutive intervals. For each interval its beginning
     time is shown. If zoomed in enough, shows the frames in alternate colors.
 
+    The background, ticks, frames and times are drawn in `pixbuf`, which is
+    kept as long as the zoom and the framerate do not change. When scrolling,
+    the contents are moved and only the exposed slice is drawn. The playhead
+    is drawn on top at every draw.
+
     Attributes:
         timeline (TimelineContainer): The timeline container used to handle
             scroll events.
@@ -109,10 +114,18 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
                         Gdk.EventMask.SCROLL_MASK)
 
         self.pixbuf = None
+        # The surface used for moving the contents of pixbuf when scrolling.
+        self.__back_pixbuf = None
+        # The (zoom ratio, framerate) for which pixbuf has been drawn.
+        self.__pixbuf_key = None
+        # The interval between the times, in pixels, when pixbuf was drawn.
+        self.__pixbuf_spacing = 0
 
         # all values are in pixels
         self.pixbuf_offset = 0
         self.pixbuf_offset_painted = 0
+        # The offset of the part of pixbuf being drawn.
+        self._painting_offset = 0
 
         self.position = 0  # In nanoseconds
         self.frame_rate = Gst.Fraction(1 / 1)
@@ -137,8 +150,19 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
         self._pipeline.connect('position', self.timelinePositionCb)
 
     def timelinePositionCb(self, unused_pipeline, position):
+        if position == self.position:
+            return
+        # Redraw only around the old and the new playhead.
+        self.__queue_draw_position()
         self.position = position
-        self.queue_draw()
+        self.__queue_draw_position()
+
+    def __queue_draw_position(self):
+        x = self.nsToPixel(self.position) - self.pixbuf_offset
+        # See drawPosition.
+        half_width = 4 + PLAYHEAD_WIDTH * 2
+        self.queue_draw_area(int(x) - half_width, 0, half_width * 2 + 1,
+                             self.get_allocated_height())
 
 # Gtk.Widget overrides
 
@@ -154,6 +178,8 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
 
         # Create a new buffer
         self.pixbuf = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        self.__back_pixbuf = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        self.__pixbuf_key = None
 
         context = self.app.gui.get_style_context()
 
@@ -176,20 +202,63 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
             self.info('No buffer to paint')
             return False
 
-        pixbuf = self.pixbuf
-
-        # Draw on a temporary context and then copy everything.
-        drawing_context = cairo.Context(pixbuf)
-        self.drawBackground(drawing_context)
-        self.drawRuler(drawing_context)
-        self.drawPosition(drawing_context)
-        pixbuf.flush()
+        self.__update_pixbuf()
 
         context.set_source_surface(self.pixbuf, 0.0, 0.0)
         context.paint()
+        self.drawPosition(context)
 
         return False
 
+    def __update_pixbuf(self):
+        """Updates the cached drawing of the ruler, without the playhead."""
+        width = self.pixbuf.get_width()
+        key = (Zoomable.zoomratio, self.frame_rate)
+        delta = self.pixbuf_offset - self.pixbuf_offset_painted
+        if key != self.__pixbuf_key or abs(delta) >= width or delta != int(delta):
+            self.__pixbuf_key = key
+            self.__draw_pixbuf_slice(0, width)
+        elif delta:
+            delta = int(delta)
+            # Move the contents which are still visible.
+            back_context = cairo.Context(self.__back_pixbuf)
+            back_context.set_operator(cairo.OPERATOR_SOURCE)
+            back_context.set_source_surface(self.pixbuf, -delta, 0)
+            back_context.paint()
+            self.pixbuf, self.__back_pixbuf = self.__back_pixbuf, self.pixbuf
+
+            # Draw the exposed slice, including the time label crossing
+            # its boundary, which is only partially drawn in the moved
+            # contents. The labels are narrower than the interval.
+            spacing = self.__pixbuf_spacing
+            if delta > 0:
+                # Start just before the interval where the slice starts,
+                # so the label of the interval is drawn entirely.
+                interval_start = (self.pixbuf_offset + width - delta) // spacing * spacing
+                start = max(0, int(interval_start - self.pixbuf_offset) - 1)
+                self.__draw_pixbuf_slice(start, width - start)
+            else:
+                self.__draw_pixbuf_slice(0, min(width, -delta + int(spacing) + 1))
+        self.pixbuf_offset_painted = self.pixbuf_offset
+
+    def __draw_pixbuf_slice(self, x, width):
+        if x == 0 and width == self.pixbuf.get_width():
+            surface = self.pixbuf
+        else:
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width,
+                                         self.pixbuf.get_height())
+        drawing_context = cairo.Context(surface)
+        self._painting_offset = self.pixbuf_offset + x
+        self.drawBackground(drawing_context)
+        self.drawRuler(drawing_context)
+        surface.flush()
+
+        if surface is not self.pixbuf:
+            context = cairo.Context(self.pixbuf)
+            context.set_operator(cairo.OPERATOR_SOURCE)
+            context.set_source_surface(surface, x, 0)
+            context.paint()
+
     def do_button_press_event(self, event):
         if not self._pipeline:
             return False
@@ -261,7 +330,8 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
         context.set_font_size(NORMAL_FONT_SIZE)
 
         spacing, interval_seconds, ticks = self._getSpacing(context)
-        offset = self.pixbuf_offset % spacing
+        self.__pixbuf_spacing = spacing
+        offset = self._painting_offset % spacing
         self.drawFrameBoundaries(context)
         self.drawTicks(context, offset, spacing, interval_seconds, ticks)
         self.drawTimes(context, offset, spacing, interval_seconds)
@@ -305,7 +375,7 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
     def drawTimes(self, context, offset, spacing, interval_seconds):
         # figure out what the optimal offset is
         interval = int(Gst.SECOND * interval_seconds)
-        current_time = self.pixelToNs(self.pixbuf_offset)
+        current_time = self.pixelToNs(self._painting_offset)
         paintpos = TIMES_LEFT_MARGIN_PIXELS
         if offset > 0:
             current_time = current_time - (current_time % interval) + interval
@@ -370,21 +440,21 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
         if not frame_width >= FRAME_MIN_WIDTH_PIXELS:
             return
 
-        offset = self.pixbuf_offset % frame_width
+        offset = self._painting_offset % frame_width
         height = context.get_target().get_height()
         y = int(height - FRAME_HEIGHT_PIXELS)
 
         frame_num = int(
-            self.pixelToNs(self.pixbuf_offset) * float(self.frame_rate) / Gst.SECOND)
-        paintpos = self.pixbuf_offset - offset
-        max_pos = context.get_target().get_width() + self.pixbuf_offset
+            self.pixelToNs(self._painting_offset) * float(self.frame_rate) / Gst.SECOND)
+        paintpos = self._painting_offset - offset
+        max_pos = context.get_target().get_width() + self._painting_offset
         while paintpos < max_pos:
             paintpos = self.nsToPixel(
                 1 / float(self.frame_rate) * Gst.SECOND * frame_num)
             if frame_num % 2:
                 set_cairo_color(context, self._color_frame)
                 context.rectangle(
-                    0.5 + paintpos - self.pixbuf_offset, y, frame_width, height)
+                    0.5 + paintpos - self._painting_offset, y, frame_width, height)
                 context.fill()
             frame_num += 1
 
@@ -394,7 +464,7 @@ class ScaleRuler(Gtk.DrawingArea, Zoomable, Loggable):
         This should be in sync with the playhead drawn by the timeline.
         See Timeline.__draw_playhead().
         """
-        height = self.pixbuf.get_height()
+        height = self.get_allocated_height()
 
         semi_width = 4
         semi_height = int(semi_width * 1.61803)
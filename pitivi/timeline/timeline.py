@@ -16,6 +16,7 @@
 # License along with this program; if not, write to the
 # Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
 # Boston, MA 02110-1301, USA.
+import bisect
 import os
 from gettext import gettext as _
 
@@ -68,6 +69,12 @@ from pitivi.utils.widgets import ZoomBox
 # Creates new layer if a clip is held at layers separator after this time interval
 SEPARATOR_ACCEPTING_DROP_INTERVAL_MS = 1000
 
+# The width of the areas along the edges of the timeline where dragging
+# a clip scrolls the timeline, in pixels.
+AUTOSCROLL_EDGE_WIDTH = 40
+# The scrolling speed when the pointer reaches the edge, in pixels per second.
+AUTOSCROLL_MAX_SPEED = 1500
+
 
 GlobalSettings.addConfigOption('edgeSnapDeadband',
                                section="user-interface",
@@ -112,6 +119,13 @@ GlobalSettings.addConfigOption("timelineAutoRipple",
                                key="timeline-autoripple",
                                default=False)
 
+# How many times per second the timeline is committed while dragging clips,
+# so the viewer shows the edit. Zero means only when the drag ends.
+GlobalSettings.addConfigOption("timelineDragCommitRate",
+                               section="user-interface",
+                               key="timeline-drag-commit-rate",
+                               default=5)
+
 
 class Marquee(Gtk.Box, Loggable):
     """Widget representing a selection area inside the timeline.
@@ -206,8 +220,8 @@ class LayersLayout(Gtk.Layout, Zoomable, Loggable):
 
         self._timeline = timeline
 
-        self.snap_position = 0
-        self.playhead_position = 0
+        self._snap_position = 0
+        self._playhead_position = 0
 
         self.layers_vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         self.layers_vbox.get_style_context().add_class("LayersBox")
@@ -218,6 +232,38 @@ class LayersLayout(Gtk.Layout, Zoomable, Loggable):
 
         self.layers_vbox.connect("size-allocate", self.__size_allocate_cb)
 
+    @property
+    def playhead_position(self):
+        return self._playhead_position
+
+    @playhead_position.setter
+    def playhead_position(self, position):
+        if position == self._playhead_position:
+            return
+        # Redraw only the columns of the old and the new playhead.
+        self.__queue_draw_vertical_bar(max(0, self._playhead_position), PLAYHEAD_WIDTH)
+        self._playhead_position = position
+        self.__queue_draw_vertical_bar(max(0, position), PLAYHEAD_WIDTH)
+
+    @property
+    def snap_position(self):
+        return self._snap_position
+
+    @snap_position.setter
+    def snap_position(self, position):
+        if position == self._snap_position:
+            return
+        self.__queue_draw_vertical_bar(self._snap_position, SNAPBAR_WIDTH)
+        self._snap_position = position
+        self.__queue_draw_vertical_bar(position, SNAPBAR_WIDTH)
+
+    def __queue_draw_vertical_bar(self, position, width):
+        x = self.nsToPixel(position) - self.get_hadjustment().get_value()
+        # The line is centered on x + 0.5, see __draw_vertical_bar. Include
+        # an extra pixel on each side for antialiasing.
+        left = int(x + 0.5 - width / 2) - 1
+        self.queue_draw_area(left, 0, int(width) + 3, self.get_allocated_height())
+
     def zoomChanged(self):
         # The width of the area/workspace changes when the zoom level changes.
         self.update_width()
@@ -273,6 +319,9 @@ class LayersLayout(Gtk.Layout, Zoomable, Loggable):
         # This triggers a renegotiation of the size, meaning
         # layers_vbox's "size-allocate" will be emitted, see __size_allocate_cb.
         self.layers_vbox.props.width_request = width
+        # Update the scrollable area right away, so the horizontal
+        # adjustment can be set to the new width before the allocation.
+        self.props.width = int(width)
 
     def __size_allocate_cb(self, unused_widget, allocation):
         """Sets the size of the scrollable area to fit the layers_vbox."""
@@ -349,12 +398,17 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
 
         # A list of (controls separator, layers separator) tuples.
         self._separators = []
+        # The layers positions, for finding the layer at a given y,
+        # see __get_layers_table.
+        self.__layers_table = None
         # Whether the user is dragging a layer.
         self.__moving_layer = None
 
         self._separator_accepting_drop = False
         self._separator_accepting_drop_id = 0
         self.__last_position = 0
+        # The (time, x) to keep in place when the zoom change is delivered.
+        self.__zoom_anchor = None
         self._scrubbing = False
         self._scrolling = False
         self.__next_seek_position = None
@@ -380,6 +434,16 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         self.__got_dragged = False
         # The x of the event which starts the drag operation.
         self.__drag_start_x = 0
+        # The latest pointer position of the drag operation, relative to the
+        # visible area of the layers. It is applied once per frame.
+        self.__drag_pointer = None
+        # Whether the pointer moved since the drag operation has been updated.
+        self.__drag_pointer_moved = False
+        self.__drag_tick_id = 0
+        # The time of the previous frame while autoscrolling, in microseconds.
+        self.__drag_frame_time = None
+        # The time of the last commit during the drag, in microseconds.
+        self.__drag_commit_time = 0
         # The current layer on which the operation is performed.
         self._on_layer = None
         # The separators immediately above or below _on_layer
@@ -414,6 +478,19 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         self.app.settings.connect("edgeSnapDeadbandChanged",
                                   self.__snap_distance_changed_cb)
 
+        # Show only the clips close to the visible area.
+        self.__viewport_update_id = 0
+        for adjustment in (self.hadj, self.vadj):
+            adjustment.connect("value-changed", self.__viewport_changed_cb)
+            adjustment.connect("notify::page-size", self.__viewport_changed_cb)
+        self.layout.layers_vbox.connect("size-allocate", self.__viewport_changed_cb)
+
+        # The clips whose position has to be updated on the next frame,
+        # in the order they changed. The values are not used.
+        self.__dirty_clips = {}
+        self.__position_tick_id = 0
+        self.layout.layers_vbox.connect("size-allocate", self.__layers_allocated_cb)
+
     @property
     def media_types(self):
         """Gets the media types present in the layers.
@@ -524,7 +601,6 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
 
         self.__last_position = position
         self.layout.playhead_position = position
-        self.layout.queue_draw()
         layout_width = self.layout.get_allocation().width
         x = self.nsToPixel(self.__last_position) - self.hadj.get_value()
         if pipeline.playing() and x > layout_width - 100:
@@ -535,7 +611,6 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
     def __snapping_started_cb(self, unused_timeline, unused_obj1, unused_obj2, position):
         """Handles a clip snap update operation."""
         self.layout.snap_position = position
-        self.layout.queue_draw()
 
     def __snapping_ended_cb(self, *unused_args):
         self.__end_snap()
@@ -543,7 +618,6 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
     def __end_snap(self):
         """Updates the UI to reflect the snap has ended."""
         self.layout.snap_position = 0
-        self.layout.queue_draw()
 
     def update_snapping_distance(self):
         """Updates the snapping distance of self.ges_timeline."""
@@ -610,10 +684,13 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         if event.get_state() & (Gdk.ModifierType.CONTROL_MASK |
                                 Gdk.ModifierType.MOD1_MASK):
             # Zoom.
-            x, unused_y = event_widget.translate_coordinates(self.layout.layers_vbox, event.x, event.y)
             # Figure out first where to scroll at the end.
-            if event.get_state() & Gdk.ModifierType.CONTROL_MASK:
+            if self.__zoom_anchor:
+                # The layout is not updated yet for the previous zoom steps.
+                position, unused_x = self.__zoom_anchor
+            elif event.get_state() & Gdk.ModifierType.CONTROL_MASK:
                 # The time at the mouse cursor.
+                x, unused_y = event_widget.translate_coordinates(self.layout.layers_vbox, event.x, event.y)
                 position = self.pixelToNs(x)
             else:
                 # The time at the playhead.
@@ -622,9 +699,10 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
                 Zoomable.zoomOut()
             else:
                 Zoomable.zoomIn()
-            # Scroll so position remains in place.
+            # Scroll so position remains in place, once the zoom change
+            # is delivered, see zoomChanged.
             x, unused_y = event_widget.translate_coordinates(self.layout, event.x, event.y)
-            self.hadj.set_value(self.nsToPixel(position) - x)
+            self.__zoom_anchor = (position, x)
             return False
 
         device = event.get_source_device() or event.device
@@ -663,15 +741,10 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         """
         sources = []
         for layer in self.ges_timeline.layers:
-            clips = layer.get_clips()
-            for clip in clips:
-                start = clip.get_start()
-                duration = clip.get_duration()
-                if start <= position <= duration + start:
-                    source = clip.find_track_element(None, GES.VideoSource)
-                    if source:
-                        sources.append(source)
-                    continue
+            for clip in layer.ui.clips_index.get_clips_at(position):
+                source = clip.find_track_element(None, GES.VideoSource)
+                if source:
+                    sources.append(source)
         return sources
 
     def update_visible_overlays(self):
@@ -727,6 +800,7 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         return False
 
     def _button_release_event_cb(self, unused_widget, event):
+        self.__flush_drag_update()
         allow_seek = not self.__got_dragged
 
         res, button = event.get_button()
@@ -810,7 +884,7 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         clips = set()
         for layer_pos in layers_pos:
             layer = layers[layer_pos]
-            clips.update(layer.get_clips_in_interval(start, end))
+            clips.update(layer.ui.clips_index.get_clips_in_interval(start, end))
 
         grouped_clips = set()
         # Also include those clips which are grouped with currently selected clips.
@@ -839,7 +913,7 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
             if self.got_dragged or self.__drag_start_x != event.x:
                 event_widget = Gtk.get_event_widget(event)
                 x, y = event_widget.translate_coordinates(self.layout.layers_vbox, event.x, event.y)
-                self.__drag_update(x, y)
+                self.__queue_drag_update(x, y)
                 self.got_dragged = True
         elif self.__moving_layer:
             event_widget = Gtk.get_event_widget(event)
@@ -888,6 +962,48 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         for ges_layer in self.ges_timeline.get_layers():
             ges_layer.ui.updatePosition()
 
+    def queue_position_update(self, clip):
+        """Schedules the update of the position of a clip.
+
+        The positions of the clips changed by an edit are updated in a
+        single pass at the next frame, so the layout is done only once.
+
+        Args:
+            clip (Clip): The clip whose position changed.
+        """
+        if not self.get_mapped():
+            # Nothing is displayed, no need to wait.
+            clip.updatePosition()
+            return
+
+        self.__dirty_clips[clip] = None
+        if not self.__position_tick_id:
+            self.__position_tick_id = self.add_tick_callback(self.__update_positions_tick_cb)
+
+    def __update_positions_tick_cb(self, unused_widget, unused_frame_clock):
+        self.__position_tick_id = 0
+        clips = self.__dirty_clips
+        self.__dirty_clips = {}
+        for clip in clips:
+            if clip.ges_clip.ui is clip:
+                # The clip has not been removed meanwhile.
+                clip.updatePosition()
+        return False
+
+    def __viewport_changed_cb(self, *unused_args):
+        if self.__viewport_update_id:
+            return
+        # Update before the next redraw.
+        self.__viewport_update_id = GLib.idle_add(self.__update_viewport_cb,
+                                                  priority=GLib.PRIORITY_HIGH_IDLE)
+
+    def __update_viewport_cb(self):
+        self.__viewport_update_id = 0
+        if self.ges_timeline:
+            for ges_layer in self.ges_timeline.get_layers():
+                ges_layer.ui.update_viewport()
+        return False
+
     def __create_clips(self, x, y):
         """Creates the clips for an asset drag operation.
 
@@ -1049,6 +1165,7 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
 
     def _add_layer(self, ges_layer):
         """Adds widgets for controlling and showing the specified layer."""
+        self.__layers_table = None
         layer = Layer(ges_layer, self)
         ges_layer.ui = layer
 
@@ -1093,6 +1210,7 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
             # Nothing to update.
             return
 
+        self.__layers_table = None
         priorities = [ges_layer.props.priority for ges_layer in ges_layers]
         if priorities != list(range(len(priorities))):
             self.debug("Layers still being shuffled, not updating widgets: %s", priorities)
@@ -1122,6 +1240,7 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
 
     def _remove_layer(self, ges_layer):
         self.info("Removing layer: %s", ges_layer.props.priority)
+        self.__layers_table = None
         self.layout.layers_vbox.remove(ges_layer.ui)
         self._layers_controls_vbox.remove(ges_layer.control_ui)
         ges_layer.disconnect_by_func(self.__layer_priority_changed_cb)
@@ -1146,6 +1265,8 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
 
     # Interface Zoomable
     def zoomChanged(self):
+        zoom_anchor = self.__zoom_anchor
+        self.__zoom_anchor = None
         if not self.ges_timeline:
             # Probably the app starts and there is no project/timeline yet.
             return
@@ -1155,6 +1276,13 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
 
         self.updatePosition()
 
+        if zoom_anchor:
+            position, x = zoom_anchor
+            # Update the width of the layout, otherwise the scroll value
+            # is clamped to the previous width.
+            self.layout.update_width()
+            self.hadj.set_value(self.nsToPixel(position) - x)
+
     def set_best_zoom_ratio(self, allow_zoom_in=False):
         """Sets the zoom level so that the entire timeline is in view."""
         duration = 0 if not self.ges_timeline else self.ges_timeline.get_duration()
@@ -1179,6 +1307,8 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
                 return
 
         Zoomable.setZoomLevel(nearest_zoom_level)
+        # Notify now, because the notification resets zoomed_fitted.
+        Zoomable.flush_zoom_changed()
         self.update_snapping_distance()
 
         # Only do this at the very end, after updating the other widgets.
@@ -1203,60 +1333,71 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
             return GES.EditMode.EDIT_TRIM
         return GES.EditMode.EDIT_NORMAL
 
+    def __layers_allocated_cb(self, unused_widget, unused_allocation):
+        self.__layers_table = None
+
+    def __get_layers_table(self):
+        """Gets the positions of the layers, computed only when they change.
+
+        Returns:
+            Tuple[List[GES.Layer], dict, List[int], List[int]]: The layers
+                sorted by priority, their indexes, the y of their tops
+                and the y of their bottoms.
+        """
+        if self.__layers_table is None:
+            ges_layers = self.ges_timeline.get_layers()
+            indexes = {ges_layer: i for i, ges_layer in enumerate(ges_layers)}
+            tops = []
+            bottoms = []
+            for ges_layer in ges_layers:
+                layer_rect = ges_layer.ui.get_allocation()
+                tops.append(layer_rect.y)
+                bottoms.append(layer_rect.y + layer_rect.height)
+            self.__layers_table = ges_layers, indexes, tops, bottoms
+        return self.__layers_table
+
     def _get_layer_at(self, y, prefer_ges_layer=None, past_middle_when_adjacent=False):
-        ges_layers = self.ges_timeline.get_layers()
-        if y < SEPARATOR_HEIGHT:
+        ges_layers, indexes, tops, bottoms = self.__get_layers_table()
+        # The last layer starting above y.
+        i = max(0, bisect.bisect_right(tops, y) - 1)
+        if y < SEPARATOR_HEIGHT or y < tops[i]:
             # The cursor is at the top, above the first layer.
             self.debug("Returning very first layer")
             ges_layer = ges_layers[0]
             separators = self._separators[0]
             return ges_layer, separators
 
+        ges_layer = ges_layers[i]
+        if y < bottoms[i]:
+            # The cursor is exactly on ges_layer.
+            if past_middle_when_adjacent:
+                # Check if far enough from prefer_ges_layer.
+                index_preferred = indexes[prefer_ges_layer]
+                height_preferred = bottoms[index_preferred] - tops[index_preferred]
+                delta = index_preferred - i
+                if (delta == 1 and y >= tops[i] + height_preferred) or \
+                        (delta == -1 and y < bottoms[i] - height_preferred):
+                    # ges_layer is adjacent to prefer_ges_layer, but the cursor
+                    # is not far enough to warrant a change.
+                    return prefer_ges_layer, []
+            return ges_layer, []
+
+        if i == len(ges_layers) - 1:
+            # The cursor is below the last layer.
+            self.debug("Returning very last layer")
+            return ges_layer, self._separators[i + 1]
+
+        # The cursor is between this layer and the one below.
         # This means if an asset is dragged directly on a separator,
         # it will prefer the layer below the separator, if any.
         # Otherwise, it helps choosing a layer as close to prefer_ges_layer
-        # as possible when having an option (y is between two layers).
-        prefer_after = True
-
-        if past_middle_when_adjacent:
-            index_preferred = prefer_ges_layer.get_priority()
-            height_preferred = prefer_ges_layer.ui.get_allocation().height
-
-        for i, ges_layer in enumerate(ges_layers):
-            layer_rect = ges_layer.ui.get_allocation()
-            layer_y = layer_rect.y
-            layer_height = layer_rect.height
-            if layer_y <= y < layer_y + layer_height:
-                # The cursor is exactly on ges_layer.
-                if past_middle_when_adjacent:
-                    # Check if far enough from prefer_ges_layer.
-                    delta = index_preferred - ges_layer.get_priority()
-                    if (delta == 1 and y >= layer_y + height_preferred) or \
-                            (delta == -1 and y < layer_y + layer_height - height_preferred):
-                        # ges_layer is adjacent to prefer_ges_layer, but the cursor
-                        # is not far enough to warrant a change.
-                        return prefer_ges_layer, []
-                return ges_layer, []
-
-            # Check if there are more layers.
-            try:
-                next_ges_layer = ges_layers[i + 1]
-            except IndexError:
-                # Nope, the cursor is below the last layer.
-                self.debug("Returning very last layer")
-                return ges_layer, self._separators[i + 1]
-
-            if ges_layer == prefer_ges_layer:
-                # Choose a layer as close to prefer_ges_layer as possible.
-                prefer_after = False
-
-            if layer_y + layer_height <= y < next_ges_layer.ui.get_allocation().y:
-                # The cursor is between this layer and the one below.
-                if prefer_after:
-                    ges_layer = next_ges_layer
-                separators = self._separators[i + 1]
-                self.debug("Returning layer %s, separators: %s", ges_layer, separators)
-                return ges_layer, separators
+        # as possible when having an option.
+        prefer_after = indexes.get(prefer_ges_layer, len(ges_layers)) > i
+        if prefer_after:
+            ges_layer = ges_layers[i + 1]
+        separators = self._separators[i + 1]
+        self.debug("Returning layer %s, separators: %s", ges_layer, separators)
+        return ges_layer, separators
 
     def _setSeparatorsPrelight(self, light):
         for sep in self.__on_separators:
@@ -1265,6 +1406,122 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
             else:
                 unset_children_state_recurse(sep, Gtk.StateFlags.PRELIGHT)
 
+    def __queue_drag_update(self, x, y):
+        """Schedules the update of a clip drag operation at the next frame.
+
+        Only the latest pointer position is applied, no matter how many
+        motion events are received during a frame.
+
+        Args:
+            x (int): The x coordinate relative to the layers box.
+            y (int): The y coordinate relative to the layers box.
+        """
+        self.__drag_pointer = (x - self.hadj.get_value(), y - self.vadj.get_value())
+        self.__drag_pointer_moved = True
+        if not self.get_mapped():
+            # Nothing is displayed, no need to wait.
+            self.__apply_drag_update()
+            return
+
+        if not self.__drag_tick_id:
+            self.__drag_frame_time = None
+            self.__drag_tick_id = self.add_tick_callback(self.__drag_tick_cb)
+
+    def __apply_drag_update(self):
+        self.__drag_pointer_moved = False
+        view_x, view_y = self.__drag_pointer
+        self.__drag_update(view_x + self.hadj.get_value(), view_y + self.vadj.get_value())
+        self.__commit_drag()
+
+    def __flush_drag_update(self):
+        """Applies the pending drag update, if any."""
+        if self.__drag_tick_id:
+            self.remove_tick_callback(self.__drag_tick_id)
+            self.__drag_tick_id = 0
+        if self.__drag_pointer_moved:
+            self.__apply_drag_update()
+
+    def __drag_tick_cb(self, unused_widget, frame_clock):
+        if not self.draggingElement:
+            self.__drag_tick_id = 0
+            return False
+
+        scrolling = self.__autoscroll(frame_clock.get_frame_time())
+        if self.__drag_pointer_moved:
+            self.__apply_drag_update()
+
+        if not scrolling:
+            self.__drag_tick_id = 0
+        return scrolling
+
+    def __autoscroll(self, frame_time):
+        """Scrolls the timeline when dragging close to its edges.
+
+        Args:
+            frame_time (int): The time of the frame, in microseconds.
+
+        Returns:
+            bool: Whether the timeline has to be scrolled further.
+        """
+        elapsed = 0
+        if self.__drag_frame_time is not None:
+            elapsed = (frame_time - self.__drag_frame_time) / 1000000
+        self.__drag_frame_time = frame_time
+
+        scrolling = False
+        for adjustment, position in zip((self.hadj, self.vadj), self.__drag_pointer):
+            speed = self.__get_autoscroll_speed(position, adjustment.props.page_size)
+            value = adjustment.get_value()
+            if speed < 0:
+                can_scroll = value > adjustment.props.lower
+            elif speed > 0:
+                can_scroll = value < adjustment.props.upper - adjustment.props.page_size
+            else:
+                can_scroll = False
+            if not can_scroll:
+                continue
+
+            scrolling = True
+            adjustment.set_value(value + speed * elapsed)
+            if adjustment.get_value() != value:
+                # The clip has to follow the scrolled content.
+                self.__drag_pointer_moved = True
+        return scrolling
+
+    @staticmethod
+    def __get_autoscroll_speed(position, page_size):
+        """Gets the autoscroll speed for a pointer position on an axis.
+
+        Args:
+            position (float): The position relative to the visible area.
+            page_size (float): The size of the visible area.
+
+        Returns:
+            float: The speed in pixels per second, negative towards start.
+        """
+        if page_size <= 2 * AUTOSCROLL_EDGE_WIDTH:
+            return 0
+        if position < AUTOSCROLL_EDGE_WIDTH:
+            depth = position - AUTOSCROLL_EDGE_WIDTH
+        elif position > page_size - AUTOSCROLL_EDGE_WIDTH:
+            depth = position - (page_size - AUTOSCROLL_EDGE_WIDTH)
+        else:
+            return 0
+        ratio = max(-1, min(depth / AUTOSCROLL_EDGE_WIDTH, 1))
+        return ratio * AUTOSCROLL_MAX_SPEED
+
+    def __commit_drag(self):
+        """Commits the timeline during the drag, at the configured rate."""
+        rate = self.app.settings.timelineDragCommitRate
+        if rate <= 0 or not self.editing_context:
+            return
+
+        now = GLib.get_monotonic_time()
+        if now - self.__drag_commit_time < 1000000 / rate:
+            return
+        self.__drag_commit_time = now
+        self._project.pipeline.commit_timeline()
+
     def __drag_update(self, x, y):
         """Updates a clip or asset drag operation.
 
@@ -1340,6 +1597,8 @@ class Timeline(Gtk.EventBox, Zoomable, Loggable):
         return new_ges_layer
 
     def dragEnd(self):
+        self.__flush_drag_update()
+        self.__drag_pointer = None
         if self.editing_context:
             self.__end_snap()
 
@@ -1776,9 +2035,9 @@ class TimelineContainer(Gtk.Grid, Zoomable, Loggable):
 
                     # check if any other clips occur during that period
                     for layer in self.ges_timeline.layers:
-                        for clip in layer.get_clips():
-                            clip_end = clip.start + clip.duration
-                            if clip_end > start and clip.start < end:
+                        for clip in layer.ui.clips_index.get_clips_in_interval(start, end):
+                            # Touching the period does not count.
+                            if clip.start < end and clip.start + clip.duration > start:
                                 found_overlapping = True
                                 break
                         if found_overlapping:
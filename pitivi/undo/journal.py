@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Journal of the committed operations, for crash recovery."""
+import os
+
+from gi.repository import Gst
+
+from pitivi.utils.loggable import Loggable
+from pitivi.utils.misc import path_from_uri
+
+BASE_URI_PREFIX = "# base-uri: "
+
+
+class UndoJournal(Loggable):
+    """Appends the committed operations to a file, for crash recovery.
+
+    The operations are written as the scenario actions recorded while they
+    were being done, so the state of the project can be recovered by
+    replaying the journal on top of the project file it is based on.
+
+    Attributes:
+        path (str): The path of the journal file.
+        action_log (UndoableActionLog): The log providing the operations.
+        base_uri (str): The URI of the project file the journal applies to.
+        complete (bool): Whether all the operations since the last reset
+            could be journaled. When False, a full backup is needed.
+        entries (int): The number of operations written since the last reset.
+    """
+
+    def __init__(self, path, action_log):
+        Loggable.__init__(self)
+        self.path = path
+        self.action_log = action_log
+        self.base_uri = None
+        self.complete = False
+        self.entries = 0
+
+        self._file = None
+        # The scenario actions of the operation being recorded.
+        self._pending = []
+        # The journaled operations, as written in the file.
+        self._entries = []
+        # How many times operations could not be journaled.
+        self._losses = 0
+
+        action_log.connect("pre-push", self._action_log_pre_push_cb)
+        action_log.connect("commit", self._action_log_commit_cb)
+        action_log.connect("rollback", self._action_log_rollback_cb)
+        action_log.connect("move", self._action_log_move_cb)
+
+    def release(self, remove=True):
+        """Stops journaling.
+
+        Args:
+            remove (Optional[bool]): Whether to remove the journal file.
+        """
+        self.action_log.disconnect_by_func(self._action_log_pre_push_cb)
+        self.action_log.disconnect_by_func(self._action_log_commit_cb)
+        self.action_log.disconnect_by_func(self._action_log_rollback_cb)
+        self.action_log.disconnect_by_func(self._action_log_move_cb)
+        self._close()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+            self.debug("Removed journal: %s", self.path)
+
+    def reset(self, base_uri, mark=None):
+        """Starts a new journal based on the specified project file.
+
+        Args:
+            base_uri (str): The URI of the project file just saved.
+            mark (Optional[object]): The value returned by `mark` when the
+                state of the project has been saved in the file. The
+                operations journaled afterwards are kept. If some could not
+                be journaled, the journal stays incomplete.
+        """
+        self._close()
+        self.base_uri = base_uri
+        self._pending = []
+        kept_entries = []
+        lost = False
+        if mark is not None:
+            entries_count, losses = mark
+            kept_entries = self._entries[entries_count:]
+            lost = self._losses != losses
+        self._entries = []
+        try:
+            self._file = open(self.path, "w")
+            self._file.write(BASE_URI_PREFIX + base_uri + "\n")
+            self._file.flush()
+        except OSError as e:
+            self.warning("Cannot write journal %s: %s", self.path, e)
+            self._file = None
+        self.complete = self._file is not None and not lost
+        self.entries = 0
+        for entry in kept_entries:
+            self._write(entry)
+
+    def mark(self):
+        """Gets a value identifying the current position in the journal."""
+        return len(self._entries), self._losses
+
+    def record(self, structure):
+        """Records a scenario action describing the current operation.
+
+        Args:
+            structure (Gst.Structure): The scenario action.
+        """
+        if not self.action_log.is_in_transaction():
+            # Not part of an undoable operation, for example a seek.
+            return
+        self._pending.append(structure.to_string())
+
+    def _close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _lose(self):
+        """Marks the journal as not enough for recovering the project."""
+        self.complete = False
+        self._losses += 1
+
+    def _action_log_pre_push_cb(self, action_log, action):
+        if action_log.running or not action_log.is_in_transaction():
+            return
+        try:
+            action.asScenarioAction()
+        except NotImplementedError:
+            # The operation would be only partially journaled.
+            self.debug("Action %s cannot be journaled", action)
+            self._lose()
+
+    def _action_log_commit_cb(self, action_log, stack):
+        if action_log.is_in_transaction():
+            # Wait for the toplevel operation to be committed.
+            return
+
+        lines = self._pending
+        self._pending = []
+        if not self.complete:
+            self._lose()
+            return
+
+        if not lines:
+            self.debug("Operation %s cannot be journaled", stack.action_group_name)
+            self._lose()
+            return
+
+        lines.insert(0, "# %s" % stack.action_group_name)
+        self._write("\n".join(lines) + "\n")
+
+    def _write(self, entry):
+        if not self.complete:
+            return
+        try:
+            self._file.write(entry)
+            self._file.flush()
+        except OSError as e:
+            self.warning("Cannot write journal %s: %s", self.path, e)
+            self._lose()
+            return
+        self._entries.append(entry)
+        self.entries += 1
+
+    def _action_log_rollback_cb(self, action_log, unused_stack):
+        if not action_log.is_in_transaction():
+            self._pending = []
+
+    def _action_log_move_cb(self, unused_action_log, unused_stack):
+        # Undoing and redoing cannot be expressed as scenario actions.
+        self._lose()
+
+
+def read_journal(path):
+    """Reads a journal file.
+
+    Args:
+        path (str): The path of the journal file.
+
+    Returns:
+        Tuple[str, List[str]]: The URI of the project file the journal
+            applies to and the serialized scenario actions, or (None, [])
+            if the journal does not exist or is invalid.
+    """
+    try:
+        with open(path) as journal:
+            lines = journal.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return None, []
+
+    if not lines or not lines[0].startswith(BASE_URI_PREFIX):
+        return None, []
+    base_uri = lines[0][len(BASE_URI_PREFIX):]
+    actions = [line for line in lines[1:] if line and not line.startswith("#")]
+    return base_uri, actions
+
+
+def create_recovery_scenario(journal_path, scenario_path):
+    """Writes a scenario recreating the project state described by a journal.
+
+    Args:
+        journal_path (str): The path of the journal file.
+        scenario_path (str): The path of the scenario file to be written.
+
+    Returns:
+        bool: Whether the scenario has been written.
+    """
+    base_uri, actions = read_journal(journal_path)
+    if not actions:
+        return False
+
+    try:
+        with open(path_from_uri(base_uri)) as project:
+            content = project.read().replace("\n", "")
+    except OSError:
+        return False
+
+    load_project = Gst.Structure.new_empty("load-project")
+    load_project["serialized-content"] = content
+    with open(scenario_path, "w") as scenario:
+        scenario.write("description, seek=true, handles-states=true\n")
+        scenario.write(load_project.to_string() + "\n")
+        scenario.write("\n".join(actions) + "\n")
+    return True
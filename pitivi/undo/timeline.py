@@ -21,7 +21,6 @@ from gi.repository import GObject
 from gi.repository import Gst
 from gi.repository import GstController
 
-from pitivi.effects import PROPS_TO_IGNORE
 from pitivi.undo.undo import Action
 from pitivi.undo.undo import FinalizingAction
 from pitivi.undo.undo import GObjectObserver
@@ -29,6 +28,7 @@ from pitivi.undo.undo import MetaContainerObserver
 from pitivi.undo.undo import UndoableAction
 from pitivi.undo.undo import UndoableAutomaticObjectAction
 from pitivi.utils.loggable import Loggable
+from pitivi.utils.widgets import PROPS_TO_IGNORE
 
 
 TRANSITION_PROPS = ["border", "invert", "transition-type"]
@@ -69,6 +69,17 @@ class TrackElementPropertyChanged(UndoableAction):
         self.track_element.set_child_property(
             self.property_name, self.old_value)
 
+    def expand(self, action):
+        if not isinstance(action, TrackElementPropertyChanged) or \
+                self.track_element != action.track_element or \
+                self.property_name != action.property_name:
+            return False
+        self.new_value = action.new_value
+        return True
+
+    def coalesce_key(self):
+        return (TrackElementPropertyChanged, self.track_element, self.property_name)
+
     def asScenarioAction(self):
         st = Gst.Structure.new_empty("set-child-property")
         st['element-name'] = self.track_element.get_name()
@@ -241,9 +252,10 @@ class ControlSourceObserver(GObject.Object):
         self.action_info = action_info
         self.control_source = control_source
 
+        # The values of the keyframes, by timestamp.
         self.keyframes = {}
         for keyframe in self.control_source.get_all():
-            self.keyframes[keyframe.timestamp] = (keyframe.timestamp, keyframe.value)
+            self.keyframes[keyframe.timestamp] = keyframe.value
 
         control_source.connect("value-added", self._keyframe_added_cb)
         control_source.connect("value-changed", self._keyframe_moved_cb)
@@ -256,18 +268,17 @@ class ControlSourceObserver(GObject.Object):
         self.control_source = None
 
     def _keyframe_added_cb(self, control_source, keyframe):
-        self.keyframes[keyframe.timestamp] = (keyframe.timestamp, keyframe.value)
+        self.keyframes[keyframe.timestamp] = keyframe.value
 
         action = KeyframeAddedAction(control_source, keyframe, self.action_info)
         self.action_log.push(action)
 
     def _keyframe_moved_cb(self, control_source, keyframe):
-        old_snapshot = self.keyframes[keyframe.timestamp]
-        new_snapshot = (keyframe.timestamp, keyframe.value)
-        self.keyframes[keyframe.timestamp] = new_snapshot
+        old_value = self.keyframes[keyframe.timestamp]
+        self.keyframes[keyframe.timestamp] = keyframe.value
 
-        action = KeyframeChangedAction(control_source,
-                                       old_snapshot, new_snapshot)
+        deltas = {keyframe.timestamp: (old_value, keyframe.value)}
+        action = KeyframeChangedAction(control_source, deltas)
         self.action_log.push(action)
 
     def _keyframe_removed_cb(self, control_source, keyframe):
@@ -581,22 +592,46 @@ class KeyframeRemovedAction(UndoableAction):
 
 
 class KeyframeChangedAction(UndoableAction):
+    """Changes the values of some of the keyframes of a control source.
+
+    Only the changed keyframes are stored, no matter how many keyframes
+    the control source has.
 
-    def __init__(self, control_source, old_snapshot, new_snapshot):
+    Attributes:
+        control_source (GstController.TimedValueControlSource): The object
+            holding the keyframes.
+        deltas (dict): The (old_value, new_value) tuples of the changed
+            keyframes, by timestamp.
+    """
+
+    def __init__(self, control_source, deltas):
         UndoableAction.__init__(self)
         self.control_source = control_source
-        self.old_snapshot = old_snapshot
-        self.new_snapshot = new_snapshot
+        self.deltas = deltas
+
+    def __repr__(self):
+        return "<KeyframeChangedAction %s: %s>" % (self.control_source, self.deltas)
 
     def do(self):
-        self._applySnapshot(self.new_snapshot)
+        for timestamp, (unused_old_value, new_value) in self.deltas.items():
+            self.control_source.set(timestamp, new_value)
 
     def undo(self):
-        self._applySnapshot(self.old_snapshot)
+        for timestamp, (old_value, unused_new_value) in self.deltas.items():
+            self.control_source.set(timestamp, old_value)
 
-    def _applySnapshot(self, snapshot):
-        time, value = snapshot
-        self.control_source.set(time, value)
+    def expand(self, action):
+        if not isinstance(action, KeyframeChangedAction) or \
+                self.control_source != action.control_source:
+            return False
+        for timestamp, (old_value, new_value) in action.deltas.items():
+            if timestamp in self.deltas:
+                old_value = self.deltas[timestamp][0]
+            self.deltas[timestamp] = (old_value, new_value)
+        return True
+
+    def coalesce_key(self):
+        return (KeyframeChangedAction, self.control_source)
 
 
 class ControlSourceSetAction(UndoableAction):
@@ -653,6 +688,10 @@ class ControlSourceRemoveAction(UndoableAction):
 class LayerObserver(MetaContainerObserver, Loggable):
     """Monitors a Layer and reports UndoableActions.
 
+    The clips added while undoing or redoing are observed only after the
+    undo or redo ends, in a single batch, because the changes done meanwhile
+    are not recorded anyway.
+
     Args:
         ges_layer (GES.Layer): The layer to observe.
 
@@ -663,6 +702,7 @@ class LayerObserver(MetaContainerObserver, Loggable):
     def __init__(self, ges_layer, action_log):
         MetaContainerObserver.__init__(self, ges_layer, action_log)
         Loggable.__init__(self)
+        self.ges_layer = ges_layer
         self.action_log = action_log
         self.priority = ges_layer.props.priority
 
@@ -673,9 +713,35 @@ class LayerObserver(MetaContainerObserver, Loggable):
         ges_layer.connect("clip-removed", self._clipRemovedCb)
         ges_layer.connect("notify::priority", self.__layer_moved_cb)
 
+        # The clips waiting for the current undo or redo to end, in order.
+        self._pending_clips = {}
+        action_log.connect("move", self.__action_log_moved_cb)
+
         self.clip_observers = {}
         for ges_clip in ges_layer.get_clips():
+            self._attach_to_clip(ges_clip)
+
+    def _attach_to_clip(self, ges_clip):
+        """Observes the clip now or when the current undo or redo ends."""
+        if not isinstance(ges_clip, GES.TransitionClip) and self.action_log.running:
+            self._pending_clips[ges_clip] = None
+            return
+        self._connectToClip(ges_clip)
+
+    def _attach_pending_clips(self):
+        """Observes the clips added during the undo or redo which ended."""
+        pending_clips = self._pending_clips
+        self._pending_clips = {}
+        for ges_clip in pending_clips:
+            if ges_clip.props.layer != self.ges_layer:
+                # Removed in the meanwhile.
+                continue
             self._connectToClip(ges_clip)
+        self.debug("Attached to %d clips", len(pending_clips))
+
+    def __action_log_moved_cb(self, unused_action_log, unused_stack):
+        if self._pending_clips:
+            self._attach_pending_clips()
 
     def _connectToClip(self, ges_clip):
         ges_clip.connect("child-added", self._clipTrackElementAddedCb)
@@ -764,14 +830,17 @@ class LayerObserver(MetaContainerObserver, Loggable):
         observer.release()
 
     def _clipAddedCb(self, layer, clip):
-        self._connectToClip(clip)
+        self._attach_to_clip(clip)
         if isinstance(clip, GES.TransitionClip):
             return
         action = ClipAdded(layer, clip)
         self.action_log.push(action)
 
     def _clipRemovedCb(self, layer, clip):
-        self._disconnectFromClip(clip)
+        if clip in self._pending_clips:
+            del self._pending_clips[clip]
+        else:
+            self._disconnectFromClip(clip)
         if isinstance(clip, GES.TransitionClip):
             action = TransitionClipRemovedAction.new(layer, clip)
             if action:
@@ -18,12 +18,56 @@
 # Boston, MA 02110-1301, USA.
 """Undo/redo."""
 import contextlib
+import sys
+import time
 
 from gi.repository import GObject
 
+from pitivi.settings import GlobalSettings
+from pitivi.utils import tracing
 from pitivi.utils.loggable import Loggable
 
 
+GlobalSettings.addConfigSection("undo")
+GlobalSettings.addConfigOption("undoMaxDepth",
+                               section="undo",
+                               key="max-depth",
+                               environment="PITIVI_UNDO_MAX_DEPTH",
+                               default=1000)
+GlobalSettings.addConfigOption("undoMaxBytes",
+                               section="undo",
+                               key="max-bytes",
+                               environment="PITIVI_UNDO_MAX_BYTES",
+                               default=64 * 1024 * 1024)
+GlobalSettings.addConfigOption("undoCoalesceInterval",
+                               section="undo",
+                               key="coalesce-interval",
+                               default=0.5)
+
+
+def estimate_size(obj):
+    """Estimates the memory used by an object and its direct attributes.
+
+    The estimation is shallow: containers held by the object are counted
+    together with their items, but the items are not inspected further.
+
+    Args:
+        obj (object): The object to be measured.
+
+    Returns:
+        int: The approximate size in bytes.
+    """
+    size = sys.getsizeof(obj)
+    for value in getattr(obj, "__dict__", {}).values():
+        size += sys.getsizeof(value)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(sys.getsizeof(item) for item in value)
+        elif isinstance(value, dict):
+            size += sum(sys.getsizeof(key) + sys.getsizeof(item)
+                        for key, item in value.items())
+    return size
+
+
 class UndoError(Exception):
     """Base class for undo/redo exceptions."""
     pass
@@ -70,6 +114,18 @@ class UndoableAction(Action):
         """
         return False
 
+    def coalesce_key(self):
+        """Gets the identity of the state changed by the action.
+
+        Two consecutive operations made of actions with the same keys, in the
+        same order, are merged into a single operation by expanding the
+        actions of the first with the actions of the second.
+
+        Returns:
+            object: A hashable key, or None if the action cannot be coalesced.
+        """
+        return None
+
 
 class UndoableAutomaticObjectAction(UndoableAction):
     """An action on an automatically created object.
@@ -122,6 +178,8 @@ class UndoableActionStack(UndoableAction):
             the stack.
         finalizing_action (FinalizingAction): The action to be performed
             at the end of undoing or redoing the stacked actions.
+        generation (int): The generation assigned by the UndoableActionLog
+            when the stack has been committed or modified last time.
     """
 
     def __init__(self, action_group_name, finalizing_action=None):
@@ -129,6 +187,8 @@ class UndoableActionStack(UndoableAction):
         self.action_group_name = action_group_name
         self.done_actions = []
         self.finalizing_action = finalizing_action
+        self.generation = 0
+        self.__size = None
 
     def __repr__(self):
         return "%s: %s" % (self.action_group_name, self.done_actions)
@@ -138,8 +198,57 @@ class UndoableActionStack(UndoableAction):
             last_action = self.done_actions[-1]
             if last_action.expand(action):
                 # The action has been included in the previous one.
+                self.__size = None
                 return
         self.done_actions.append(action)
+        self.__size = None
+
+    def size(self):
+        """Gets the approximate memory used by the stacked actions, in bytes."""
+        if self.__size is None:
+            size = estimate_size(self)
+            for action in self.done_actions:
+                if isinstance(action, UndoableActionStack):
+                    size += action.size()
+                else:
+                    size += estimate_size(action)
+            self.__size = size
+        return self.__size
+
+    def coalesce_keys(self):
+        """Gets the coalesce keys of the stacked actions.
+
+        Returns:
+            List[object]: The keys, or None if any action cannot be coalesced.
+        """
+        keys = []
+        for action in self.done_actions:
+            key = action.coalesce_key()
+            if key is None:
+                return None
+            keys.append(key)
+        return keys
+
+    def coalesce(self, stack):
+        """Merges the specified stack if it changes the same state.
+
+        Args:
+            stack (UndoableActionStack): The stack committed after this one.
+
+        Returns:
+            bool: Whether the stack has been merged in this one.
+        """
+        if stack.action_group_name != self.action_group_name:
+            return False
+        keys = self.coalesce_keys()
+        if not keys or keys != stack.coalesce_keys():
+            return False
+        for action, new_action in zip(self.done_actions, stack.done_actions):
+            if not action.expand(new_action):
+                # Should not happen, the actions agreed on the keys.
+                raise UndoError("Failed coalescing %s into %s" % (new_action, action))
+        self.__size = None
+        return True
 
     def _run_action(self, actions, method_name):
         for action in actions:
@@ -163,6 +272,21 @@ class UndoableActionLog(GObject.Object, Loggable):
     """The undo/redo manager.
 
     A separate instance should be created for each Project instance.
+
+    The history is bounded: when the number of operations exceeds `max_depth`
+    or their estimated memory exceeds `max_bytes`, the oldest operations are
+    forgotten. Consecutive operations with the same name which change the same
+    properties are coalesced when committed less than `coalesce_interval`
+    seconds apart.
+
+    Attributes:
+        max_depth (int): The max number of undoable operations, 0 for no limit.
+        max_bytes (int): The max estimated size of the history in bytes,
+            0 for no limit.
+        coalesce_interval (float): The max interval in seconds between
+            operations which can be coalesced, 0 to disable coalescing.
+        history_size (int): The estimated size of the undo and redo stacks,
+            in bytes.
     """
 
     __gsignals__ = {
@@ -174,15 +298,27 @@ class UndoableActionLog(GObject.Object, Loggable):
         "move": (GObject.SignalFlags.RUN_LAST, None, (object,)),
     }
 
-    def __init__(self):
+    def __init__(self, max_depth=0, max_bytes=0, coalesce_interval=0):
         GObject.Object.__init__(self)
         Loggable.__init__(self)
 
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+        self.coalesce_interval = coalesce_interval
+
         self.undo_stacks = []
         self.redo_stacks = []
         self.stacks = []
         self.running = False
-        self._checkpoint = self._takeSnapshot()
+        self.history_size = 0
+        # The last generation assigned to a committed stack.
+        self._generation = 0
+        # The generation of the state before the oldest undoable stack.
+        self._base_generation = 0
+        # The latest committed stack, as long as it can be coalesced.
+        self._last_committed_stack = None
+        self._last_commit_time = 0
+        self._checkpoint = self._current_generation()
 
     @contextlib.contextmanager
     def started(self, action_group_name, **kwargs):
@@ -285,12 +421,14 @@ class UndoableActionLog(GObject.Object, Loggable):
             self.debug("Ignore empty stack %s", stack.action_group_name)
             return
         if not self.stacks:
-            self.undo_stacks.append(stack)
+            self._push_undo_stack(stack)
             stack.finish_operation()
         else:
             self.stacks[-1].push(stack)
 
         if self.redo_stacks:
+            for redo_stack in self.redo_stacks:
+                self.history_size -= redo_stack.size()
             self.redo_stacks = []
 
         self.debug("commit action group %s nested %s",
@@ -306,8 +444,10 @@ class UndoableActionLog(GObject.Object, Loggable):
 
         stack = self.undo_stacks.pop(-1)
         self.debug("Undo %s", stack)
-        self._run(stack.undo)
+        with tracing.span("undo", action_group=stack.action_group_name):
+            self._run(stack.undo)
         self.redo_stacks.append(stack)
+        self._last_committed_stack = None
         self.emit("move", stack)
 
     def redo(self):
@@ -319,22 +459,60 @@ class UndoableActionLog(GObject.Object, Loggable):
 
         stack = self.redo_stacks.pop(-1)
         self.debug("Redo %s", stack)
-        self._run(stack.do)
+        with tracing.span("redo", action_group=stack.action_group_name):
+            self._run(stack.do)
         self.undo_stacks.append(stack)
+        self._last_committed_stack = None
         self.emit("move", stack)
 
-    def _takeSnapshot(self):
-        return list(self.undo_stacks)
+    def _push_undo_stack(self, stack):
+        now = time.monotonic()
+        last_stack = self._last_committed_stack
+        if last_stack and self.coalesce_interval > 0 and \
+                now - self._last_commit_time <= self.coalesce_interval:
+            old_size = last_stack.size()
+            if last_stack.coalesce(stack):
+                self.debug("Coalesced %s", stack.action_group_name)
+                self.history_size += last_stack.size() - old_size
+                # The state reached by the coalesced stack is different.
+                self._generation += 1
+                last_stack.generation = self._generation
+                self._last_commit_time = now
+                return
+
+        self._generation += 1
+        stack.generation = self._generation
+        self._last_committed_stack = stack
+        self._last_commit_time = now
+        self.undo_stacks.append(stack)
+        self.history_size += stack.size()
+        self._trim()
+
+    def _trim(self):
+        """Forgets the oldest operations until the history fits the limits."""
+        while len(self.undo_stacks) > 1:
+            too_deep = self.max_depth and len(self.undo_stacks) > self.max_depth
+            too_big = self.max_bytes and self.history_size > self.max_bytes
+            if not too_deep and not too_big:
+                break
+            stack = self.undo_stacks.pop(0)
+            self.history_size -= stack.size()
+            self._base_generation = stack.generation
+            self.debug("Forgot operation %s", stack.action_group_name)
+
+    def _current_generation(self):
+        if self.undo_stacks:
+            return self.undo_stacks[-1].generation
+        return self._base_generation
 
     def checkpoint(self):
         if self.stacks:
             raise UndoWrongStateError("Recording a transaction", self.stacks)
 
-        self._checkpoint = self._takeSnapshot()
+        self._checkpoint = self._current_generation()
 
     def dirty(self):
-        current_snapshot = self._takeSnapshot()
-        return current_snapshot != self._checkpoint
+        return self._current_generation() != self._checkpoint
 
     def _run(self, operation):
         self.running = True
@@ -438,6 +616,9 @@ class PropertyChangedAction(UndoableAutomaticObjectAction):
         self.new_value = action.new_value
         return True
 
+    def coalesce_key(self):
+        return (PropertyChangedAction, self.auto_object, self.field_name)
+
 
 class GObjectObserver(GObject.Object):
     """Monitor for GObject.Object's props, reporting UndoableActions.
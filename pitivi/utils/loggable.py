@@ -16,9 +16,11 @@
 # License along with this program; if not, write to the
 # Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
 # Boston, MA 02110-1301, USA.
+import atexit
 import collections
 import errno
 import fnmatch
+import json
 import os
 import re
 import sys
@@ -37,6 +39,9 @@ _PACKAGE_SCRUB_LIST = []
 
 # dynamic dictionary of categories already seen and their level
 _categories = {}
+# dynamic dictionary of categories already seen and the most verbose level
+# which can reach a log handler, reset when the log settings change
+_thresholds = {}
 
 # log handlers registered
 _log_handlers = []
@@ -58,6 +63,12 @@ _outfile = None
  DEBUG,
  LOG) = list(range(1, 7))
 
+# Whether LOG messages can be emitted for at least one category.
+# Hot loops can check it before building the log message, for example:
+#     if loggable.LOG_ENABLED:
+#         self.log("Got %s", expensive_value())
+LOG_ENABLED = False
+
 COLORS = {ERROR: 'RED',
           WARN: 'YELLOW',
           FIXME: 'MAGENTA',
@@ -325,8 +336,26 @@ def registerCategory(category):
     global _categories
 
     level = 0
-    chunks = _DEBUG.split(',')
-    for chunk in chunks:
+    for spec, value in _iterDebugChunks():
+        # our glob is unix filename style globbing, so cheat with fnmatch
+        # fnmatch.fnmatch didn't work for this, so don't use it
+        if category in fnmatch.filter((category, ), spec):
+            # we have a match, so set level based on string or int
+            if value is not None:
+                level = value
+    # store it
+    _categories[category] = level
+    _thresholds.pop(category, None)
+
+
+def _iterDebugChunks():
+    """Parses the DEBUG string.
+
+    Yields:
+        (str, int): The category pattern and the level, or None if no level
+        has been specified.
+    """
+    for chunk in _DEBUG.split(','):
         if not chunk:
             continue
         if ':' in chunk:
@@ -335,18 +364,23 @@ def registerCategory(category):
             spec = '*'
             value = chunk
 
-        # our glob is unix filename style globbing, so cheat with fnmatch
-        # fnmatch.fnmatch didn't work for this, so don't use it
-        if category in fnmatch.filter((category, ), spec):
-            # we have a match, so set level based on string or int
-            if not value:
-                continue
-            try:
-                level = int(value)
-            except ValueError:  # e.g. *; we default to most
-                level = 5
-    # store it
-    _categories[category] = level
+        if not value:
+            yield spec, None
+            continue
+        try:
+            yield spec, int(value)
+        except ValueError:  # e.g. *; we default to most
+            yield spec, 5
+
+
+def _invalidateThresholds():
+    """Forgets the cached thresholds after the log settings changed."""
+    global LOG_ENABLED
+
+    _thresholds.clear()
+    LOG_ENABLED = bool(_log_handlers) or \
+        any(value is not None and value >= LOG
+            for unused_spec, value in _iterDebugChunks())
 
 
 def getCategoryLevel(category):
@@ -385,6 +419,7 @@ def setLogSettings(state):
 
     for category in _categories:
         registerCategory(category)
+    _invalidateThresholds()
 
 
 def getLogSettings():
@@ -403,12 +438,45 @@ def getLogSettings():
 
 
 def _canShortcutLogging(category, level):
+    try:
+        return level > _thresholds[category]
+    except KeyError:
+        pass
+
     if _log_handlers:
         # we have some loggers operating without filters, have to do
         # everything
-        return False
+        threshold = LOG
     else:
-        return level > getCategoryLevel(category)
+        threshold = getCategoryLevel(category)
+    _thresholds[category] = threshold
+    return level > threshold
+
+
+class Lazy(object):
+    """Argument of a log message, computed only if the message is emitted.
+
+    For example:
+        self.debug("Loading %s", Lazy(path_from_uri, self.uri))
+
+    Only use it with the %s and %r conversions.
+
+    Args:
+        func (function): The function computing the argument.
+        *args: The arguments passed to `func`.
+    """
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+    def __repr__(self):
+        return repr(self.func(*self.args))
 
 
 def scrubFilename(filename):
@@ -482,7 +550,7 @@ def getFormatArgs(startFormat, startArgs, endFormat, endArgs, args, kwargs):
     """
     debugArgs = startArgs[:]
     for a in args:
-        debugArgs.append(ellipsize(a))
+        debugArgs.append(Lazy(ellipsize, a))
 
     for items in list(kwargs.items()):
         debugArgs.extend(items)
@@ -639,6 +707,103 @@ def printHandler(level, object, category, file, line, message):
     _outfile.flush()
 
 
+class AsyncLogHandler(object):
+    """Log handler writing the messages from a background thread.
+
+    The logging threads only append the records to a queue, so they are
+    not blocked by the output. The records are written in batches. When
+    the queue is full, the dropped records are counted under a lock.
+
+    Args:
+        outfile (file): The file where the records are written.
+        json_lines (Optional[bool]): Whether to write each record as
+            a JSON object on its own line, for machine analysis.
+        max_pending (Optional[int]): The maximum number of records waiting
+            to be written. The records logged while the queue is full
+            are dropped.
+        interval (Optional[float]): The time in seconds between writes.
+
+    Attributes:
+        dropped (int): The number of records dropped because the queue
+            was full.
+    """
+
+    ANSI_ESCAPE = re.compile(r"\033\[[0-9;]*m")
+
+    def __init__(self, outfile, json_lines=False, max_pending=100000, interval=0.1):
+        self.outfile = outfile
+        self.json_lines = json_lines
+        self.max_pending = max_pending
+        self.interval = interval
+        self.dropped = 0
+        self.__reported_dropped = 0
+        # Incrementing is not atomic, the logging threads can be many.
+        self.__dropped_lock = threading.Lock()
+
+        # Appending and popping are atomic, no need for a lock.
+        self.__records = collections.deque()
+        self.__wakeup = threading.Event()
+        self.__stopping = False
+        self.__thread = threading.Thread(target=self.__run, name="log-writer")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __call__(self, level, object, category, file, line, message):
+        if len(self.__records) >= self.max_pending:
+            with self.__dropped_lock:
+                self.dropped += 1
+            return
+        self.__records.append((time.time(), threading.current_thread().name,
+                               level, object, category, file, line, message))
+
+    def stop(self):
+        """Writes the pending records and stops the writer thread."""
+        self.__stopping = True
+        self.__wakeup.set()
+        self.__thread.join()
+
+    def __run(self):
+        while not self.__stopping:
+            self.__wakeup.wait(self.interval)
+            self.__write_pending()
+        self.__write_pending()
+
+    def __write_pending(self):
+        lines = []
+        records = self.__records
+        while records:
+            lines.append(self.__format(*records.popleft()))
+
+        dropped = self.dropped
+        if dropped != self.__reported_dropped:
+            self.__reported_dropped = dropped
+            lines.append(self.__format(time.time(), self.__thread.name, WARN,
+                                       None, "log", __file__, 0,
+                                       "%d log records dropped so far" % dropped))
+
+        if lines:
+            safeprintf(self.outfile, "".join(lines))
+            self.outfile.flush()
+
+    def __format(self, timestamp, thread, level, object, category, file, line, message):
+        if self.json_lines:
+            return json.dumps({"time": timestamp,
+                               "thread": thread,
+                               "level": _LEVEL_NAMES[level - 1],
+                               "category": category,
+                               "object": object,
+                               "file": file,
+                               "line": line,
+                               "message": self.ANSI_ESCAPE.sub("", message)},
+                              default=str) + "\n"
+
+        timestamp_string = "%s.%03d" % (time.strftime("%H:%M:%S", time.localtime(timestamp)),
+                                        timestamp % 1 * 1000)
+        return '%s %s %-12s %-17s %-2s %s (%s:%d)\n' % (
+            logLevelName(level), timestamp_string, thread,
+            category, object, message, file, line)
+
+
 def logLevelName(level):
     format = '%-5s'
     return format % (_LEVEL_NAMES[level - 1], )
@@ -674,6 +839,11 @@ def init(envVarName, enableColorOutput=True, enableCrackOutput=True):
 
     Needs to be called before using the log methods.
 
+    The messages are written to stderr, or to the file specified by the
+    `<envVarName>_FILE` environment variable. When `<envVarName>_ASYNC` is
+    set, they are written by an AsyncLogHandler, as JSON lines if its
+    value is "json".
+
     Args:
         envVarName (str): The name of the environment variable with additional
             settings.
@@ -702,7 +872,14 @@ def init(envVarName, enableColorOutput=True, enableCrackOutput=True):
     else:
         _outfile = sys.stderr
 
-    addLimitedLogHandler(printHandler)
+    # The value can be "json" for JSON lines, or anything else for text.
+    output_format = os.environ.get(envVarName + "_ASYNC")
+    if output_format:
+        handler = AsyncLogHandler(_outfile, json_lines=output_format == "json")
+        atexit.register(handler.stop)
+        addLimitedLogHandler(handler)
+    else:
+        addLimitedLogHandler(printHandler)
 
     _initialized = True
 
@@ -722,6 +899,7 @@ def setDebug(string):
     # reparse all already registered category levels
     for category in _categories:
         registerCategory(category)
+    _invalidateThresholds()
 
 
 def getDebug():
@@ -750,6 +928,7 @@ def reset():
     _log_handlers = []
     _log_handlers_limited = []
     _initialized = False
+    _invalidateThresholds()
 
 
 def addLogHandler(func):
@@ -773,6 +952,7 @@ def addLogHandler(func):
 
     if func not in _log_handlers:
         _log_handlers.append(func)
+        _invalidateThresholds()
 
 
 def addLimitedLogHandler(func):
@@ -804,6 +984,7 @@ def removeLogHandler(func):
         ValueError: When func is not registered.
     """
     _log_handlers.remove(func)
+    _invalidateThresholds()
 
 
 def removeLimitedLogHandler(func):
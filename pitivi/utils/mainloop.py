@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Monitoring of the GLib main loop, to find the callbacks freezing the UI."""
+import atexit
+import collections
+import os
+import sys
+import threading
+import time
+import traceback
+
+from gi.repository import GLib
+
+from pitivi.utils.loggable import Loggable
+
+# The upper bounds of the latency histogram buckets, in milliseconds.
+HISTOGRAM_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# The maximum number of stalls for which the stack is kept.
+MAX_STALLS = 100
+
+
+class LatencyHistogram(object):
+    """Histogram of the main loop dispatch latencies.
+
+    Attributes:
+        counts (List[int]): The number of latencies in each bucket. The last
+            bucket is for the latencies bigger than the last bound in
+            `HISTOGRAM_BUCKETS`.
+        max_latency (float): The biggest latency, in seconds.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        self.max_latency = 0
+
+    def add(self, latency):
+        """Records a latency.
+
+        Args:
+            latency (float): The latency in seconds.
+        """
+        latency_ms = latency * 1000
+        for index, bound in enumerate(HISTOGRAM_BUCKETS):
+            if latency_ms <= bound:
+                break
+        else:
+            index = len(HISTOGRAM_BUCKETS)
+        self.counts[index] += 1
+        self.max_latency = max(self.max_latency, latency)
+
+    def format(self):
+        """Formats the histogram as a text table."""
+        total = sum(self.counts)
+        lines = ["%d heartbeats, max latency %.1f ms" % (total, self.max_latency * 1000)]
+        lower = 0
+        for index, count in enumerate(self.counts):
+            if index < len(HISTOGRAM_BUCKETS):
+                label = "%d-%d ms" % (lower, HISTOGRAM_BUCKETS[index])
+                lower = HISTOGRAM_BUCKETS[index]
+            else:
+                label = "> %d ms" % lower
+            if count:
+                lines.append("%14s %8d %6.2f%%" % (label, count, count * 100 / total))
+        return "\n".join(lines)
+
+
+class Stall(object):
+    """A period in which the main loop did not dispatch the heartbeat.
+
+    Attributes:
+        stack (List[str]): The stack of the main thread when the stall
+            was detected, as formatted by `traceback.format_stack`.
+        duration (float): The duration of the stall in seconds. It's
+            updated when the main loop recovers.
+    """
+
+    def __init__(self, stack, duration):
+        self.stack = stack
+        self.duration = duration
+
+    def __repr__(self):
+        return "<Stall %.3fs>" % self.duration
+
+
+class MainLoopMonitor(Loggable):
+    """Measures how long the GLib main loop is blocked.
+
+    A high-priority heartbeat is scheduled on the main loop. The delay
+    with which it's dispatched is the latency with which the main loop
+    handles events. When the heartbeat is late by more than the threshold,
+    a watchdog thread captures the stack of the main thread, showing the
+    callback blocking the main loop.
+
+    Attributes:
+        threshold (float): The latency in seconds above which a stall is
+            reported.
+        interval (float): The heartbeat interval in seconds.
+        histogram (LatencyHistogram): The measured latencies.
+        stalls (collections.deque): The last detected stalls.
+    """
+
+    def __init__(self, threshold=0.2, interval=0.05):
+        Loggable.__init__(self)
+        self.threshold = threshold
+        self.interval = interval
+        self.histogram = LatencyHistogram()
+        self.stalls = collections.deque(maxlen=MAX_STALLS)
+
+        self.__main_thread_id = None
+        self.__heartbeat_id = 0
+        self.__last_beat = 0
+        # The stall detected since the last heartbeat, if any.
+        self.__stall = None
+        self.__lock = threading.Lock()
+        self.__stopping = threading.Event()
+        self.__thread = None
+
+    @property
+    def running(self):
+        return bool(self.__heartbeat_id)
+
+    def start(self):
+        """Starts monitoring the main loop.
+
+        Must be called from the thread running the main loop.
+        """
+        if self.running:
+            return
+
+        self.info("Monitoring the main loop, reporting stalls longer than %.3fs",
+                  self.threshold)
+        self.__main_thread_id = threading.get_ident()
+        self.__last_beat = time.monotonic()
+        self.__heartbeat_id = GLib.timeout_add(int(self.interval * 1000),
+                                               self.__heartbeat_cb,
+                                               priority=GLib.PRIORITY_HIGH)
+        self.__stopping.clear()
+        self.__thread = threading.Thread(target=self.__watch, name="mainloop-watchdog",
+                                         daemon=True)
+        self.__thread.start()
+
+    def stop(self):
+        """Stops monitoring the main loop."""
+        if not self.running:
+            return
+
+        GLib.source_remove(self.__heartbeat_id)
+        self.__heartbeat_id = 0
+        self.__stopping.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def reset(self):
+        """Forgets the measured latencies and the detected stalls."""
+        with self.__lock:
+            self.histogram = LatencyHistogram()
+            self.stalls.clear()
+
+    def report(self, count=10):
+        """Formats the histogram and the longest stalls.
+
+        Args:
+            count (Optional[int]): The maximum number of stalls to include.
+
+        Returns:
+            str: The report.
+        """
+        with self.__lock:
+            lines = ["Main loop latency:", self.histogram.format()]
+            stalls = sorted(self.stalls, key=lambda stall: stall.duration, reverse=True)
+        for stall in stalls[:count]:
+            lines.append("")
+            lines.append("Stall of %.3fs in:" % stall.duration)
+            lines.append("".join(stall.stack).rstrip())
+        return "\n".join(lines)
+
+    def __heartbeat_cb(self):
+        now = time.monotonic()
+        with self.__lock:
+            latency = max(0, now - self.__last_beat - self.interval)
+            self.histogram.add(latency)
+            self.__last_beat = now
+            stall = self.__stall
+            self.__stall = None
+            if stall:
+                stall.duration = latency
+        if stall:
+            self.warning("The main loop was blocked for %.3fs", latency)
+        return True
+
+    def __watch(self):
+        while not self.__stopping.wait(self.threshold / 2):
+            with self.__lock:
+                late = time.monotonic() - self.__last_beat - self.interval
+                if late < self.threshold or self.__stall:
+                    continue
+                frame = sys._current_frames().get(self.__main_thread_id)
+                if frame is None:
+                    continue
+                self.__stall = Stall(traceback.format_stack(frame), late)
+                self.stalls.append(self.__stall)
+            # Release the frame as it keeps all its locals alive.
+            del frame
+
+
+def init(monitor, env_var_name):
+    """Starts the monitor if the specified environment variable is set.
+
+    The value of the environment variable is the stall threshold in
+    milliseconds. The report is written to stderr when the app exits.
+
+    Args:
+        monitor (MainLoopMonitor): The monitor to start.
+        env_var_name (str): The name of the environment variable.
+    """
+    value = os.environ.get(env_var_name)
+    if not value:
+        return
+
+    try:
+        monitor.threshold = int(value) / 1000
+    except ValueError:
+        monitor.warning("%s should be the stall threshold in ms, not %s",
+                        env_var_name, value)
+    monitor.start()
+    atexit.register(lambda: sys.stderr.write(monitor.report() + "\n"))
@@ -19,8 +19,10 @@
 # the Free Software Foundation; either version 3, or (at your option)
 # any later version.
 """High-level pipelines."""
+import collections
 import contextlib
 import os
+import time
 
 from gi.repository import GES
 from gi.repository import GLib
@@ -28,6 +30,7 @@ from gi.repository import GObject
 from gi.repository import Gst
 
 from pitivi.check import videosink_factory
+from pitivi.utils import tracing
 from pitivi.utils.loggable import Loggable
 from pitivi.utils.misc import format_ns
 
@@ -49,6 +52,9 @@ MAX_SET_STATE_DURATION = 1
 
 DEFAULT_POSITION_LISTENNING_INTERVAL = 500
 
+# The minimum interval between two commits of a non-empty timeline, in seconds.
+MIN_COMMIT_INTERVAL = 0.04
+
 
 class PipelineError(Exception):
     pass
@@ -100,6 +106,8 @@ class SimplePipeline(GObject.Object, Loggable):
         self._next_seek = None
         self._timeout_async_id = 0
         self._force_position_listener = False
+        # The tracing span of the seek waiting for ASYNC_DONE.
+        self._seek_span = None
 
     def create_sink(self):
         """Creates a video sink and a widget for displaying it.
@@ -366,6 +374,8 @@ class SimplePipeline(GObject.Object, Loggable):
         if not res:
             raise PipelineError(self.get_name() + " seek failed: " + str(position))
 
+        tracing.end(self._seek_span, superseded=True)
+        self._seek_span = tracing.begin("seek", position=position)
         self._addWaitingForAsyncDoneTimeout()
 
         self.emit('position', position)
@@ -427,6 +437,8 @@ class SimplePipeline(GObject.Object, Loggable):
             Gst.debug_bin_to_dot_file_with_ts(self._pipeline,
                                               Gst.DebugGraphDetails.ALL,
                                               "pitivi.error")
+            tracing.end(self._seek_span, failed=True)
+            self._seek_span = None
             if not self._rendering():
                 self._removeWaitingForAsyncDoneTimeout()
                 self._recover()
@@ -435,6 +447,8 @@ class SimplePipeline(GObject.Object, Loggable):
             GLib.idle_add(self._queryDurationAsync)
         elif message.type == Gst.MessageType.ASYNC_DONE:
             self.debug("Async done, ready for action")
+            tracing.end(self._seek_span)
+            self._seek_span = None
             self.emit("async-done")
             self._removeWaitingForAsyncDoneTimeout()
             if self._recovery_state == self.RecoveryState.SEEKED_AFTER_RECOVERING:
@@ -537,6 +551,47 @@ class AssetPipeline(SimplePipeline):
         self.__uri = uri
 
 
+class CommitStats(object):
+    """Statistics about the commits of a timeline.
+
+    Attributes:
+        requested (int): The number of commits requested.
+        committed (int): The number of commits performed. The requests
+            received while a commit was being processed or too soon after
+            a commit are merged into a single commit.
+        latencies (collections.deque): The durations of the latest commits,
+            from the commit until ASYNC_DONE, in seconds.
+    """
+
+    MAX_LATENCIES = 100
+
+    def __init__(self):
+        self.requested = 0
+        self.committed = 0
+        self.latencies = collections.deque(maxlen=self.MAX_LATENCIES)
+
+    @property
+    def merged(self):
+        """Gets the number of requests merged into other commits."""
+        return self.requested - self.committed
+
+    @property
+    def mean_latency(self):
+        """Gets the mean duration of the latest commits, in seconds."""
+        if not self.latencies:
+            return 0
+        return sum(self.latencies) / len(self.latencies)
+
+    @property
+    def max_latency(self):
+        """Gets the maximum duration of the latest commits, in seconds."""
+        return max(self.latencies, default=0)
+
+    def __str__(self):
+        return "%d commits requested, %d done, mean latency %.3f s, max latency %.3f s" % (
+            self.requested, self.committed, self.mean_latency, self.max_latency)
+
+
 class Pipeline(GES.Pipeline, SimplePipeline):
     """Helper to handle GES.Pipeline through the SimplePipeline API."""
 
@@ -551,6 +606,14 @@ class Pipeline(GES.Pipeline, SimplePipeline):
         self._was_empty = False
         self._commit_wanted = False
         self._prevent_commits = 0
+        self._commit_timeout_id = 0
+        # When the last commit has been done, as returned by time.monotonic().
+        self._last_commit_time = None
+        # When the commit waiting for ASYNC_DONE has been done.
+        self._async_commit_time = None
+        self.commit_stats = CommitStats()
+        # The tracing span of the commit waiting for ASYNC_DONE.
+        self._commit_span = None
 
         if "watchdog" in os.environ.get("PITIVI_UNSTABLE_FEATURES", ''):
             watchdog = Gst.ElementFactory.make("watchdog", None)
@@ -629,17 +692,29 @@ class Pipeline(GES.Pipeline, SimplePipeline):
             self.error("Error while seeking to position: %s, reason: %s",
                        format_ns(position), e)
 
+    def release(self):
+        self._remove_commit_timeout()
+        self.info("Timeline commits: %s", self.commit_stats)
+        SimplePipeline.release(self)
+
     def _busMessageCb(self, bus, message):
         if message.type == Gst.MessageType.ASYNC_DONE:
             self.app.gui.editor.timeline_ui.timeline.update_visible_overlays()
+            if self._async_commit_time is not None:
+                latency = time.monotonic() - self._async_commit_time
+                self._async_commit_time = None
+                self.commit_stats.latencies.append(latency)
+                self.log("Commit processed in %.3f s", latency)
+            tracing.end(self._commit_span)
+            self._commit_span = None
 
         if message.type == Gst.MessageType.ASYNC_DONE and\
-                self._commit_wanted:
+                self._commit_wanted and self._get_commit_delay() <= 0:
             self.debug("Committing now that ASYNC is DONE")
-            self._addWaitingForAsyncDoneTimeout()
-            self.props.timeline.commit()
-            self._commit_wanted = False
+            self._commit()
         else:
+            if message.type == Gst.MessageType.ASYNC_DONE and self._commit_wanted:
+                self._schedule_commit()
             SimplePipeline._busMessageCb(self, bus, message)
 
     @contextlib.contextmanager
@@ -653,20 +728,71 @@ class Pipeline(GES.Pipeline, SimplePipeline):
             self.commit_timeline()
 
     def commit_timeline(self):
+        """Commits the timeline, or schedules a commit.
+
+        A commit is deferred while the previous one is being processed,
+        or when it was done less than MIN_COMMIT_INTERVAL ago. The deferred
+        requests are merged so only the latest state is committed, which
+        keeps the latency bounded when editing interactively.
+        """
         if self._prevent_commits > 0 or self.getState() == Gst.State.NULL:
             # No need to commit. NLE will do it automatically when
             # changing state from READY to PAUSED.
             return
+        self.commit_stats.requested += 1
         is_empty = self.props.timeline.is_empty()
         if self._busy_async and not self._was_empty and not is_empty:
             self._commit_wanted = True
             self._was_empty = False
             self.log("commit wanted")
+        elif not is_empty and self._get_commit_delay() > 0:
+            self._commit_wanted = True
+            self._schedule_commit()
+            self.log("commit throttled")
         else:
-            self._addWaitingForAsyncDoneTimeout()
-            self.props.timeline.commit()
-            self.debug("Committing right now")
-            self._was_empty = is_empty
+            self._commit()
+
+    def _commit(self):
+        self._remove_commit_timeout()
+        self._commit_wanted = False
+        is_empty = self.props.timeline.is_empty()
+        tracing.end(self._commit_span, superseded=True)
+        self._commit_span = None
+        if not is_empty:
+            # No ASYNC_DONE is emitted for empty timelines.
+            self._commit_span = tracing.begin("commit")
+        self._addWaitingForAsyncDoneTimeout()
+        self.props.timeline.commit()
+        self.debug("Committing right now")
+        self._was_empty = is_empty
+        self._last_commit_time = time.monotonic()
+        # No ASYNC_DONE is emitted for empty timelines.
+        self._async_commit_time = None if is_empty else self._last_commit_time
+        self.commit_stats.committed += 1
+
+    def _get_commit_delay(self):
+        """Gets how long to wait until the next commit is allowed, in seconds."""
+        if self._last_commit_time is None:
+            return 0
+        return self._last_commit_time + MIN_COMMIT_INTERVAL - time.monotonic()
+
+    def _schedule_commit(self):
+        if self._commit_timeout_id:
+            return
+        delay_ms = max(0, int(self._get_commit_delay() * 1000)) + 1
+        self._commit_timeout_id = GLib.timeout_add(delay_ms, self._commit_timeout_cb)
+
+    def _remove_commit_timeout(self):
+        if self._commit_timeout_id:
+            GLib.source_remove(self._commit_timeout_id)
+            self._commit_timeout_id = 0
+
+    def _commit_timeout_cb(self):
+        self._commit_timeout_id = 0
+        if self._commit_wanted and not self._busy_async:
+            self._commit()
+        # Otherwise the commit is done when ASYNC_DONE is received.
+        return False
 
     def setState(self, state):
         SimplePipeline.setState(self, state)
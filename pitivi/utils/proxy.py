@@ -29,7 +29,9 @@ from gi.repository import GstTranscoder
 
 from pitivi.configure import get_gstpresets_dir
 from pitivi.settings import GlobalSettings
+from pitivi.utils import tracing
 from pitivi.utils.loggable import Loggable
+from pitivi.utils.system import SystemLoadSampler
 
 # Make sure gst knowns about our own GstPresets
 Gst.preset_set_app_dir(get_gstpresets_dir())
@@ -94,16 +96,11 @@ class ProxyManager(GObject.Object, Loggable):
                             "video/x-raw", "video/x-vp8",
                             "video/x-theora"]
 
-    WHITELIST_FORMATS = []
-    for container in WHITELIST_CONTAINER_CAPS:
-        for audio in WHITELIST_AUDIO_CAPS:
-            for video in WHITELIST_VIDEO_CAPS:
-                WHITELIST_FORMATS.append(createEncodingProfileSimple(
-                    container, audio, video))
-
-    for audio in WHITELIST_AUDIO_CAPS:
-        a = GstPbutils.EncodingAudioProfile.new(Gst.Caps(audio), None, None, 0)
-        WHITELIST_FORMATS.append(a)
+    # The encoding profiles built out of the whitelisted caps, created
+    # when first needed. See get_whitelist_formats().
+    _whitelist_formats = None
+    # Whether an asset is well supported, by the media types of its streams.
+    _well_supported_by_media_types = {}
 
     proxy_extension = "proxy.mkv"
 
@@ -119,6 +116,10 @@ class ProxyManager(GObject.Object, Loggable):
         self._start_proxying_time = 0
         self.__running_transcoders = []
         self.__pending_transcoders = []
+        # The tracing spans of the running transcoders, by source URI.
+        self.__transcoder_spans = {}
+        self.__load_sampler = SystemLoadSampler.get_default()
+        self.__holding_load_sampler = False
 
         self.__encoding_target_file = None
         self.proxyingUnsupported = False
@@ -135,6 +136,51 @@ class ProxyManager(GObject.Object, Loggable):
             self.error("Not supporting any proxy formats!")
             return
 
+    @classmethod
+    def get_whitelist_formats(cls):
+        """Gets the formats which are well supported for editing.
+
+        Returns:
+            List[GstPbutils.EncodingProfile]: The whitelisted formats.
+        """
+        if cls._whitelist_formats is None:
+            formats = []
+            for container in cls.WHITELIST_CONTAINER_CAPS:
+                for audio in cls.WHITELIST_AUDIO_CAPS:
+                    for video in cls.WHITELIST_VIDEO_CAPS:
+                        formats.append(createEncodingProfileSimple(
+                            container, audio, video))
+
+            for audio in cls.WHITELIST_AUDIO_CAPS:
+                a = GstPbutils.EncodingAudioProfile.new(Gst.Caps(audio), None, None, 0)
+                formats.append(a)
+            cls._whitelist_formats = formats
+        return cls._whitelist_formats
+
+    @staticmethod
+    def _get_media_types_key(info):
+        """Gets the media types of the streams of the specified asset info.
+
+        The whitelisted caps have no fields, so the media types of the streams
+        are enough to decide whether the asset is well supported.
+        """
+        def media_types(stream_info):
+            caps = stream_info.get_caps()
+            if not caps:
+                return ()
+            return tuple(caps.get_structure(i).get_name()
+                         for i in range(caps.get_size()))
+
+        container = info.get_stream_info()
+        if container:
+            container_key = (isinstance(container, GstPbutils.DiscovererContainerInfo),
+                             media_types(container))
+        else:
+            container_key = None
+        return (container_key,
+                tuple(media_types(stream) for stream in info.get_audio_streams()),
+                tuple(media_types(stream) for stream in info.get_video_streams()))
+
     def _assetMatchesEncodingFormat(self, asset, encoding_profile):
         def capsMatch(info, profile):
             return not info.get_caps().intersect(profile.get_format()).is_empty()
@@ -253,12 +299,16 @@ class ProxyManager(GObject.Object, Loggable):
         return "%s.%s.%s" % (asset.get_id(), file_size, self.proxy_extension)
 
     def isAssetFormatWellSupported(self, asset):
-        for encoding_format in self.WHITELIST_FORMATS:
-            if self._assetMatchesEncodingFormat(asset, encoding_format):
-                self.info("Automatically not proxying")
-                return True
+        key = self._get_media_types_key(asset.get_info())
+        supported = self._well_supported_by_media_types.get(key)
+        if supported is None:
+            supported = any(self._assetMatchesEncodingFormat(asset, encoding_format)
+                            for encoding_format in self.get_whitelist_formats())
+            self._well_supported_by_media_types[key] = supported
 
-        return False
+        if supported:
+            self.info("Automatically not proxying")
+        return supported
 
     def __assetNeedsTranscoding(self, asset):
         if self.proxyingUnsupported:
@@ -288,8 +338,42 @@ class ProxyManager(GObject.Object, Loggable):
         self.debug("Starting %s", transcoder.props.src_uri)
         if self._start_proxying_time == 0:
             self._start_proxying_time = time.time()
+        self.__transcoder_spans[transcoder.props.src_uri] = tracing.begin(
+            "proxy", category="proxy", uri=transcoder.props.src_uri)
         transcoder.run_async()
         self.__running_transcoders.append(transcoder)
+        self.__update_load_sampler()
+
+    def __can_start_transcoder(self):
+        """Checks whether the system can handle one more transcoder."""
+        max_jobs = self.app.settings.numTranscodingJobs
+        if self.__load_sampler.is_busy():
+            # Let the other processes breathe.
+            max_jobs = 1
+        return len(self.__running_transcoders) < max_jobs
+
+    def __start_pending_transcoders(self):
+        while self.__pending_transcoders and self.__can_start_transcoder():
+            self.__startTranscoder(self.__pending_transcoders.pop())
+
+    def __update_load_sampler(self):
+        """Samples the system load only while transcoding."""
+        needed = bool(self.__running_transcoders)
+        if needed == self.__holding_load_sampler:
+            return
+        if needed:
+            self.__load_sampler.hold()
+            self.__load_sampler.connect("load-changed", self.__load_changed_cb)
+        else:
+            self.__load_sampler.disconnect_by_func(self.__load_changed_cb)
+            self.__load_sampler.release()
+        self.__holding_load_sampler = needed
+
+    def __load_changed_cb(self, load_sampler):
+        cpu_usage = load_sampler.get_cpu_budget(self.app.settings.max_cpu_usage)
+        for transcoder in self.__running_transcoders:
+            transcoder.set_cpu_usage(cpu_usage)
+        self.__start_pending_transcoders()
 
     def __assetsMatch(self, asset, proxy):
         if self.__assetNeedsTranscoding(proxy):
@@ -336,14 +420,27 @@ class ProxyManager(GObject.Object, Loggable):
         self.__emitProgress(proxy, 100)
 
     def __transcoderErrorCb(self, transcoder, error, unused_details, asset):
+        transcoder.disconnect_by_func(self.__transcoderDoneCb)
+        transcoder.disconnect_by_func(self.__transcoderErrorCb)
+        transcoder.disconnect_by_func(self.__proxyingPositionChangedCb)
+
+        tracing.end(self.__transcoder_spans.pop(transcoder.props.src_uri, None),
+                    error=error)
+        if transcoder in self.__running_transcoders:
+            self.__running_transcoders.remove(transcoder)
         self.emit("error-preparing-asset", asset, None, error)
 
+        # The failed job does not count anymore, let the others run.
+        self.__start_pending_transcoders()
+        self.__update_load_sampler()
+
     def __transcoderDoneCb(self, transcoder, asset):
         transcoder.disconnect_by_func(self.__transcoderDoneCb)
         transcoder.disconnect_by_func(self.__transcoderErrorCb)
         transcoder.disconnect_by_func(self.__proxyingPositionChangedCb)
 
         self.debug("Transcoder done with %s", asset.get_id())
+        tracing.end(self.__transcoder_spans.pop(transcoder.props.src_uri, None))
 
         self.__running_transcoders.remove(transcoder)
 
@@ -357,13 +454,12 @@ class ProxyManager(GObject.Object, Loggable):
         GES.Asset.request_async(GES.UriClip, proxy_uri, None,
                                 self.__assetLoadedCb, asset, transcoder)
 
-        try:
-            self.__startTranscoder(self.__pending_transcoders.pop())
-        except IndexError:
-            if not self.__running_transcoders:
-                self._transcoded_durations = {}
-                self._total_time_to_transcode = 0
-                self._start_proxying_time = 0
+        self.__start_pending_transcoders()
+        self.__update_load_sampler()
+        if not self.__running_transcoders:
+            self._transcoded_durations = {}
+            self._total_time_to_transcode = 0
+            self._start_proxying_time = 0
 
     def __emitProgress(self, asset, creation_progress):
         """Handles the transcoding progress of the specified asset."""
@@ -433,14 +529,15 @@ class ProxyManager(GObject.Object, Loggable):
         transcoder.props.pipeline.props.video_filter = thumbnailbin
         transcoder.props.pipeline.props.audio_filter = waveformbin
 
-        transcoder.set_cpu_usage(self.app.settings.max_cpu_usage)
+        transcoder.set_cpu_usage(
+            self.__load_sampler.get_cpu_budget(self.app.settings.max_cpu_usage))
         transcoder.connect("position-updated",
                            self.__proxyingPositionChangedCb,
                            asset)
 
         transcoder.connect("done", self.__transcoderDoneCb, asset)
         transcoder.connect("error", self.__transcoderErrorCb, asset)
-        if len(self.__running_transcoders) < self.app.settings.numTranscodingJobs:
+        if self.__can_start_transcoder():
             self.__startTranscoder(transcoder)
         else:
             self.__pending_transcoders.append(transcoder)
@@ -460,6 +557,9 @@ class ProxyManager(GObject.Object, Loggable):
                           transcoder.props.src_uri,
                           transcoder.__grefcount__)
                 self.__running_transcoders.remove(transcoder)
+                self.__update_load_sampler()
+                tracing.end(self.__transcoder_spans.pop(transcoder.props.src_uri, None),
+                            cancelled=True)
                 self.emit("asset-preparing-cancelled", asset)
                 return
 
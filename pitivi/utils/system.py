@@ -14,12 +14,13 @@
 #
 # You should have received a copy of the GNU Lesser General Public
 # License along with this program; if not, see <http://www.gnu.org/licenses/>.
-import datetime
-import multiprocessing
+import collections
 import os
-import resource
 import sys
+import threading
+import time
 
+from gi.repository import GLib
 from gi.repository import GObject
 
 from pitivi.check import missing_soft_deps
@@ -136,18 +137,201 @@ def get_system():
     return System()
 
 
-class CPUUsageTracker(object):
+# The CPU load measured by the SystemLoadSampler, in percents.
+# process: The CPU used by Pitivi, including the GStreamer threads, relative
+#     to all the cores.
+# system: The CPU used by all the processes, relative to all the cores.
+# iowait: The CPU time spent waiting for I/O, relative to all the cores.
+# cores: The CPU used on each core.
+SystemLoad = collections.namedtuple("SystemLoad", ["process", "system", "iowait", "cores"])
 
-    def __init__(self):
-        self.reset()
-
-    def usage(self):
-        delta_time = (datetime.datetime.now() - self.last_moment).total_seconds()
-        delta_usage = resource.getrusage(
-            resource.RUSAGE_SELF).ru_utime - self.last_usage.ru_utime
-        usage = float(delta_usage) / delta_time * 100
-        return usage / multiprocessing.cpu_count()
-
-    def reset(self):
-        self.last_moment = datetime.datetime.now()
-        self.last_usage = resource.getrusage(resource.RUSAGE_SELF)
+# The weight of a new sample in the smoothed values.
+LOAD_SMOOTHING = 0.5
+
+# Above this load of the other processes, the background jobs are
+# considered to compete with them.
+SYSTEM_BUSY_THRESHOLD = 90
+
+
+def parse_proc_stat(text):
+    """Parses the CPU times in the content of /proc/stat.
+
+    Args:
+        text (str): The content of /proc/stat.
+
+    Returns:
+        List[Tuple[int, int, int]]: The total, idle and iowait times, for
+        all the cores and then for each core.
+    """
+    times = []
+    for line in text.splitlines():
+        if not line.startswith("cpu"):
+            continue
+        # user nice system idle iowait irq softirq steal
+        fields = [int(field) for field in line.split()[1:9]]
+        fields += [0] * (8 - len(fields))
+        times.append((sum(fields), fields[3] + fields[4], fields[4]))
+    return times
+
+
+def compute_cpu_usage(previous, current):
+    """Computes the CPU usage between two samples of /proc/stat.
+
+    Args:
+        previous (Tuple[int, int, int]): The older times as returned by
+            `parse_proc_stat`.
+        current (Tuple[int, int, int]): The newer times.
+
+    Returns:
+        (float, float): The busy and iowait percents.
+    """
+    total = current[0] - previous[0]
+    if total <= 0:
+        return 0.0, 0.0
+    idle = current[1] - previous[1]
+    iowait = current[2] - previous[2]
+    return (total - idle) * 100 / total, iowait * 100 / total
+
+
+class SystemLoadSampler(GObject.Object, Loggable):
+    """Samples the CPU load in a background thread.
+
+    The consumers throttling the background jobs share the default
+    instance. While they need it, they hold it and connect to
+    `load-changed`, emitted in the main thread after each sample.
+
+    Attributes:
+        interval (float): The time between samples, in seconds.
+        load (SystemLoad): The smoothed load.
+    """
+
+    __gsignals__ = {
+        "load-changed": (GObject.SignalFlags.RUN_LAST, None, ()),
+    }
+
+    PROC_STAT = "/proc/stat"
+
+    _default = None
+
+    def __init__(self, interval=1.0):
+        GObject.Object.__init__(self)
+        Loggable.__init__(self)
+
+        self.interval = interval
+        self.load = SystemLoad(0.0, 0.0, 0.0, [])
+        self.cpu_count = os.cpu_count() or 1
+
+        self.__holds = 0
+        self.__stopping = threading.Event()
+        self.__thread = None
+
+    @classmethod
+    def get_default(cls):
+        """Gets the instance shared by the consumers."""
+        if cls._default is None:
+            cls._default = SystemLoadSampler()
+        return cls._default
+
+    def hold(self):
+        """Starts sampling, if not already."""
+        self.__holds += 1
+        if self.__holds > 1:
+            return
+
+        self.debug("Starting to sample the system load")
+        self.__stopping.clear()
+        self.__thread = threading.Thread(target=self.__run, name="load-sampler",
+                                         daemon=True)
+        self.__thread.start()
+
+    def release(self):
+        """Stops sampling, if no consumer holds the sampler anymore."""
+        assert self.__holds > 0
+        self.__holds -= 1
+        if self.__holds:
+            return
+
+        self.debug("Stopping to sample the system load")
+        self.__stopping.set()
+        self.__thread.join()
+        self.__thread = None
+
+    def _get_others_load(self):
+        """Gets the CPU used by the processes other than Pitivi."""
+        load = self.load
+        return max(0.0, load.system - load.process)
+
+    def get_cpu_budget(self, max_cpu_usage):
+        """Gets the CPU usage allowed for the background jobs.
+
+        Args:
+            max_cpu_usage (int): The CPU usage configured by the user,
+                in percents.
+
+        Returns:
+            int: The configured usage, reduced when the other processes
+            leave less idle CPU.
+        """
+        others = self._get_others_load()
+        return int(max(1, min(max_cpu_usage, 100 - others)))
+
+    def is_busy(self):
+        """Gets whether the other processes leave too little idle CPU."""
+        return self._get_others_load() > SYSTEM_BUSY_THRESHOLD
+
+    def _read_proc_stat(self):
+        try:
+            with open(self.PROC_STAT) as proc_stat:
+                return parse_proc_stat(proc_stat.read())
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_process_time():
+        times = os.times()
+        return times.user + times.system
+
+    def __run(self):
+        last_moment = time.monotonic()
+        last_process_time = self._read_process_time()
+        last_stat = self._read_proc_stat()
+        first = True
+        while not self.__stopping.wait(self.interval):
+            moment = time.monotonic()
+            process_time = self._read_process_time()
+            stat = self._read_proc_stat()
+
+            elapsed = moment - last_moment
+            process = (process_time - last_process_time) * 100 / elapsed / self.cpu_count
+            if stat and last_stat and len(stat) == len(last_stat):
+                system, iowait = compute_cpu_usage(last_stat[0], stat[0])
+                cores = [compute_cpu_usage(previous, current)[0]
+                         for previous, current in zip(last_stat[1:], stat[1:])]
+            else:
+                system, iowait, cores = process, 0.0, []
+            last_moment, last_process_time, last_stat = moment, process_time, stat
+
+            load = SystemLoad(process, system, iowait, cores)
+            self.load = load if first else self.__smooth(load)
+            first = False
+            GLib.idle_add(self.__emit_load_changed_cb)
+
+    def __smooth(self, load):
+        previous = self.load
+
+        def smooth(old, new):
+            return old + (new - old) * LOAD_SMOOTHING
+
+        if len(previous.cores) == len(load.cores):
+            cores = [smooth(old, new) for old, new in zip(previous.cores, load.cores)]
+        else:
+            cores = load.cores
+        return SystemLoad(smooth(previous.process, load.process),
+                          smooth(previous.system, load.system),
+                          smooth(previous.iowait, load.iowait),
+                          cores)
+
+    def __emit_load_changed_cb(self):
+        self.log("System load: %s", self.load)
+        self.emit("load-changed")
+        return False
@@ -17,7 +17,11 @@
 # License along with this program; if not, write to the
 # Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
 # Boston, MA 02110-1301, USA.
+import bisect
+import weakref
+
 from gi.repository import GES
+from gi.repository import GLib
 from gi.repository import GObject
 from gi.repository import Gst
 from gi.repository import Gtk
@@ -212,6 +216,139 @@ class Selection(GObject.Object, Loggable):
         return iter(self.selected)
 
 
+class LayerClipsIndex(Loggable):
+    """Index of the clips of a layer, for position and range queries.
+
+    The clips are kept sorted by start and the index is updated when clips
+    are added, removed or moved. The clips intersecting an interval are
+    found by bisecting the starts and looking back at most the duration of
+    the longest clip, so clips containing other clips are also found.
+
+    Attributes:
+        ges_layer (GES.Layer): The indexed layer.
+    """
+
+    def __init__(self, ges_layer):
+        Loggable.__init__(self)
+        self.ges_layer = ges_layer
+
+        # The sorted starts and the clips at the same positions.
+        self._starts = []
+        self._clips = []
+        # The indexed start and duration of each clip.
+        self._clip_starts = {}
+        self._clip_durations = {}
+        # The duration of the longest clip, or None if it must be computed.
+        self._max_duration = 0
+
+        for ges_clip in ges_layer.get_clips():
+            self._add_clip(ges_clip)
+        ges_layer.connect("clip-added", self._clip_added_cb)
+        ges_layer.connect("clip-removed", self._clip_removed_cb)
+
+    def release(self):
+        """Stops tracking the clips of the layer."""
+        self.ges_layer.disconnect_by_func(self._clip_added_cb)
+        self.ges_layer.disconnect_by_func(self._clip_removed_cb)
+        for ges_clip in list(self._clips):
+            self._remove_clip(ges_clip)
+
+    def __len__(self):
+        return len(self._clips)
+
+    def get_clips_at(self, position):
+        """Gets the clips containing the specified position.
+
+        Args:
+            position (int): The position in the timeline, in nanoseconds.
+
+        Returns:
+            List[GES.Clip]: The clips starting at or before `position` and
+                ending at or after it, sorted by start.
+        """
+        return [ges_clip for ges_clip in self.__candidates(position, position)
+                if self._clip_starts[ges_clip] + self._clip_durations[ges_clip] >= position]
+
+    def get_clips_in_interval(self, start, end):
+        """Gets the clips overlapping the specified interval.
+
+        Args:
+            start (int): The start of the interval, in nanoseconds.
+            end (int): The end of the interval, in nanoseconds.
+
+        Returns:
+            List[GES.Clip]: The clips starting at or before `end` and ending
+                at or after `start`, sorted by start, as
+                `GES.Layer.get_clips_in_interval`.
+        """
+        return [ges_clip for ges_clip in self.__candidates(start, end)
+                if self._clip_starts[ges_clip] + self._clip_durations[ges_clip] >= start]
+
+    def __candidates(self, start, end):
+        if self._max_duration is None:
+            self._max_duration = max(self._clip_durations.values(), default=0)
+        low = bisect.bisect_left(self._starts, start - self._max_duration)
+        high = bisect.bisect_right(self._starts, end)
+        return self._clips[low:high]
+
+    def _add_clip(self, ges_clip):
+        ges_clip.connect("notify::start", self._clip_start_changed_cb)
+        ges_clip.connect("notify::duration", self._clip_duration_changed_cb)
+        self._clip_durations[ges_clip] = ges_clip.props.duration
+        self._insert(ges_clip)
+        self.__update_max_duration(ges_clip.props.duration, 0)
+
+    def _remove_clip(self, ges_clip):
+        ges_clip.disconnect_by_func(self._clip_start_changed_cb)
+        ges_clip.disconnect_by_func(self._clip_duration_changed_cb)
+        self._take(ges_clip)
+        duration = self._clip_durations.pop(ges_clip)
+        self.__update_max_duration(0, duration)
+
+    def _insert(self, ges_clip):
+        start = ges_clip.props.start
+        index = bisect.bisect_right(self._starts, start)
+        self._starts.insert(index, start)
+        self._clips.insert(index, ges_clip)
+        self._clip_starts[ges_clip] = start
+
+    def _take(self, ges_clip):
+        start = self._clip_starts.pop(ges_clip)
+        index = bisect.bisect_left(self._starts, start)
+        while self._clips[index] is not ges_clip:
+            index += 1
+        del self._starts[index]
+        del self._clips[index]
+
+    def __update_max_duration(self, new_duration, old_duration):
+        if self._max_duration is None:
+            return
+        if new_duration >= self._max_duration:
+            self._max_duration = new_duration
+        elif old_duration == self._max_duration:
+            # The longest clip got shorter, compute it again when needed.
+            self._max_duration = None
+
+    def _clip_added_cb(self, unused_ges_layer, ges_clip):
+        self._add_clip(ges_clip)
+
+    def _clip_removed_cb(self, unused_ges_layer, ges_clip):
+        if ges_clip in self._clip_starts:
+            self._remove_clip(ges_clip)
+
+    def _clip_start_changed_cb(self, ges_clip, unused_pspec):
+        if ges_clip.props.start == self._clip_starts[ges_clip]:
+            return
+        self._take(ges_clip)
+        self._insert(ges_clip)
+
+    def _clip_duration_changed_cb(self, ges_clip, unused_pspec):
+        duration = ges_clip.props.duration
+        old_duration = self._clip_durations[ges_clip]
+        self._clip_durations[ges_clip] = duration
+        self.__update_max_duration(duration, old_duration)
+
+
 class EditingContext(GObject.Object, Loggable):
     """Encapsulates interactive editing.
 
@@ -332,10 +469,17 @@ class Zoomable(object):
     . setZoomRatio
     Instance Methods
     . zoomChanged()
+
+    The zoom ratio changes immediately, but the instances are notified
+    only once before the next redraw, no matter how many times the zoom
+    changed meanwhile, unless `flush_zoom_changed` is called.
     """
 
     sigid = None
+    # Weak references to the instances, so they can be freed.
     _instances = []
+    # The idle source notifying the instances of the zoom change.
+    _zoom_changed_id = 0
     max_zoom = 1000.0
     min_zoom = 0.25
     zoom_steps = 100
@@ -352,25 +496,49 @@ class Zoomable(object):
             Zoomable.zoomratio = self.computeZoomRatio(self._cur_zoom)
 
     def __del__(self):
-        if self in Zoomable._instances:
-            # FIXME: ideally we should deprecate this and spit a warning here
-            self._instances.remove(self)
+        # FIXME: ideally we should deprecate this and spit a warning here
+        Zoomable.removeInstance(self)
 
     @classmethod
     def addInstance(cls, instance):
-        cls._instances.append(instance)
+        cls._instances.append(weakref.ref(instance))
 
     @classmethod
     def removeInstance(cls, instance):
-        cls._instances.remove(instance)
+        cls._instances[:] = [ref for ref in cls._instances
+                             if ref() is not instance and ref() is not None]
 
     @classmethod
     def setZoomRatio(cls, ratio):
         ratio = min(max(cls.min_zoom, ratio), cls.max_zoom)
         if cls.zoomratio != ratio:
             cls.zoomratio = ratio
-            for inst in cls._instances:
+            if not cls._zoom_changed_id:
+                cls._zoom_changed_id = GLib.idle_add(
+                    cls._zoom_changed_cb, priority=GLib.PRIORITY_HIGH_IDLE + 10)
+
+    @classmethod
+    def _zoom_changed_cb(cls):
+        cls._zoom_changed_id = 0
+        # The instances created meanwhile already use the new zoom ratio.
+        instances = [ref() for ref in cls._instances]
+        cls._instances[:] = [ref for ref, inst in zip(cls._instances, instances)
+                             if inst is not None]
+        for inst in instances:
+            if inst is not None:
                 inst.zoomChanged()
+        return False
+
+    @classmethod
+    def flush_zoom_changed(cls):
+        """Notifies the instances right away if the zoom changed meanwhile.
+
+        Useful for one-shot changes which need the widgets to be updated
+        right away, for example when zooming to fit the timeline.
+        """
+        if cls._zoom_changed_id:
+            GLib.source_remove(cls._zoom_changed_id)
+            cls._zoom_changed_cb()
 
     @classmethod
     def setZoomLevel(cls, level):
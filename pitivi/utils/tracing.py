@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Tracing of the time spent in the main operations of the app.
+
+The recorded spans can be exported in the Chrome trace event format and
+inspected with chrome://tracing or https://ui.perfetto.dev.
+
+Synchronous operations are traced with:
+    with tracing.span("save-project"):
+        ...
+
+Operations finishing in a callback are traced with:
+    trace_span = tracing.begin("commit")
+    ...
+    tracing.end(trace_span)
+
+When tracing is disabled, `span` and `begin` return right away.
+"""
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+
+from pitivi.utils.loggable import Loggable
+
+# The maximum number of events kept in memory.
+MAX_EVENTS = 1000000
+
+_enabled = False
+_events = []
+_ids = itertools.count(1)
+_pid = os.getpid()
+
+
+def _timestamp():
+    """Gets the current monotonic time in microseconds."""
+    return time.monotonic() * 1000000
+
+
+def _add_event(event):
+    if len(_events) < MAX_EVENTS:
+        _events.append(event)
+
+
+class Span(object):
+    """An operation which is being traced.
+
+    Attributes:
+        name (str): The name of the operation.
+        category (str): The category of the operation.
+        args (dict): Details about the operation.
+    """
+
+    __slots__ = ("name", "category", "args", "_id", "_start")
+
+    def __init__(self, name, category, args, async_id=None):
+        self.name = name
+        self.category = category
+        self.args = args
+        self._id = async_id
+        self._start = _timestamp()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, unused_exc_type, unused_exc_value, unused_traceback):
+        start = self._start
+        _add_event({"name": self.name, "cat": self.category, "ph": "X",
+                    "ts": start, "dur": _timestamp() - start,
+                    "pid": _pid, "tid": threading.get_ident(),
+                    "args": self.args})
+
+
+class _NullSpan(object):
+    """The span returned when tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, unused_exc_type, unused_exc_value, unused_traceback):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, category="pitivi", **args):
+    """Traces the operation executed in a `with` block.
+
+    Args:
+        name (str): The name of the operation.
+        category (Optional[str]): The category of the operation.
+        **args: Details about the operation.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return Span(name, category, args)
+
+
+def begin(name, category="pitivi", **args):
+    """Starts tracing an operation which finishes asynchronously.
+
+    Args:
+        name (str): The name of the operation.
+        category (Optional[str]): The category of the operation.
+        **args: Details about the operation.
+
+    Returns:
+        Optional[Span]: The span to be passed to `end`, or None if
+        tracing is disabled.
+    """
+    if not _enabled:
+        return None
+    trace_span = Span(name, category, args, async_id=next(_ids))
+    _add_event({"name": name, "cat": category, "ph": "b", "id": trace_span._id,
+                "ts": trace_span._start, "pid": _pid, "tid": threading.get_ident(),
+                "args": args})
+    return trace_span
+
+
+def end(trace_span, **args):
+    """Stops tracing an operation started with `begin`.
+
+    Args:
+        trace_span (Optional[Span]): The value returned by `begin`.
+        **args: Details about the result of the operation.
+    """
+    if trace_span is None:
+        return
+    _add_event({"name": trace_span.name, "cat": trace_span.category, "ph": "e",
+                "id": trace_span._id, "ts": _timestamp(), "pid": _pid,
+                "tid": threading.get_ident(), "args": args})
+
+
+def is_enabled():
+    """Returns whether the operations are being traced."""
+    return _enabled
+
+
+def enable():
+    """Starts recording the traced operations."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stops recording the traced operations.
+
+    The events already recorded are kept until `clear` is called.
+    """
+    global _enabled
+    _enabled = False
+
+
+def clear():
+    """Forgets the recorded events."""
+    del _events[:]
+
+
+def get_events():
+    """Gets the recorded events, in the Chrome trace event format."""
+    return list(_events)
+
+
+def export(path):
+    """Writes the recorded events to a Chrome trace event JSON file.
+
+    Args:
+        path (str): The path of the file to write.
+    """
+    with open(path, "w") as trace_file:
+        json.dump({"traceEvents": get_events(), "displayTimeUnit": "ms"},
+                  trace_file, default=str)
+
+
+class _Exporter(Loggable):
+    """Writes the recorded events when the app exits."""
+
+    def __init__(self, path):
+        Loggable.__init__(self)
+        self.path = path
+
+    def export(self):
+        try:
+            export(self.path)
+        except OSError as e:
+            self.error("Failed to write the trace to %s: %s", self.path, e)
+            return
+        self.info("Trace written to %s", self.path)
+
+
+def init(env_var_name):
+    """Enables tracing if the specified environment variable is set.
+
+    The value of the environment variable is the path of the file where
+    the trace is written when the app exits.
+
+    Args:
+        env_var_name (str): The name of the environment variable.
+    """
+    path = os.environ.get(env_var_name)
+    if not path:
+        return
+
+    enable()
+    atexit.register(_Exporter(path).export)
@@ -44,6 +44,9 @@ from pitivi.utils.ui import time_to_string
 
 ZOOM_SLIDER_PADDING = SPACING * 4 / 5
 
+# The properties of the effects which are not presented to the user.
+PROPS_TO_IGNORE = ['name', 'qos', 'silent', 'message', 'parent']
+
 
 class DynamicWidget(Loggable):
     """Abstract widget providing a way to get, set and observe properties."""
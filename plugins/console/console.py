@@ -30,6 +30,7 @@ from widgets import ConsoleWidget
 
 from pitivi.dialogs.prefs import PreferencesDialog
 from pitivi.settings import ConfigError
+from pitivi.utils import tracing
 
 
 class PitiviNamespace(Namespace):
@@ -63,6 +64,18 @@ class PitiviNamespace(Namespace):
         """The GES.Timeline of the current project."""
         return self._app.gui.editor.timeline_ui.timeline.ges_timeline
 
+    @property
+    @Namespace.shortcut
+    def mainloop_monitor(self):
+        """The main loop monitor, for example `print(mainloop_monitor.report())`."""
+        return self._app.mainloop_monitor
+
+    @property
+    @Namespace.shortcut
+    def tracing(self):
+        """The tracing module, for example `tracing.enable()` and `tracing.export(path)`."""
+        return tracing
+
 
 class Console(GObject.GObject, Peas.Activatable):
     """Plugin which adds a Python console for development purposes."""
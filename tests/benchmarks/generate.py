@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Generation of the synthetic media files and projects used by the benchmarks."""
+import os
+
+from gi.repository import GES
+from gi.repository import Gst
+from gi.repository import GstController
+
+MEDIA_PIPELINE = (
+    "videotestsrc pattern=ball num-buffers=%(video_buffers)d"
+    " ! video/x-raw,width=%(width)d,height=%(height)d,framerate=%(framerate)d/1"
+    " ! theoraenc ! oggmux name=mux ! filesink location=\"%(path)s\""
+    " audiotestsrc wave=ticks samplesperbuffer=%(samples_per_buffer)d"
+    " num-buffers=%(audio_buffers)d"
+    " ! audio/x-raw,rate=%(rate)d,channels=2 ! audioconvert ! vorbisenc ! mux.")
+
+# The effects added to the clips, cycled through.
+EFFECTS = ["videobalance saturation=1.5", "agingtv", "videoflip method=horizontal-flip"]
+
+
+def generate_media(path, duration=10, width=320, height=240, framerate=30):
+    """Encodes an audio-video file with test patterns.
+
+    Args:
+        path (str): The path of the Ogg file to create.
+        duration (Optional[int]): The duration in seconds.
+        width (Optional[int]): The width of the video.
+        height (Optional[int]): The height of the video.
+        framerate (Optional[int]): The number of frames per second.
+
+    Returns:
+        str: The URI of the created file.
+    """
+    rate = 44100
+    samples_per_buffer = rate // 10
+    pipeline = Gst.parse_launch(MEDIA_PIPELINE % {
+        "path": path,
+        "width": width,
+        "height": height,
+        "framerate": framerate,
+        "video_buffers": duration * framerate,
+        "rate": rate,
+        "samples_per_buffer": samples_per_buffer,
+        "audio_buffers": duration * 10})
+    pipeline.set_state(Gst.State.PLAYING)
+    try:
+        message = pipeline.get_bus().timed_pop_filtered(
+            Gst.CLOCK_TIME_NONE, Gst.MessageType.EOS | Gst.MessageType.ERROR)
+        if message.type == Gst.MessageType.ERROR:
+            error, detail = message.parse_error()
+            raise RuntimeError("Failed to generate %s: %s %s" % (path, error, detail))
+    finally:
+        pipeline.set_state(Gst.State.NULL)
+    return Gst.filename_to_uri(path)
+
+
+def generate_project(path, media_uri, layers=1, clips=10, keyframes=0, effects=0):
+    """Creates a project file with clips of the specified media file.
+
+    Args:
+        path (str): The path of the xges file to create.
+        media_uri (str): The URI of the media file used by the clips.
+        layers (Optional[int]): The number of layers.
+        clips (Optional[int]): The number of clips on each layer.
+        keyframes (Optional[int]): The number of alpha keyframes on the
+            video source of each clip.
+        effects (Optional[int]): The number of effects on each clip.
+
+    Returns:
+        str: The URI of the created project file.
+    """
+    timeline = GES.Timeline.new_audio_video()
+    asset = GES.UriClipAsset.request_sync(media_uri)
+    duration = asset.get_duration()
+    for unused_index in range(layers):
+        layer = timeline.append_layer()
+        for clip_index in range(clips):
+            clip = layer.add_asset(asset, clip_index * duration, 0, duration,
+                                   GES.TrackType.UNKNOWN)
+            if keyframes:
+                _add_keyframes(clip, keyframes)
+            for effect_index in range(effects):
+                clip.add(GES.Effect.new(EFFECTS[effect_index % len(EFFECTS)]))
+
+    uri = Gst.filename_to_uri(path)
+    if not timeline.save_to_uri(uri, None, True):
+        raise RuntimeError("Failed to save %s" % path)
+    return uri
+
+
+def _add_keyframes(clip, count):
+    source = clip.find_track_element(None, GES.VideoSource)
+    control_source = GstController.InterpolationControlSource()
+    control_source.props.mode = GstController.InterpolationMode.LINEAR
+    source.set_control_source(control_source, "alpha", "direct")
+    step = clip.props.duration // max(1, count - 1)
+    for index in range(count):
+        control_source.set(clip.props.inpoint + index * step, (index % 2) * 0.5 + 0.5)
+
+
+def generate_workload(directory, params):
+    """Generates the media file and the project for the specified parameters.
+
+    Args:
+        directory (str): The directory where to create the files.
+        params (dict): The benchmark parameters.
+
+    Returns:
+        (str, str): The URIs of the media file and of the project file.
+    """
+    media_uri = generate_media(os.path.join(directory, "media.ogg"),
+                               duration=params["media_duration"])
+    project_uri = generate_project(os.path.join(directory, "project.xges"),
+                                   media_uri,
+                                   layers=params["layers"],
+                                   clips=params["clips"],
+                                   keyframes=params["keyframes"],
+                                   effects=params["effects"])
+    return media_uri, project_uri
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Runs the app and measures the operations done on a project.
+
+Usage:
+    python3 -m tests.benchmarks.session [PROJECT_URI SAVE_URI]
+
+Without a project, the app quits as soon as the greeter is displayed.
+With a project, the app loads it, saves it as SAVE_URI, removes all the
+clips and undoes and redoes the removal. The durations are printed on
+stdout as a JSON object.
+"""
+import json
+import sys
+import time
+
+from gi.repository import Gio
+from gi.repository import GLib
+
+from pitivi.application import Pitivi
+
+
+class Session(object):
+    """Drives the app through the benchmarked operations.
+
+    Attributes:
+        app (Pitivi): The app.
+        metrics (dict): The measured durations in seconds, by name.
+    """
+
+    def __init__(self, app, save_uri=None):
+        self.app = app
+        self.save_uri = save_uri
+        self.metrics = {}
+        self.__loading_time = 0
+
+        app.connect("activate", self.__activate_cb)
+        app.project_manager.connect("new-project-loading", self.__project_loading_cb)
+        app.project_manager.connect("new-project-loaded", self.__project_loaded_cb)
+        app.project_manager.connect("new-project-failed", self.__project_failed_cb)
+
+    def __activate_cb(self, unused_app):
+        # Handlers run before Pitivi.do_activate, so this idle callback
+        # runs right after the greeter has been displayed.
+        GLib.idle_add(self.app.quit)
+
+    def __project_loading_cb(self, unused_project_manager, unused_project):
+        self.__loading_time = time.monotonic()
+
+    def __project_loaded_cb(self, unused_project_manager, unused_project):
+        self.metrics["project-load"] = time.monotonic() - self.__loading_time
+        GLib.idle_add(self.__operations_cb)
+
+    def __project_failed_cb(self, unused_project_manager, uri, reason):
+        sys.stderr.write("Failed loading %s: %s\n" % (uri, reason))
+        self.app.quit()
+
+    def __measure(self, name, func, *args):
+        start = time.monotonic()
+        func(*args)
+        self.metrics[name] = time.monotonic() - start
+
+    def __operations_cb(self):
+        try:
+            project_manager = self.app.project_manager
+            self.__measure("project-save", project_manager.saveProject, self.save_uri)
+
+            action_log = self.app.action_log
+            self.__measure("remove-all-clips", self.__remove_all_clips)
+            self.__measure("undo-remove-all-clips", action_log.undo)
+            self.__measure("redo-remove-all-clips", action_log.redo)
+        finally:
+            self.app.quit()
+        return False
+
+    def __remove_all_clips(self):
+        ges_timeline = self.app.project_manager.current_project.ges_timeline
+        with self.app.action_log.started("remove all clips", toplevel=True):
+            for layer in ges_timeline.get_layers():
+                for clip in layer.get_clips():
+                    layer.remove_clip(clip)
+
+
+def main(argv):
+    app = Pitivi()
+    # Do not forward the files to an already running instance.
+    app.set_flags(app.get_flags() | Gio.ApplicationFlags.NON_UNIQUE)
+    if len(argv) > 1:
+        session = Session(app, save_uri=argv[2])
+        app.run([argv[0], argv[1]])
+    else:
+        session = Session(app)
+        app.run([argv[0]])
+    print(json.dumps(session.metrics))
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""The benchmarks and the comparison of their results with a baseline."""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from gi.repository import GdkPixbuf
+from gi.repository import Gst
+
+from pitivi.configure import VERSION
+from pitivi.timeline.previewers import renderer
+from pitivi.timeline.previewers import SAMPLE_DURATION
+from pitivi.timeline.previewers import ThumbnailCache
+from tests import get_pitivi_dir
+from tests.benchmarks.generate import generate_workload
+
+# The parameters of the generated workload, by size.
+SIZES = {
+    "small": {"layers": 1, "clips": 10, "keyframes": 0, "effects": 0,
+              "media_duration": 5, "thumbnails": 100},
+    "medium": {"layers": 3, "clips": 50, "keyframes": 10, "effects": 1,
+               "media_duration": 10, "thumbnails": 500},
+    "large": {"layers": 10, "clips": 100, "keyframes": 50, "effects": 2,
+              "media_duration": 30, "thumbnails": 2000},
+}
+
+# The units of the metrics for which a bigger value is better.
+HIGHER_IS_BETTER_UNITS = ("ops/s",)
+
+# The default maximum relative change before a metric is considered
+# to have regressed.
+DEFAULT_TOLERANCE = 0.2
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def run_session(*args, cache_dir=None):
+    """Runs the app in a new process, as the user would.
+
+    Args:
+        cache_dir (Optional[str]): The Pitivi cache dir to use instead of
+            the user's.
+
+    Returns:
+        (float, dict): The wall-clock duration of the process in seconds
+        and the metrics it reported.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([get_pitivi_dir()] + sys.path)
+    if cache_dir:
+        env["PITIVI_USER_CACHE_DIR"] = cache_dir
+    start = time.monotonic()
+    result = subprocess.run([sys.executable, "-m", "tests.benchmarks.session"] + list(args),
+                            env=env, stdout=subprocess.PIPE, universal_newlines=True,
+                            check=True)
+    duration = time.monotonic() - start
+    return duration, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def bench_startup(unused_workload, unused_params):
+    """Measures how long it takes to start the app and display the greeter."""
+    # Start with an empty cache every time, so the runs are all cold.
+    # The GStreamer registry is kept, it's not built by Pitivi.
+    with tempfile.TemporaryDirectory() as cache_dir:
+        duration, unused_metrics = run_session(cache_dir=cache_dir)
+    return {"startup": (duration, "s")}
+
+
+def bench_project(workload, unused_params):
+    """Measures how long it takes to load, save and edit the project."""
+    unused_media_uri, project_uri = workload
+    save_uri = project_uri.replace(".xges", "-saved.xges")
+    unused_duration, metrics = run_session(project_uri, save_uri)
+    return {name: (value, "s") for name, value in metrics.items()}
+
+
+def bench_thumbnail_cache(workload, params):
+    """Measures the throughput of the thumbnails cache."""
+    media_uri, unused_project_uri = workload
+    count = params["thumbnails"]
+    pixbuf = GdkPixbuf.Pixbuf.new(GdkPixbuf.Colorspace.RGB, False, 8, 160, 90)
+    pixbuf.fill(0x336699ff)
+
+    cache = ThumbnailCache(media_uri)
+    start = time.monotonic()
+    for position in range(count):
+        cache[position * Gst.SECOND] = pixbuf
+    cache.commit()
+    write_duration = time.monotonic() - start
+
+    start = time.monotonic()
+    for position in range(count):
+        cache[position * Gst.SECOND]
+    read_duration = time.monotonic() - start
+
+    return {"thumbnail-cache-write": (count / write_duration, "ops/s"),
+            "thumbnail-cache-read": (count / read_duration, "ops/s")}
+
+
+def bench_waveform(unused_workload, params):
+    """Measures how long it takes to render the waveform of a layer."""
+    duration = params["media_duration"] * params["clips"] * Gst.SECOND
+    samples = [random.random() for unused_index in range(int(duration / SAMPLE_DURATION))]
+    start = time.monotonic()
+    renderer.fill_surface(samples, 4000, 100)
+    return {"waveform-render": (time.monotonic() - start, "s")}
+
+
+BENCHMARKS = [bench_startup, bench_project, bench_thumbnail_cache, bench_waveform]
+
+
+def run_benchmarks(params, repeat=3, names=None):
+    """Runs the benchmarks on a generated workload.
+
+    Args:
+        params (dict): The parameters of the workload.
+        repeat (Optional[int]): How many times to run each benchmark.
+        names (Optional[List[str]]): The names of the benchmarks to run,
+            without the "bench_" prefix. By default all are run.
+
+    Returns:
+        dict: The results, in the format written by `main`.
+    """
+    metrics = {}
+    with tempfile.TemporaryDirectory() as directory:
+        workload = generate_workload(directory, params)
+        for benchmark in BENCHMARKS:
+            name = benchmark.__name__[len("bench_"):]
+            if names and name not in names:
+                continue
+            samples = {}
+            for unused_index in range(repeat):
+                for metric, (value, unit) in benchmark(workload, params).items():
+                    samples.setdefault(metric, (unit, []))[1].append(value)
+            for metric, (unit, values) in samples.items():
+                metrics[metric] = {"value": statistics.median(values),
+                                   "unit": unit,
+                                   "samples": values}
+
+    return {"parameters": params,
+            "environment": {"pitivi": VERSION,
+                            "gstreamer": Gst.version_string(),
+                            "python": platform.python_version(),
+                            "machine": platform.machine(),
+                            "cpus": os.cpu_count()},
+            "metrics": metrics}
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Compares the metrics with the ones of a baseline.
+
+    Args:
+        results (dict): The results of `run_benchmarks`.
+        baseline (dict): The results to compare with.
+        tolerance (Optional[float]): The maximum relative change before a
+            metric is considered to have regressed.
+
+    Returns:
+        List[Tuple[str, float, float, float, bool]]: The name, the baseline
+        value, the new value, the relative change and whether it's a
+        regression, for each metric found in both results.
+    """
+    rows = []
+    for name, metric in sorted(results["metrics"].items()):
+        baseline_metric = baseline["metrics"].get(name)
+        if not baseline_metric or not baseline_metric["value"]:
+            continue
+        change = metric["value"] / baseline_metric["value"] - 1
+        if metric["unit"] in HIGHER_IS_BETTER_UNITS:
+            regressed = change < -tolerance
+        else:
+            regressed = change > tolerance
+        rows.append((name, baseline_metric["value"], metric["value"], change, regressed))
+    return rows
+
+
+def format_comparison(rows):
+    """Formats the rows returned by `compare_results` as a table."""
+    lines = ["%-28s %12s %12s %8s" % ("metric", "baseline", "current", "change")]
+    for name, baseline_value, value, change, regressed in rows:
+        lines.append("%-28s %12.4g %12.4g %+7.1f%%%s" % (
+            name, baseline_value, value, change * 100, "  REGRESSION" if regressed else ""))
+    return "\n".join(lines)
+
+
+def check_display():
+    """Checks a display is available for running the app."""
+    if os.environ.get("GDK_BACKEND") == "broadway":
+        return True
+    return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        prog="python3 -m tests.benchmarks",
+        description="Measures the performance of Pitivi on generated projects. "
+        "To run headless, use for example `xvfb-run -a python3 -m tests.benchmarks`.")
+    parser.add_argument("--size", choices=sorted(SIZES), default="small",
+                        help="the size of the generated workload")
+    for name in ("layers", "clips", "keyframes", "effects", "media_duration", "thumbnails"):
+        parser.add_argument("--" + name.replace("_", "-"), type=int, dest=name,
+                            help="overrides the %s of the workload size" % name)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="how many times to run each benchmark")
+    parser.add_argument("--benchmark", action="append", dest="names",
+                        choices=[bench.__name__[len("bench_"):] for bench in BENCHMARKS],
+                        help="the benchmark to run, can be repeated")
+    parser.add_argument("--output", help="the file where to write the JSON results")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE,
+                        help="the JSON results to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="the relative change considered a regression")
+    options = parser.parse_args(argv[1:])
+
+    if not check_display():
+        print("No display available. Run the benchmarks with xvfb-run, "
+              "or with GDK_BACKEND=broadway and broadwayd running.", file=sys.stderr)
+        return 2
+
+    params = dict(SIZES[options.size])
+    for name in params:
+        if getattr(options, name) is not None:
+            params[name] = getattr(options, name)
+
+    results = run_benchmarks(params, repeat=options.repeat, names=options.names)
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+    else:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if not os.path.exists(options.baseline):
+        print("No baseline found at %s" % options.baseline, file=sys.stderr)
+        return 0
+
+    with open(options.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline["parameters"] != results["parameters"]:
+        print("The baseline has been generated with different parameters: %s" %
+              baseline["parameters"], file=sys.stderr)
+        return 2
+
+    rows = compare_results(results, baseline, tolerance=options.tolerance)
+    print(format_comparison(rows), file=sys.stderr)
+    return 1 if any(row[4] for row in rows) else 0
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Tests for the benchmarks tooling."""
+# pylint: disable=missing-docstring
+from tests import common
+from tests.benchmarks.suite import compare_results
+from tests.benchmarks.suite import format_comparison
+
+
+def results(**metrics):
+    return {"metrics": {name: {"value": value, "unit": unit}
+                        for name, (value, unit) in metrics.items()}}
+
+
+class TestBenchmarks(common.TestCase):
+
+    def test_compare_results(self):
+        baseline = results(**{"project-load": (1.0, "s"),
+                              "startup": (2.0, "s"),
+                              "thumbnail-cache-read": (100, "ops/s")})
+        current = results(**{"project-load": (1.5, "s"),
+                             "startup": (1.0, "s"),
+                             "thumbnail-cache-read": (50, "ops/s"),
+                             "waveform-render": (0.1, "s")})
+
+        rows = compare_results(current, baseline, tolerance=0.2)
+        self.assertEqual([(row[0], row[4]) for row in rows],
+                         [("project-load", True),
+                          ("startup", False),
+                          ("thumbnail-cache-read", True)])
+        self.assertIn("REGRESSION", format_comparison(rows))
+
+        rows = compare_results(current, baseline, tolerance=0.6)
+        self.assertFalse(any(row[4] for row in rows))
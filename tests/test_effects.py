@@ -20,6 +20,8 @@
 """Tests for the effects module."""
 # pylint: disable=attribute-defined-outside-init,protected-access
 import os
+import tempfile
+from unittest import mock
 
 from gi.repository import GES
 from gi.repository import Gst
@@ -27,6 +29,7 @@ from gi.repository import Gtk
 
 from pitivi.effects import AUDIO_EFFECT
 from pitivi.effects import EffectInfo
+from pitivi.effects import EffectsManager
 from pitivi.effects import EffectsPropertiesManager
 from pitivi.effects import PROPS_TO_IGNORE
 from pitivi.effects import VIDEO_EFFECT
@@ -77,6 +80,52 @@ class EffectInfoTest(common.TestCase):
         self.assertTrue(effect_info.good_for_track_element(video_track_element))
 
 
+class EffectsManagerTest(common.TestCase):
+    """Tests for the EffectsManager class."""
+
+    def test_catalogue_cache(self):
+        """Checks the effects catalogue is cached until the plugins change."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "effects.json")
+            with mock.patch.object(EffectsManager, "_get_cache_path") as _get_cache_path, \
+                    mock.patch("pitivi.effects.check_gl_effects") as check_gl_effects:
+                _get_cache_path.return_value = cache_path
+                check_gl_effects.return_value = True
+
+                manager = EffectsManager()
+                self.assertIsNotNone(manager._builder)
+                video_effects = manager.video_effects
+                self.assertTrue(video_effects)
+                self.assertTrue(os.path.exists(cache_path))
+
+                manager = EffectsManager()
+                self.assertIsNone(manager._builder)
+                self.assertEqual(manager.video_effects, video_effects)
+                name = video_effects[0]
+                self.assertEqual(manager.getInfo(name).effect_name, name)
+
+                with mock.patch("pitivi.effects.get_registry_fingerprint") as get_registry_fingerprint:
+                    get_registry_fingerprint.return_value = "changed"
+                    manager = EffectsManager()
+                    self.assertIsNotNone(manager._builder)
+                    self.assertEqual(manager.video_effects, video_effects)
+
+    def test_catalogue_build_failure(self):
+        """Checks the effects manager is usable when the catalogue fails."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = os.path.join(temp_dir, "effects.json")
+            with mock.patch.object(EffectsManager, "_get_cache_path") as _get_cache_path, \
+                    mock.patch("pitivi.effects.build_effects_catalogue") as build_effects_catalogue:
+                _get_cache_path.return_value = cache_path
+                build_effects_catalogue.side_effect = RuntimeError("registry broken")
+
+                manager = EffectsManager()
+                self.assertEqual(manager.video_effects, [])
+                self.assertEqual(manager.audio_effects, [])
+                self.assertIsNone(manager.getInfo("agingtv"))
+                self.assertFalse(os.path.exists(cache_path))
+
+
 class EffectsPropertiesManagerTest(common.TestCase):
     """Tests for the EffectsPropertiesManager class."""
 
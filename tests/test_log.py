@@ -15,7 +15,12 @@
 # Flumotion Advanced Streaming Server Commercial License Agreement.
 # See "LICENSE.Flumotion" in the source distribution for more information.
 # Headers in this file shall remain intact.
+import io
+import json
+import threading
+import timeit
 import unittest
+from unittest import mock
 
 from pitivi.utils import loggable as log
 
@@ -147,6 +152,138 @@ class TestLog(TestWithHandler):
         self.assertEqual(self.message, 'also visible')
 
 
+class TestShortcutLogging(TestWithHandler):
+
+    def setUp(self):
+        TestWithHandler.setUp(self)
+        self.tester = LogTester()
+
+    def tearDown(self):
+        log.setDebug("*:1")
+
+    def testThresholdsInvalidated(self):
+        log.setDebug("testlog:%d" % log.INFO)
+        log.addLimitedLogHandler(self.handler)
+
+        self.tester.debug("not visible")
+        self.assertIsNone(self.message)
+
+        log.setDebug("testlog:%d" % log.DEBUG)
+        self.tester.debug("visible")
+        self.assertEqual(self.message, "visible")
+
+        log.setDebug("testlog:%d" % log.INFO)
+        self.tester.debug("not visible")
+        self.assertEqual(self.message, "visible")
+
+        # Unfiltered handlers receive everything.
+        log.addLogHandler(self.handler)
+        self.tester.log("log")
+        self.assertEqual(self.message, "log")
+
+    def testLogEnabled(self):
+        log.setDebug("testlog:%d" % log.DEBUG)
+        self.assertFalse(log.LOG_ENABLED)
+
+        log.setDebug("testlog:%d" % log.LOG)
+        self.assertTrue(log.LOG_ENABLED)
+
+        log.setDebug("*:%d" % log.INFO)
+        self.assertFalse(log.LOG_ENABLED)
+        log.addLogHandler(self.handler)
+        self.assertTrue(log.LOG_ENABLED)
+        log.removeLogHandler(self.handler)
+        self.assertFalse(log.LOG_ENABLED)
+
+    def testLazyArguments(self):
+        func = mock.Mock(return_value="value")
+        log.setDebug("testlog:%d" % log.INFO)
+        log.addLimitedLogHandler(self.handler)
+
+        self.tester.debug("not visible %s", log.Lazy(func, 1))
+        self.assertFalse(func.called)
+
+        self.tester.info("visible %s", log.Lazy(func, 1))
+        func.assert_called_once_with(1)
+        self.assertEqual(self.message, "visible value")
+
+    def testDisabledLoggingBenchmark(self):
+        log.setDebug("testlog:%d" % log.INFO)
+        log.addLimitedLogHandler(self.handler)
+        func = mock.Mock()
+
+        number = 100000
+        duration = timeit.timeit(
+            lambda: self.tester.log("not visible %s", log.Lazy(func)),
+            number=number)
+        self.assertFalse(func.called)
+        # Generous budget, a disabled call should take well under a microsecond.
+        self.assertLess(duration / number, 0.00002)
+
+
+class TestAsyncLogHandler(unittest.TestCase):
+
+    def setUp(self):
+        log.reset()
+        self.tester = LogTester()
+
+    def tearDown(self):
+        log.reset()
+        log.setDebug("*:1")
+
+    def testJsonLines(self):
+        outfile = io.StringIO()
+        handler = log.AsyncLogHandler(outfile, json_lines=True)
+        log.setDebug("testlog:%d" % log.INFO)
+        log.addLimitedLogHandler(handler)
+
+        self.tester.info("%d %s", 42, "the answer")
+        self.tester.debug("not visible")
+        self.tester.warning("also visible")
+        handler.stop()
+
+        records = [json.loads(line) for line in outfile.getvalue().splitlines()]
+        self.assertEqual([(record["level"], record["category"]) for record in records],
+                         [("INFO", "testlog"), ("WARN", "testlog")])
+        self.assertTrue(records[0]["message"].endswith("42 the answer"))
+        self.assertIn("test_log.py", records[0]["file"])
+        self.assertEqual(handler.dropped, 0)
+
+    def testDropped(self):
+        outfile = io.StringIO()
+        # The writer does not wake up until stopped.
+        handler = log.AsyncLogHandler(outfile, max_pending=2, interval=1000)
+        log.setDebug("testlog:%d" % log.INFO)
+        log.addLimitedLogHandler(handler)
+
+        for i in range(5):
+            self.tester.info("message %d", i)
+        handler.stop()
+
+        self.assertEqual(handler.dropped, 3)
+        lines = outfile.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn("message 0", lines[0])
+        self.assertIn("message 1", lines[1])
+        self.assertIn("3 log records dropped", lines[2])
+
+    def testDroppedConcurrently(self):
+        handler = log.AsyncLogHandler(io.StringIO(), max_pending=0, interval=1000)
+
+        def log_many():
+            for unused_i in range(10000):
+                handler(log.INFO, None, "testlog", __file__, 0, "message")
+
+        threads = [threading.Thread(target=log_many) for unused_i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        handler.stop()
+
+        self.assertEqual(handler.dropped, 40000)
+
+
 class TestOwnLogHandler(TestWithHandler):
 
     def setUp(self):
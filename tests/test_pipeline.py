@@ -25,6 +25,7 @@ from gi.repository import GLib
 from gi.repository import Gst
 
 from pitivi.utils.pipeline import MAX_RECOVERIES
+from pitivi.utils.pipeline import MIN_COMMIT_INTERVAL
 from pitivi.utils.pipeline import Pipeline
 from pitivi.utils.pipeline import SimplePipeline
 from tests import common
@@ -155,3 +156,41 @@ class TestPipeline(common.TestCase):
                         pipe.commit_timeline()
                         self.assertEqual(commit.call_count, 0)
                 self.assertEqual(commit.call_count, 1)
+
+    def test_commit_timeline_throttled(self):
+        """Checks the commits are rate limited and merged."""
+        pipe = Pipeline(common.create_pitivi_mock())
+        timeline = GES.Timeline()
+        pipe.set_timeline(timeline)
+
+        with mock.patch.object(pipe, "getState") as get_state, \
+                mock.patch.object(pipe, "_addWaitingForAsyncDoneTimeout"), \
+                mock.patch.object(timeline, "is_empty") as is_empty, \
+                mock.patch.object(timeline, "commit") as commit:
+            get_state.return_value = (0, Gst.State.PAUSED, 0)
+            is_empty.return_value = False
+
+            pipe.commit_timeline()
+            self.assertEqual(commit.call_count, 1)
+
+            # Too soon after the previous commit.
+            pipe.commit_timeline()
+            pipe.commit_timeline()
+            self.assertEqual(commit.call_count, 1)
+            self.assertTrue(pipe._commit_wanted)
+
+            # The deferred requests are merged into a single commit.
+            pipe._last_commit_time -= MIN_COMMIT_INTERVAL
+            pipe._remove_commit_timeout()
+            pipe._commit_timeout_cb()
+            self.assertEqual(commit.call_count, 2)
+            self.assertFalse(pipe._commit_wanted)
+            self.assertEqual(pipe.commit_stats.requested, 3)
+            self.assertEqual(pipe.commit_stats.merged, 1)
+
+            # The latency is measured until ASYNC_DONE.
+            message = mock.Mock()
+            message.type = Gst.MessageType.ASYNC_DONE
+            pipe._busMessageCb(None, message)
+            self.assertEqual(len(pipe.commit_stats.latencies), 1)
+            self.assertGreaterEqual(pipe.commit_stats.max_latency, 0)
@@ -23,6 +23,7 @@ from unittest import mock
 
 from gi.repository import GObject
 
+from pitivi.mainwindow import MainWindow
 from pitivi.pluginmanager import PluginManager
 from pitivi.settings import GlobalSettings
 from tests import common
@@ -74,3 +75,22 @@ class TestPluginManager(common.TestCase):
 
             loaded_plugins = plugin_manager.engine.get_loaded_plugins()
             self.assertCountEqual(loaded_plugins, app.settings.ActivePlugins)
+
+    def test_plugins_loaded_after_lazy_editor(self):
+        """Checks the plugins are activated once the editor is created."""
+        app = common.create_pitivi(ActivePlugins=["console"])
+        window = MainWindow(app)
+        app.gui = window
+        app.add_window(window)
+        window.setup_ui(lazy_editor=True)
+        self.assertIsNone(window.editor)
+        self.assertEqual(app.plugin_manager.engine.get_loaded_plugins(), [])
+
+        window.ensure_editor()
+        self.assertEqual(app.plugin_manager.engine.get_loaded_plugins(), ["console"])
+        console = app.plugin_manager.get_extension("console")
+        self.assertIsNotNone(console.menu_item)
+
+        app.plugin_manager.engine.unload_plugin(
+            app.plugin_manager.get_plugin_info("console"))
+        window.destroy()
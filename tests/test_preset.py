@@ -18,12 +18,19 @@
 # Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
 # Boston, MA 02110-1301, USA.
 # TODO: add a specific testcase for audio, video, render presets
+import json
 import os.path
 import shutil
 import tempfile
+from unittest import mock
+
+from gi.repository import GstPbutils
 
 from pitivi.preset import AudioPresetManager
+from pitivi.preset import EncodingTargetManager
+from pitivi.preset import get_dirs_mtimes
 from pitivi.preset import PresetManager
+from pitivi.preset import PresetsIndex
 from pitivi.utils.system import System
 from tests import common
 
@@ -108,6 +115,27 @@ class TestPresetBasics(common.TestCase):
         self.assertEqual('New preset 3', new_preset3)
 
 
+class TestPresetsIndex(common.TestCase):
+
+    def testGetUpdateInvalidate(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            mtimes = get_dirs_mtimes([temp_dir, "/pitivi/non/existing/directory"])
+            self.assertIsNone(mtimes["/pitivi/non/existing/directory"])
+
+            path = os.path.join(temp_dir, "presets.json")
+            index = PresetsIndex(path)
+            self.assertIsNone(index.get("audio", mtimes))
+
+            entries = [["a.json", 1, False, {"name": "A"}]]
+            index.update("audio", mtimes, entries)
+            self.assertEqual(PresetsIndex(path).get("audio", mtimes), entries)
+            self.assertIsNone(PresetsIndex(path).get("audio", {temp_dir: 0}))
+            self.assertIsNone(PresetsIndex(path).get("video", mtimes))
+
+            index.invalidate("audio")
+            self.assertIsNone(PresetsIndex(path).get("audio", mtimes))
+
+
 class TestAudioPresetsIO(common.TestCase):
 
     def setUp(self):
@@ -217,3 +245,99 @@ class TestAudioPresetsIO(common.TestCase):
             self.assertFalse(other_manager.hasPreset(preset_name), preset_name)
             new_name = new_name_template % preset_name
             self.assertTrue(other_manager.hasPreset(new_name), new_name)
+
+    def testLoadFromIndex(self):
+        self.manager.createPreset("Vegeta",
+                                  {"channels": 6000,
+                                   "sample-rate": 44100})
+        self.manager.saveAll()
+        self.createOtherManager().loadAll()
+
+        other_manager = self.createOtherManager()
+        with mock.patch.object(other_manager, "_scan_presets") as scan_presets,\
+                mock.patch.object(other_manager, "_refresh") as refresh:
+            other_manager.loadAll()
+            scan_presets.assert_not_called()
+            refresh.assert_called_once_with()
+        self.assertEqual(other_manager.presets["Vegeta"],
+                         self.manager.presets["Vegeta"])
+
+        # Add a preset file behind our back.
+        with open(os.path.join(self.manager.user_path, "nappa.json"), "w") as fout:
+            json.dump({"name": "Nappa", "channels": 4000, "sample-rate": 44100}, fout)
+        # Make sure the change is noticed even with coarse timestamps.
+        os.utime(self.manager.user_path, ns=(1, 1))
+
+        other_manager = self.createOtherManager()
+        with mock.patch.object(other_manager, "_refresh") as refresh:
+            other_manager.loadAll()
+            refresh.assert_not_called()
+        self.assertTrue(other_manager.hasPreset("Vegeta"))
+        self.assertTrue(other_manager.hasPreset("Nappa"))
+
+    def testRefreshChangedPreset(self):
+        self.manager.createPreset("Vegeta",
+                                  {"channels": 6000,
+                                   "sample-rate": 44100})
+        self.manager.saveAll()
+        self.manager.restorePreset(None)
+        self.manager.loadAll()
+        scan = self.manager._scan_presets(self.manager._entries)
+        self.assertEqual(scan["entries"], self.manager._entries)
+
+        # Modify the preset file in place, which does not change the dir.
+        filepath = self.manager.presets["Vegeta"]["filepath"]
+        with open(filepath, "w") as fout:
+            json.dump({"name": "Vegeta", "channels": 2, "sample-rate": 48000}, fout)
+        os.utime(filepath, ns=(1, 1))
+
+        scan = self.manager._scan_presets(self.manager._entries)
+        self.manager._set_entries(scan)
+        self.assertEqual(self.manager.presets["Vegeta"]["channels"], 2)
+        self.assertEqual(self.manager.presets["Vegeta"]["sample-rate"], 48000)
+
+
+class TestEncodingTargetManager(common.TestCase):
+
+    def testLazyLoading(self):
+        with mock.patch("pitivi.preset.xdg_data_home") as xdg_data_home:
+            xdg_data_home.return_value = "/pitivi-dir-which-does-not-exist"
+            manager = EncodingTargetManager(None)
+            with mock.patch.object(manager, "_refresh"):
+                manager.loadAll()
+            self.assertIsNotNone(manager.get_profile("test"))
+
+            # The presets index is up to date so the profiles are loaded
+            # only when needed.
+            other_manager = EncodingTargetManager(None)
+            with mock.patch.object(other_manager, "_refresh"):
+                other_manager.loadAll()
+        self.assertEqual(set(other_manager.presets), set(manager.presets))
+        self.assertIsNone(other_manager.presets["test"])
+
+        profile = other_manager.get_profile("test")
+        self.assertEqual(profile.get_format().to_string(), "application/ogg")
+        self.assertIs(other_manager.presets["test"], profile)
+        self.assertIs([row[1] for row in other_manager.ordered if row[0] == "test"][0],
+                      profile)
+
+    def testSystemTargetsFallback(self):
+        with mock.patch("pitivi.preset.xdg_data_home") as xdg_data_home:
+            xdg_data_home.return_value = "/pitivi-dir-which-does-not-exist"
+            manager = EncodingTargetManager(None)
+            with mock.patch.object(manager, "_refresh"):
+                manager.loadAll()
+            profile = manager.get_profile("test")
+            target = GstPbutils.EncodingTarget.new("fallback", "device", "", [profile])
+
+            # The targets in the GStreamer data dir are not found by the scan.
+            other_manager = EncodingTargetManager(None)
+            with mock.patch.object(other_manager, "_get_system_presets_dirs",
+                                   return_value=["/pitivi-dir-which-does-not-exist"]), \
+                    mock.patch("pitivi.preset.GstPbutils.encoding_list_all_targets",
+                               return_value=[target]), \
+                    mock.patch.object(other_manager, "_refresh"):
+                other_manager.loadAll()
+        self.assertIs(other_manager.get_profile("fallback"), profile)
+        self.assertIsNotNone(other_manager.get_profile("test"))
+        self.assertIsNone(PresetsIndex.get_default().get("render", other_manager._mtimes))
@@ -204,6 +204,9 @@ class TestProjectManager(common.TestCase):
             # Save the project.
             self.assertTrue(self.manager.saveProject(uri=uri, backup=False))
             self.assertTrue(os.path.isfile(path))
+            # The temporary file replaced the project file.
+            self.assertFalse(os.path.exists(path + ".part"))
+            self.assertGreater(self.manager.save_duration, 0)
 
             # Wait a bit.
             time.sleep(0.1)
@@ -232,6 +235,21 @@ class TestProjectManager(common.TestCase):
             os.remove(path)
             os.remove(path2)
 
+    def test_save_project_failure(self):
+        self.manager.new_blank_project()
+
+        unused, path = tempfile.mkstemp(suffix=".xges")
+        try:
+            uri = "file://" + os.path.abspath(path)
+            with mock.patch("pitivi.project.commit_file") as commit_file:
+                commit_file.side_effect = OSError("disk full")
+                self.assertFalse(self.manager.saveProject(uri=uri, backup=False))
+            # The project file is not touched and the temporary file is removed.
+            self.assertEqual(os.path.getsize(path), 0)
+            self.assertFalse(os.path.exists(path + ".part"))
+        finally:
+            os.remove(path)
+
     def testMakeBackupUri(self):
         uri = "file:///tmp/x.xges"
         self.assertEqual(uri + "~", self.manager._makeBackupURI(uri))
@@ -249,7 +267,10 @@ class TestProjectManager(common.TestCase):
         # Save the backup
         self.assertTrue(self.manager.saveProject(
             self.manager.current_project, backup=True))
+        # The backup file is written in a separate thread.
+        self.manager.wait_backup_written()
         self.assertTrue(os.path.isfile(path_from_uri(backup_uri)))
+        self.assertFalse(os.path.exists(path_from_uri(backup_uri) + ".part"))
 
         self.manager.closeRunningProject()
         self.assertFalse(os.path.isfile(path_from_uri(backup_uri)),
@@ -81,7 +81,8 @@ class TestRender(BaseTestMediaLibrary):
             preset_manager = EncodingTargetManager(project.app)
             preset_manager.loadAll()
             self.assertTrue(preset_manager.presets)
-            for unused_name, container_profile in preset_manager.presets.items():
+            for name in list(preset_manager.presets):
+                container_profile = preset_manager.get_profile(name)
                 # Preset name is only set when the project loads it
                 project.set_container_profile(container_profile)
                 muxer = container_profile.get_preset_name()
@@ -165,3 +165,25 @@ class TestGlobalSettings(common.TestCase):
             settings2 = GlobalSettings()
             self.assertEqual(settings2.sectionNewOptionA, "kermit")
             self.assertEqual(settings2.sectionNewOptionB, [])
+
+    def test_late_config_option(self):
+        GlobalSettings.addConfigSection("section-late")
+        conf_file_content = ("[section-late]\n"
+                             "option-a = 10\n")
+
+        with mock.patch("pitivi.settings.xdg_config_home") as xdg_config_home,\
+                tempfile.TemporaryDirectory() as temp_dir:
+            with open(os.path.join(temp_dir, "pitivi.conf"), "w") as tmp_file:
+                tmp_file.write(conf_file_content)
+            xdg_config_home.return_value = temp_dir
+            settings = GlobalSettings()
+
+        # Options declared by lazily imported modules are read right away.
+        GlobalSettings.addConfigOption("sectionLateOptionA",
+                                       section="section-late", key="option-a",
+                                       default=50)
+        GlobalSettings.addConfigOption("sectionLateOptionB",
+                                       section="section-late", key="option-b",
+                                       default=False)
+        self.assertEqual(settings.sectionLateOptionA, 10)
+        self.assertEqual(settings.sectionLateOptionB, False)
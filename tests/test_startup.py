@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Tests for the time it takes to start the app."""
+# pylint: disable=missing-docstring
+import os
+import subprocess
+import sys
+
+from tests import common
+
+# The modules needed to display the greeter perspective.
+GREETER_MODULES = ["pitivi.application",
+                   "pitivi.mainwindow",
+                   "pitivi.greeterperspective"]
+
+# The modules which should be imported only when the editor is displayed.
+EDITOR_MODULES = ["matplotlib",
+                  "pitivi.clipproperties",
+                  "pitivi.editorperspective",
+                  "pitivi.effects",
+                  "pitivi.medialibrary",
+                  "pitivi.render",
+                  "pitivi.timeline.elements",
+                  "pitivi.timeline.timeline"]
+
+# The maximum time in seconds for importing the greeter modules.
+IMPORT_TIME_BUDGET = 1.5
+
+
+def parse_importtime(output):
+    """Parses the report printed by `python -X importtime`.
+
+    Args:
+        output (str): The stderr of the Python process.
+
+    Returns:
+        List[Tuple[str, int, int]]: The module name, the self time and
+        the cumulative time in microseconds, for each imported module.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us = int(fields[0])
+            cumulative_us = int(fields[1])
+        except ValueError:
+            # The header line.
+            continue
+        rows.append((fields[2].strip(), self_us, cumulative_us))
+    return rows
+
+
+def format_importtime_table(rows, count=20):
+    """Formats the slowest imports as a table."""
+    lines = ["%12s %12s  %s" % ("self (ms)", "cumul. (ms)", "module")]
+    for module, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:count]:
+        lines.append("%12.1f %12.1f  %s" % (self_us / 1000, cumulative_us / 1000, module))
+    return "\n".join(lines)
+
+
+def run_python(code, *args):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(sys.path)
+    return subprocess.run([sys.executable] + list(args) + ["-c", code],
+                          env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+
+class TestStartup(common.TestCase):
+
+    def test_parse_importtime(self):
+        output = ("import time: self [us] | cumulative | imported package\n"
+                  "import time:       120 |        120 |   _io\n"
+                  "import time:      2000 |       5000 | pitivi.project\n"
+                  "Some unrelated warning\n")
+        rows = parse_importtime(output)
+        self.assertEqual(rows, [("_io", 120, 120), ("pitivi.project", 2000, 5000)])
+        table = format_importtime_table(rows, count=1)
+        self.assertEqual(table.splitlines()[1].split(), ["2.0", "5.0", "pitivi.project"])
+
+    def test_greeter_does_not_import_editor(self):
+        code = "import sys\n"
+        code += "".join("import %s\n" % module for module in GREETER_MODULES)
+        code += "print(' '.join(m for m in %r if m in sys.modules))" % EDITOR_MODULES
+        result = run_python(code)
+        self.assertEqual(result.stdout.split(), [])
+
+    def test_import_time_budget(self):
+        code = "".join("import %s\n" % module for module in GREETER_MODULES)
+        result = run_python(code, "-X", "importtime")
+        rows = parse_importtime(result.stderr)
+        self.assertTrue(rows)
+
+        total = sum(self_us for unused_module, self_us, unused_cumulative_us in rows) / 1000000
+        self.assertLess(total, IMPORT_TIME_BUDGET,
+                        "Importing the greeter took %.2fs:\n%s" %
+                        (total, format_importtime_table(rows)))
@@ -20,7 +20,19 @@
 # pylint: disable=missing-docstring
 from unittest import TestCase
 
+from pitivi.utils.system import compute_cpu_usage
+from pitivi.utils.system import parse_proc_stat
 from pitivi.utils.system import System
+from pitivi.utils.system import SystemLoad
+from pitivi.utils.system import SystemLoadSampler
+from tests import common
+
+PROC_STAT = """cpu  %s
+cpu0 %s
+cpu1 %s
+intr 1234 0 0
+ctxt 5678
+"""
 
 
 class TestSystem(TestCase):
@@ -34,3 +46,57 @@ class TestSystem(TestCase):
         self.assertNotEqual(system.getUniqueFilename("a%/b"),
                             system.getUniqueFilename("a%37%3747b"))
         self.assertEqual("a b", system.getUniqueFilename("a b"))
+
+
+class TestSystemLoadSampler(TestCase):
+
+    def testParseProcStat(self):
+        text = PROC_STAT % ("100 0 50 800 40 5 5 0 0 0",
+                            "50 0 25 400 20 5 0",
+                            "50 0 25 400 20 0 5 0")
+        self.assertEqual(parse_proc_stat(text),
+                         [(1000, 840, 40), (500, 420, 20), (500, 420, 20)])
+
+    def testComputeCpuUsage(self):
+        self.assertEqual(compute_cpu_usage((1000, 840, 40), (2000, 1340, 140)), (50.0, 10.0))
+        self.assertEqual(compute_cpu_usage((1000, 840, 40), (1000, 840, 40)), (0.0, 0.0))
+
+    def testCpuBudget(self):
+        sampler = SystemLoadSampler()
+        sampler.load = SystemLoad(process=5, system=10, iowait=0, cores=[])
+        self.assertEqual(sampler.get_cpu_budget(20), 20)
+        self.assertFalse(sampler.is_busy())
+
+        sampler.load = SystemLoad(process=3, system=95, iowait=0, cores=[])
+        self.assertEqual(sampler.get_cpu_budget(20), 8)
+        self.assertTrue(sampler.is_busy())
+
+        # The load of Pitivi itself does not make the system busy.
+        sampler.load = SystemLoad(process=90, system=95, iowait=0, cores=[])
+        self.assertEqual(sampler.get_cpu_budget(100), 95)
+        self.assertFalse(sampler.is_busy())
+
+        sampler.load = SystemLoad(process=0, system=100, iowait=0, cores=[])
+        self.assertEqual(sampler.get_cpu_budget(20), 1)
+
+    def testSampling(self):
+        sampler = SystemLoadSampler(interval=0.01)
+        mainloop = common.create_main_loop()
+        loads = []
+
+        def load_changed_cb(sampler):
+            loads.append(sampler.load)
+            if len(loads) == 2:
+                mainloop.quit()
+
+        sampler.connect("load-changed", load_changed_cb)
+        sampler.hold()
+        try:
+            mainloop.run()
+        finally:
+            sampler.release()
+
+        self.assertEqual(len(loads), 2)
+        for load in loads:
+            self.assertGreaterEqual(load.process, 0)
+            self.assertGreaterEqual(load.system, 0)
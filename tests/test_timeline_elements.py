@@ -25,8 +25,8 @@ from gi.repository import Gdk
 from gi.repository import GES
 from gi.repository import Gst
 from gi.repository import Gtk
-from matplotlib.backend_bases import MouseEvent
 
+from pitivi.timeline.elements import decimate
 from pitivi.timeline.elements import GES_TYPE_UI_TYPE
 from pitivi.undo.undo import UndoableActionLog
 from pitivi.utils.timeline import Zoomable
@@ -139,29 +139,24 @@ class TestKeyframeCurve(BaseTestTimeline):
         values = [item.timestamp for item in control_source.get_all()]
         self.assertEqual(values, [inpoint, inpoint + duration])
 
+        # Give the curve a size, the keyframes are mapped to it.
+        keyframe_curve.get_allocated_width = mock.Mock(return_value=int(duration_px) * 20)
+        keyframe_curve.get_allocated_height = mock.Mock(return_value=50)
+
         # Add keyframes by simulating mouse clicks.
         for offset_px in offsets_px:
             offset = Zoomable.pixelToNs(start_px + offset_px) - start
             xdata, ydata = inpoint + offset, 1
-            x, y = keyframe_curve._ax.transData.transform((xdata, ydata))
-
-            event = MouseEvent(
-                name="button_press_event",
-                canvas=keyframe_curve,
-                x=x,
-                y=y,
-                button=1
-            )
+            event = self.__curve_event(keyframe_curve, xdata, ydata)
             keyframe_curve.translate_coordinates = \
                 mock.Mock(return_value=(start_px + offset_px, None))
 
             with mock.patch.object(Gtk, "get_event_widget") as get_event_widget:
                 get_event_widget.return_value = keyframe_curve
-                event.guiEvent = Gdk.Event.new(Gdk.EventType.BUTTON_PRESS)
-                keyframe_curve._mpl_button_press_event_cb(event)
-                event.name = "button_release_event"
-                event.guiEvent = Gdk.Event.new(Gdk.EventType.BUTTON_RELEASE)
-                keyframe_curve._mpl_button_release_event_cb(event)
+                event.type = Gdk.EventType.BUTTON_PRESS
+                keyframe_curve._button_press_event_cb(keyframe_curve, event)
+                event.type = Gdk.EventType.BUTTON_RELEASE
+                keyframe_curve._button_release_event_cb(keyframe_curve, event)
 
             values = [item.timestamp for item in control_source.get_all()]
             self.assertIn(inpoint + offset, values)
@@ -170,36 +165,45 @@ class TestKeyframeCurve(BaseTestTimeline):
         for offset_px in offsets_px:
             offset = Zoomable.pixelToNs(start_px + offset_px) - start
             xdata, ydata = inpoint + offset, 1
-            x, y = keyframe_curve._ax.transData.transform((xdata, ydata))
-
-            event = MouseEvent(
-                name="button_press_event",
-                canvas=keyframe_curve,
-                x=x,
-                y=y,
-                button=1
-            )
+            event = self.__curve_event(keyframe_curve, xdata, ydata)
             keyframe_curve.translate_coordinates = \
                 mock.Mock(return_value=(start_px + offset_px, None))
             with mock.patch.object(Gtk, "get_event_widget") as get_event_widget:
                 get_event_widget.return_value = keyframe_curve
-                event.guiEvent = Gdk.Event.new(Gdk.EventType.BUTTON_PRESS)
-                keyframe_curve._mpl_button_press_event_cb(event)
-                event.name = "button_release_event"
-                event.guiEvent = Gdk.Event.new(Gdk.EventType.BUTTON_RELEASE)
-                keyframe_curve._mpl_button_release_event_cb(event)
-                event.name = "button_press_event"
-                event.guiEvent = Gdk.Event.new(Gdk.EventType.BUTTON_PRESS)
-                keyframe_curve._mpl_button_press_event_cb(event)
-                event.guiEvent = Gdk.Event.new(Gdk.EventType._2BUTTON_PRESS)
-                keyframe_curve._mpl_button_press_event_cb(event)
-                event.name = "button_release_event"
-                event.guiEvent = Gdk.Event.new(Gdk.EventType.BUTTON_RELEASE)
-                keyframe_curve._mpl_button_release_event_cb(event)
+                event.type = Gdk.EventType.BUTTON_PRESS
+                keyframe_curve._button_press_event_cb(keyframe_curve, event)
+                event.type = Gdk.EventType.BUTTON_RELEASE
+                keyframe_curve._button_release_event_cb(keyframe_curve, event)
+                event.type = Gdk.EventType.BUTTON_PRESS
+                keyframe_curve._button_press_event_cb(keyframe_curve, event)
+                event.type = Gdk.EventType._2BUTTON_PRESS
+                keyframe_curve._button_press_event_cb(keyframe_curve, event)
+                event.type = Gdk.EventType.BUTTON_RELEASE
+                keyframe_curve._button_release_event_cb(keyframe_curve, event)
 
             values = [item.timestamp for item in control_source.get_all()]
             self.assertNotIn(inpoint + offset, values)
 
+    @staticmethod
+    def __curve_event(keyframe_curve, xdata, ydata):
+        """Creates a button event at the specified point of the curve."""
+        event = mock.Mock(spec=Gdk.EventButton)
+        event.x = keyframe_curve._timestamp_to_x(xdata)
+        event.y = keyframe_curve._value_to_y(ydata)
+        event.get_button.return_value = (True, 1)
+        return event
+
+    def test_decimate(self):
+        """Checks the dense curves are reduced to four points per column."""
+        points = [(0.1, 5), (0.2, 1), (0.5, 9), (0.7, 4), (0.9, 6), (1.5, 2)]
+        self.assertEqual(decimate(points),
+                         [(0.1, 5), (0.2, 1), (0.5, 9), (0.9, 6), (1.5, 2)])
+
+        points = [(0, 1), (0.5, 2), (1, 3), (2, 4)]
+        self.assertEqual(decimate(points), points)
+
+        self.assertEqual(decimate([]), [])
+
     def test_no_clip_selected(self):
         """Checks nothing happens when no clip is selected."""
         timeline_container = common.create_timeline_container()
@@ -19,6 +19,7 @@
 from unittest import mock
 
 from gi.repository import GES
+from gi.repository import Gst
 
 from pitivi.timeline.layer import Layer
 from tests import common
@@ -64,3 +65,41 @@ class TestLayer(common.TestCase):
         # height of layer.control_ui, which now it should not be set.
         self.assertFalse(hasattr(ges_layer, "control_ui"))
         unused_layer = Layer(ges_layer, timeline)
+
+    def test_viewport(self):
+        timeline_container = common.create_timeline_container()
+        timeline = timeline_container.timeline
+        ges_layer = timeline.ges_timeline.append_layer()
+        asset = GES.UriClipAsset.request_sync(
+            common.get_sample_uri("tears_of_steel.webm"))
+        near_clip = ges_layer.add_asset(asset, 0, 0, Gst.SECOND, GES.TrackType.UNKNOWN)
+        far_clip = ges_layer.add_asset(asset, 1000 * Gst.SECOND, 0, Gst.SECOND,
+                                       GES.TrackType.UNKNOWN)
+        # All the clips are shown until the timeline is allocated.
+        self.assertTrue(near_clip.ui.in_viewport)
+        self.assertTrue(far_clip.ui.in_viewport)
+
+        timeline.vadj.props.upper = 1000
+        timeline.vadj.props.page_size = 1000
+        timeline.hadj.props.upper = timeline.nsToPixel(2000 * Gst.SECOND)
+        timeline.hadj.props.page_size = 100
+        timeline.hadj.props.value = 0
+        ges_layer.ui.update_viewport()
+        self.assertTrue(near_clip.ui.in_viewport)
+        self.assertFalse(far_clip.ui.in_viewport)
+        self.assertFalse(far_clip.ui.get_visible())
+
+        timeline.hadj.props.value = timeline.nsToPixel(1000 * Gst.SECOND)
+        ges_layer.ui.update_viewport()
+        self.assertFalse(near_clip.ui.in_viewport)
+        self.assertTrue(far_clip.ui.in_viewport)
+        self.assertTrue(far_clip.ui.get_visible())
+
+        # Clips added far from the viewport are not shown.
+        other_clip = ges_layer.add_asset(asset, 0, 0, Gst.SECOND, GES.TrackType.UNKNOWN)
+        self.assertFalse(other_clip.ui.in_viewport)
+
+        # Clips moved close to the viewport are shown.
+        other_clip.set_start(999 * Gst.SECOND)
+        self.assertTrue(other_clip.ui.in_viewport)
+        self.assertTrue(other_clip.ui.get_visible())
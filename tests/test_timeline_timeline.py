@@ -23,6 +23,7 @@ from gi.repository import GES
 from gi.repository import Gst
 from gi.repository import Gtk
 
+from pitivi.timeline.timeline import Timeline
 from pitivi.utils.timeline import UNSELECT
 from pitivi.utils.ui import LAYER_HEIGHT
 from pitivi.utils.ui import SEPARATOR_HEIGHT
@@ -53,6 +54,30 @@ class BaseTestTimeline(common.TestCase):
         return clips
 
 
+class TestLayersLayout(BaseTestTimeline):
+    """Tests for the LayersLayout class."""
+
+    def test_playhead_damage(self):
+        timeline_container = create_timeline_container()
+        layout = timeline_container.timeline.layout
+        with mock.patch.object(layout, "queue_draw") as queue_draw, \
+                mock.patch.object(layout, "queue_draw_area") as queue_draw_area:
+            layout.playhead_position = Gst.SECOND
+            self.assertFalse(queue_draw.called)
+            # The old and the new playhead columns are redrawn.
+            self.assertEqual(queue_draw_area.call_count, 2)
+            x = queue_draw_area.call_args[0][0]
+            self.assertLessEqual(x, layout.nsToPixel(Gst.SECOND))
+
+            queue_draw_area.reset_mock()
+            layout.playhead_position = Gst.SECOND
+            self.assertFalse(queue_draw_area.called)
+
+            layout.snap_position = Gst.SECOND
+            self.assertFalse(queue_draw.called)
+            self.assertEqual(queue_draw_area.call_count, 2)
+
+
 class TestLayers(BaseTestTimeline):
     """Tests for the layers."""
 
@@ -145,6 +170,22 @@ class TestLayers(BaseTestTimeline):
         assertLayerAt(ges_layers[expectations[14]], h[0] + s + h[1] + s + h[2] / 2)
         assertLayerAt(ges_layers[expectations[15]], h[0] + s + h[1] + s + h[2] - 1)
 
+    def test_get_layer_at_cached(self):
+        timeline_container = create_timeline_container()
+        timeline = timeline_container.timeline
+        ges_layer = timeline.create_layer(priority=0)
+        timeline._get_layer_at(0)
+
+        with mock.patch.object(ges_layer.ui, "get_allocation") as get_allocation:
+            get_allocation.return_value = Gdk.Rectangle()
+            timeline._get_layer_at(0)
+            self.assertFalse(get_allocation.called)
+
+            # Adding a layer invalidates the cached positions.
+            timeline.create_layer(priority=1)
+            timeline._get_layer_at(0)
+            self.assertTrue(get_allocation.called)
+
     def testSetSeparatorsPrelight(self):
         timeline_container = create_timeline_container()
         timeline = timeline_container.timeline
@@ -606,6 +647,102 @@ class TestEditing(BaseTestTimeline):
         self.assertEqual(len(timeline.ges_timeline.get_layers()), 1,
                          "No new layer should have been created")
 
+    def test_drag_motion_compression(self):
+        """Checks only the latest pointer position is applied per frame."""
+        timeline_container = create_timeline_container()
+        timeline = timeline_container.timeline
+        clip, = self.addClipsSimple(timeline, 1)
+
+        with mock.patch.object(Gtk, "get_event_widget") as get_event_widget:
+            event = mock.Mock()
+            event.x = 0
+            event.get_button.return_value = True, 1
+            get_event_widget.return_value = clip.ui
+            timeline._button_press_event_cb(None, event)
+        self.assertIsNotNone(timeline.draggingElement)
+
+        with mock.patch.object(timeline, "get_mapped", return_value=True), \
+                mock.patch.object(timeline, "add_tick_callback", return_value=1) as add_tick_callback, \
+                mock.patch.object(Gtk, "get_event_widget") as get_event_widget:
+            get_event_widget.return_value = clip.ui
+            for x in (10, 20, 30):
+                event = mock.Mock()
+                event.x = x
+                event.get_state.return_value = Gdk.ModifierType.BUTTON1_MASK
+                with mock.patch.object(clip.ui, "translate_coordinates") as translate_coordinates:
+                    translate_coordinates.return_value = (x, 0)
+                    timeline._motion_notify_event_cb(None, event)
+            self.assertEqual(add_tick_callback.call_count, 1)
+            self.assertIsNone(timeline.editing_context)
+
+            tick_cb = add_tick_callback.call_args[0][0]
+            frame_clock = mock.Mock()
+            frame_clock.get_frame_time.return_value = 0
+            with mock.patch.object(timeline, "_get_layer_at") as _get_layer_at:
+                _get_layer_at.return_value = clip.get_layer(), []
+                self.assertFalse(tick_cb(timeline, frame_clock))
+            self.assertEqual(timeline.editing_context.new_position,
+                             timeline.pixelToNs(30))
+
+    def test_autoscroll_speed(self):
+        """Checks the autoscroll speed depends on the distance to the edges."""
+        # pylint: disable=no-member
+        get_autoscroll_speed = Timeline._Timeline__get_autoscroll_speed
+        self.assertEqual(get_autoscroll_speed(500, 1000), 0)
+        self.assertLess(get_autoscroll_speed(10, 1000), 0)
+        self.assertGreater(get_autoscroll_speed(990, 1000), 0)
+        self.assertLess(get_autoscroll_speed(10, 1000), get_autoscroll_speed(30, 1000))
+        self.assertEqual(get_autoscroll_speed(-500, 1000), get_autoscroll_speed(-1000, 1000))
+
+    def test_zoom_scroll_coalesced(self):
+        """Checks zooming with the wheel keeps the time under the cursor."""
+        timeline_container = create_timeline_container()
+        timeline = timeline_container.timeline
+        event = mock.Mock()
+        event.get_scroll_deltas.return_value = (True, 0, -1)
+        event.get_state.return_value = Gdk.ModifierType.CONTROL_MASK
+        event_widget = mock.Mock()
+        event_widget.translate_coordinates.return_value = (100, 0)
+        position = timeline.pixelToNs(100)
+
+        with mock.patch.object(Gtk, "get_event_widget") as get_event_widget, \
+                mock.patch.object(timeline, "hadj") as hadj, \
+                mock.patch.object(timeline.layout, "zoomChanged") as zoom_changed:
+            get_event_widget.return_value = event_widget
+            timeline.do_scroll_event(event)
+            timeline.do_scroll_event(event)
+            # The widgets are updated once for all the zoom steps.
+            self.assertFalse(zoom_changed.called)
+            self.assertFalse(hadj.set_value.called)
+
+            common.create_main_loop().run(until_empty=True)
+        zoom_changed.assert_called_once_with()
+        hadj.set_value.assert_called_once_with(timeline.nsToPixel(position) - 100)
+
+    def test_position_updates_batched(self):
+        """Checks the clips moved by an edit are updated once per frame."""
+        timeline_container = create_timeline_container()
+        timeline = timeline_container.timeline
+        ges_layer = timeline.ges_timeline.append_layer()
+        ges_clip1 = self.add_clip(ges_layer, 0)
+        ges_clip2 = self.add_clip(ges_layer, 10)
+
+        with mock.patch.object(timeline, "get_mapped", return_value=True), \
+                mock.patch.object(timeline, "add_tick_callback", return_value=1) as add_tick_callback, \
+                mock.patch.object(ges_clip1.ui, "updatePosition") as update_position1, \
+                mock.patch.object(ges_clip2.ui, "updatePosition") as update_position2:
+            ges_clip2.props.start = 200
+            ges_clip1.props.start = 100
+            ges_clip1.props.duration = 20
+            self.assertEqual(add_tick_callback.call_count, 1)
+            update_position1.assert_not_called()
+            update_position2.assert_not_called()
+
+            tick_cb = add_tick_callback.call_args[0][0]
+            tick_cb(timeline, None)
+            update_position1.assert_called_once_with()
+            update_position2.assert_called_once_with()
+
 
 class TestShiftSelection(BaseTestTimeline):
 
@@ -138,6 +138,83 @@ class TestUndoableActionLog(common.TestCase):
         self.log.redo()
         self.assertFalse(self.log.dirty())
 
+    def test_dirty_after_trim(self):
+        self.log.max_depth = 1
+        with self.log.started("one"):
+            self.log.push(mock.Mock(spec=UndoableAction))
+        with self.log.started("two"):
+            self.log.push(mock.Mock(spec=UndoableAction))
+        self.assertEqual(len(self.log.undo_stacks), 1)
+        self.assertTrue(self.log.dirty())
+
+        self.log.undo()
+        # The first operation has been forgotten but not undone.
+        self.assertTrue(self.log.dirty())
+
+    def test_max_depth(self):
+        self.log.max_depth = 2
+        for name in ("one", "two", "three"):
+            with self.log.started(name):
+                self.log.push(mock.Mock(spec=UndoableAction))
+        self.assertEqual([stack.action_group_name for stack in self.log.undo_stacks],
+                         ["two", "three"])
+
+    def test_max_bytes(self):
+        for name in ("one", "two", "three"):
+            with self.log.started(name):
+                self.log.push(mock.Mock(spec=UndoableAction))
+        stack_size = self.log.undo_stacks[-1].size()
+        self.assertEqual(self.log.history_size,
+                         sum(stack.size() for stack in self.log.undo_stacks))
+
+        self.log.max_bytes = stack_size
+        with self.log.started("four"):
+            self.log.push(mock.Mock(spec=UndoableAction))
+        # The latest operation is always kept.
+        self.assertEqual([stack.action_group_name for stack in self.log.undo_stacks],
+                         ["four"])
+        self.assertEqual(self.log.history_size, self.log.undo_stacks[0].size())
+
+        self.log.undo()
+        self.assertEqual(self.log.history_size, self.log.redo_stacks[0].size())
+        with self.log.started("five"):
+            self.log.push(mock.Mock(spec=UndoableAction))
+        self.assertEqual(self.log.history_size, self.log.undo_stacks[0].size())
+
+    def test_coalesce(self):
+        self.log.coalesce_interval = 10
+        clip = GES.TitleClip()
+        for start in (1, 2, 3):
+            with self.log.started("move"):
+                self.log.push(PropertyChangedAction(clip, "start", start - 1, start))
+        self.assertEqual(len(self.log.undo_stacks), 1)
+        action, = self.log.undo_stacks[0].done_actions
+        self.assertEqual(action.old_value, 0)
+        self.assertEqual(action.new_value, 3)
+
+        # Changing a different property creates a new operation.
+        with self.log.started("move"):
+            self.log.push(PropertyChangedAction(clip, "duration", 10, 20))
+        self.assertEqual(len(self.log.undo_stacks), 2)
+
+        # An undone operation is never expanded.
+        self.log.undo()
+        self.log.checkpoint()
+        with self.log.started("move"):
+            self.log.push(PropertyChangedAction(clip, "start", 0, 4))
+        self.assertEqual(len(self.log.undo_stacks), 2)
+        with self.log.started("move"):
+            self.log.push(PropertyChangedAction(clip, "start", 4, 5))
+        self.assertEqual(len(self.log.undo_stacks), 2)
+        self.assertTrue(self.log.dirty())
+
+    def test_coalesce_disabled(self):
+        clip = GES.TitleClip()
+        for start in (1, 2):
+            with self.log.started("move"):
+                self.log.push(PropertyChangedAction(clip, "start", start - 1, start))
+        self.assertEqual(len(self.log.undo_stacks), 2)
+
     def testCommit(self):
         """
         Commit a stack.
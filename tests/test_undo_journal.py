@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Tests for the pitivi.undo.journal module."""
+# pylint: disable=missing-docstring
+import os
+import tempfile
+from unittest import mock
+
+from gi.repository import GES
+from gi.repository import Gst
+
+from pitivi.undo.journal import create_recovery_scenario
+from pitivi.undo.journal import read_journal
+from pitivi.undo.journal import UndoJournal
+from pitivi.undo.undo import PropertyChangedAction
+from pitivi.undo.undo import UndoableAction
+from pitivi.undo.undo import UndoableActionLog
+from tests import common
+
+
+class TestUndoJournal(common.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.action_log = UndoableActionLog()
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_path = os.path.join(self.temp_dir, "project.xges")
+        with open(self.project_path, "w") as project:
+            project.write("<ges>\n</ges>\n")
+        self.project_uri = Gst.filename_to_uri(self.project_path)
+        self.journal = UndoJournal(self.project_path + ".journal~", self.action_log)
+        self.journal.reset(self.project_uri)
+
+    def tearDown(self):
+        self.journal.release()
+        super().tearDown()
+
+    def do_operation(self, name, *action_names):
+        with self.action_log.started(name):
+            self.action_log.push(mock.Mock(spec=UndoableAction))
+            for action_name in action_names:
+                self.journal.record(Gst.Structure.new_empty(action_name))
+
+    def test_commit(self):
+        # Actions done outside of an operation are ignored.
+        self.journal.record(Gst.Structure.new_empty("seek"))
+        self.do_operation("add clip", "add-clip", "edit-container")
+        self.do_operation("remove clip", "remove-clip")
+
+        base_uri, actions = read_journal(self.journal.path)
+        self.assertEqual(base_uri, self.project_uri)
+        self.assertEqual(actions, ["add-clip;", "edit-container;", "remove-clip;"])
+        self.assertEqual(self.journal.entries, 2)
+        self.assertTrue(self.journal.complete)
+
+    def test_rollback(self):
+        self.action_log.begin("add clip")
+        self.journal.record(Gst.Structure.new_empty("add-clip"))
+        self.action_log.rollback()
+        self.do_operation("remove clip", "remove-clip")
+
+        unused_base_uri, actions = read_journal(self.journal.path)
+        self.assertEqual(actions, ["remove-clip;"])
+
+    def test_incomplete(self):
+        self.do_operation("add clip", "add-clip")
+        self.action_log.undo()
+        self.assertFalse(self.journal.complete)
+
+        self.journal.reset(self.project_uri)
+        self.assertTrue(self.journal.complete)
+        self.do_operation("move clip")
+        self.assertFalse(self.journal.complete)
+
+    def test_reset_with_mark(self):
+        self.do_operation("add clip", "add-clip")
+        mark = self.journal.mark()
+        self.do_operation("move clip", "edit-container")
+        self.journal.reset(self.project_uri, mark)
+        self.assertTrue(self.journal.complete)
+        self.assertEqual(read_journal(self.journal.path)[1], ["edit-container;"])
+
+        # Undoing after the state is saved cannot be journaled.
+        mark = self.journal.mark()
+        self.action_log.undo()
+        self.journal.reset(self.project_uri, mark)
+        self.assertFalse(self.journal.complete)
+
+        # The saved state includes the operations done before the mark.
+        mark = self.journal.mark()
+        self.journal.reset(self.project_uri, mark)
+        self.assertTrue(self.journal.complete)
+
+    def test_unserializable_action(self):
+        clip = GES.TitleClip()
+        with self.action_log.started("move clip"):
+            self.journal.record(Gst.Structure.new_empty("edit-container"))
+            self.action_log.push(PropertyChangedAction(clip, "duration", 10, 20))
+        self.assertFalse(self.journal.complete)
+
+    def test_recovery_scenario(self):
+        scenario_path = os.path.join(self.temp_dir, "recovery.scenario")
+        self.assertFalse(create_recovery_scenario(self.journal.path, scenario_path))
+
+        self.do_operation("add clip", "add-clip")
+        self.assertTrue(create_recovery_scenario(self.journal.path, scenario_path))
+        with open(scenario_path) as scenario:
+            lines = scenario.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith("description"))
+        structure, unused_end = Gst.Structure.from_string(lines[1])
+        self.assertEqual(structure.get_name(), "load-project")
+        self.assertEqual(structure["serialized-content"], "<ges></ges>")
+        self.assertEqual(lines[2], "add-clip;")
@@ -341,6 +341,49 @@ class TestLayerObserver(BaseTestUndoTimeline):
         self.action_log.redo()
         self.assertTrue(clip1 in self.getTimelineClips())
 
+    def test_clip_observed_after_undo(self):
+        clip1 = GES.TitleClip()
+        with self.action_log.started("add clip"):
+            self.layer.add_clip(clip1)
+            clip1.props.start = 10
+        with self.action_log.started("remove clip"):
+            self.layer.remove_clip(clip1)
+
+        layer_observer = self.app.project_observer.timeline_observer.layer_observers[self.layer]
+        self.action_log.undo()
+        self.assertIn(clip1, layer_observer.clip_observers)
+        self.assertFalse(layer_observer._pending_clips)
+
+        with self.action_log.started("move clip"):
+            clip1.props.start = 20
+        stack = self.action_log.undo_stacks[-1]
+        action, = stack.done_actions
+        self.assertIsInstance(action, PropertyChangedAction)
+        self.assertEqual((action.old_value, action.new_value), (10, 20))
+
+        self.action_log.undo()
+        self.assertEqual(clip1.props.start, 10)
+        self.action_log.redo()
+        self.assertEqual(clip1.props.start, 20)
+
+    def test_move_clip_to_other_layer(self):
+        clip1 = GES.TitleClip()
+        clip1.props.duration = 10 * Gst.SECOND
+        self.layer.add_clip(clip1)
+        layer2 = self.timeline.append_layer()
+
+        with self.action_log.started("move clip"):
+            clip1.move_to_layer(layer2)
+            clip1.props.start = 20 * Gst.SECOND
+
+        self.action_log.undo()
+        self.assertEqual(clip1.props.layer, self.layer)
+        self.assertEqual(clip1.props.start, 0)
+
+        self.action_log.redo()
+        self.assertEqual(clip1.props.layer, layer2)
+        self.assertEqual(clip1.props.start, 20 * Gst.SECOND)
+
     def testRemoveClip(self):
         stacks = []
         self.action_log.connect("commit", BaseTestUndoTimeline.commit_cb, stacks)
@@ -766,6 +809,45 @@ class TestControlSourceObserver(BaseTestUndoTimeline):
         self.action_log.redo()
         self.assertEqual(0.9, control_source.get_all()[0].value)
 
+    def test_keyframe_changed_delta(self):
+        """Checks only the changed keyframes of a large curve are stored."""
+        uri = common.get_sample_uri("tears_of_steel.webm")
+        asset = GES.UriClipAsset.request_sync(uri)
+        clip = asset.extract()
+        self.layer.add_clip(clip)
+        source = clip.get_children(False)[1]
+
+        control_source = GstController.InterpolationControlSource()
+        control_source.props.mode = GstController.InterpolationMode.LINEAR
+        points = 10000
+        for i in range(points):
+            self.assertTrue(control_source.set(i * Gst.MSECOND, (i % 10) / 10))
+        source.set_control_source(control_source, "alpha", "direct")
+
+        with self.action_log.started("Move keyframe curve segment"):
+            for step in range(1, 101):
+                value = step / 100
+                self.assertTrue(control_source.set(1000 * Gst.MSECOND, value))
+                self.assertTrue(control_source.set(1001 * Gst.MSECOND, value))
+
+        stack, = self.action_log.undo_stacks
+        action, = stack.done_actions
+        self.assertEqual(action.deltas,
+                         {1000 * Gst.MSECOND: (0.0, 1.0),
+                          1001 * Gst.MSECOND: (0.1, 1.0)})
+        # The recorded operation does not depend on the number of keyframes.
+        self.assertLess(stack.size(), 10000)
+
+        self.action_log.undo()
+        values = [keyframe.value for keyframe in control_source.get_all()]
+        self.assertEqual(len(values), points)
+        self.assertEqual(values, [(i % 10) / 10 for i in range(points)])
+
+        self.action_log.redo()
+        values = [keyframe.value for keyframe in control_source.get_all()]
+        self.assertEqual(values[1000:1002], [1.0, 1.0])
+        self.assertEqual(values[999], 0.9)
+
 
 class TestTrackElementObserver(BaseTestUndoTimeline):
 
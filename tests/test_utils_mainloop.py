@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Tests for the utils.mainloop module."""
+# pylint: disable=missing-docstring,protected-access
+import time
+
+from gi.repository import GLib
+
+from pitivi.utils.mainloop import HISTOGRAM_BUCKETS
+from pitivi.utils.mainloop import LatencyHistogram
+from pitivi.utils.mainloop import MainLoopMonitor
+from tests import common
+
+
+class TestLatencyHistogram(common.TestCase):
+
+    def test_add(self):
+        histogram = LatencyHistogram()
+        histogram.add(0)
+        histogram.add(0.0015)
+        histogram.add(0.3)
+        histogram.add(60)
+
+        self.assertEqual(histogram.counts[0], 1)
+        self.assertEqual(histogram.counts[1], 1)
+        self.assertEqual(histogram.counts[HISTOGRAM_BUCKETS.index(500)], 1)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.max_latency, 60)
+        self.assertIn("> 5000 ms", histogram.format())
+
+
+class TestMainLoopMonitor(common.TestCase):
+
+    def test_stall(self):
+        monitor = MainLoopMonitor(threshold=0.1, interval=0.01)
+        mainloop = common.create_main_loop()
+
+        def blocking_cb():
+            time.sleep(0.4)
+            GLib.timeout_add(100, mainloop.quit)
+            return False
+
+        monitor.start()
+        try:
+            GLib.timeout_add(50, blocking_cb)
+            mainloop.run()
+        finally:
+            monitor.stop()
+
+        self.assertFalse(monitor.running)
+        self.assertEqual(len(monitor.stalls), 1)
+        stall = monitor.stalls[0]
+        self.assertGreaterEqual(stall.duration, 0.3)
+        self.assertIn("blocking_cb", "".join(stall.stack))
+        self.assertGreaterEqual(monitor.histogram.max_latency, 0.3)
+        self.assertIn("blocking_cb", monitor.report())
+
+        monitor.reset()
+        self.assertEqual(len(monitor.stalls), 0)
+        self.assertEqual(sum(monitor.histogram.counts), 0)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Tests for the utils.proxy module."""
+# pylint: disable=missing-docstring,protected-access
+from unittest import mock
+
+from gi.repository import Gst
+from gi.repository import GstPbutils
+
+from pitivi.utils.proxy import ProxyManager
+from tests import common
+
+
+def create_asset_mock(container_caps, audio_caps, video_caps):
+    def stream_info(spec, caps):
+        info = mock.Mock(spec=spec)
+        info.get_caps.return_value = Gst.Caps(caps)
+        return info
+
+    info = mock.Mock()
+    info.get_stream_info.return_value = stream_info(
+        GstPbutils.DiscovererContainerInfo, container_caps)
+    info.get_audio_streams.return_value = [
+        stream_info(GstPbutils.DiscovererAudioInfo, caps) for caps in audio_caps]
+    info.get_video_streams.return_value = [
+        stream_info(GstPbutils.DiscovererVideoInfo, caps) for caps in video_caps]
+
+    asset = mock.Mock()
+    asset.get_info.return_value = info
+    return asset
+
+
+class TestProxyManager(common.TestCase):
+
+    def test_whitelist_formats(self):
+        formats = ProxyManager.get_whitelist_formats()
+        self.assertEqual(len(formats),
+                         len(ProxyManager.WHITELIST_CONTAINER_CAPS) *
+                         len(ProxyManager.WHITELIST_AUDIO_CAPS) *
+                         len(ProxyManager.WHITELIST_VIDEO_CAPS) +
+                         len(ProxyManager.WHITELIST_AUDIO_CAPS))
+        self.assertIs(ProxyManager.get_whitelist_formats(), formats)
+
+    def test_well_supported_cache(self):
+        app = common.create_pitivi_mock()
+        proxy_manager = app.proxy_manager
+
+        supported = create_asset_mock("video/quicktime",
+                                      ["audio/mpeg, mpegversion=(int)4"],
+                                      ["video/x-h264, width=(int)320"])
+        unsupported = create_asset_mock("video/quicktime",
+                                        ["audio/mpeg, mpegversion=(int)4"],
+                                        ["video/x-prores"])
+        self.assertTrue(proxy_manager.isAssetFormatWellSupported(supported))
+        self.assertFalse(proxy_manager.isAssetFormatWellSupported(unsupported))
+
+        # Assets with streams of the same media types reuse the verdict.
+        other = create_asset_mock("video/quicktime",
+                                  ["audio/mpeg, mpegversion=(int)1"],
+                                  ["video/x-h264, width=(int)1920"])
+        with mock.patch.object(proxy_manager, "_assetMatchesEncodingFormat") as matches:
+            self.assertTrue(proxy_manager.isAssetFormatWellSupported(other))
+            self.assertFalse(proxy_manager.isAssetFormatWellSupported(unsupported))
+        self.assertFalse(matches.called)
+
+    def test_transcoder_error_starts_pending(self):
+        app = common.create_pitivi_mock(numTranscodingJobs=1)
+        proxy_manager = app.proxy_manager
+        failing = mock.Mock()
+        failing.props.src_uri = "file:///failing.mov"
+        pending = mock.Mock()
+        pending.props.src_uri = "file:///pending.mov"
+        proxy_manager._ProxyManager__startTranscoder(failing)
+        proxy_manager._ProxyManager__pending_transcoders.append(pending)
+        self.assertTrue(proxy_manager._ProxyManager__holding_load_sampler)
+
+        error = Exception("failed")
+        proxy_manager._ProxyManager__transcoderErrorCb(failing, error, None, mock.Mock())
+        self.assertEqual(proxy_manager._ProxyManager__running_transcoders, [pending])
+        self.assertTrue(pending.run_async.called)
+
+        proxy_manager._ProxyManager__transcoderErrorCb(pending, error, None, mock.Mock())
+        self.assertEqual(proxy_manager._ProxyManager__running_transcoders, [])
+        self.assertFalse(proxy_manager._ProxyManager__holding_load_sampler)
@@ -19,13 +19,16 @@
 from unittest import mock
 
 from gi.repository import GES
+from gi.repository import Gst
 
 from pitivi.utils.timeline import EditingContext
+from pitivi.utils.timeline import LayerClipsIndex
 from pitivi.utils.timeline import SELECT
 from pitivi.utils.timeline import SELECT_ADD
 from pitivi.utils.timeline import Selected
 from pitivi.utils.timeline import Selection
 from pitivi.utils.timeline import UNSELECT
+from pitivi.utils.timeline import Zoomable
 from tests import common
 
 
@@ -139,3 +142,97 @@ class TestEditingContext(common.TestCase):
             self.assertTrue(context.with_video)
         else:
             self.assertFalse(context.with_video)
+
+
+class ZoomableCounter(Zoomable):
+
+    def __init__(self):
+        Zoomable.__init__(self)
+        self.zoom_changes = 0
+
+    def zoomChanged(self):
+        self.zoom_changes += 1
+
+
+class TestZoomable(common.TestCase):
+    """Tests for the Zoomable class."""
+
+    def test_zoom_changes_coalesced(self):
+        zoomable = ZoomableCounter()
+        level = Zoomable.getCurrentZoomLevel()
+        Zoomable.setZoomLevel(level + 1)
+        Zoomable.setZoomLevel(level + 2)
+        # The ratio is updated immediately.
+        self.assertEqual(Zoomable.zoomratio, Zoomable.computeZoomRatio(level + 2))
+        self.assertEqual(zoomable.zoom_changes, 0)
+
+        common.create_main_loop().run(until_empty=True)
+        self.assertEqual(zoomable.zoom_changes, 1)
+
+    def test_zoom_changes_flushed(self):
+        zoomable = ZoomableCounter()
+        Zoomable.setZoomLevel(Zoomable.getCurrentZoomLevel() + 1)
+        Zoomable.flush_zoom_changed()
+        self.assertEqual(zoomable.zoom_changes, 1)
+
+        # Nothing left to notify.
+        common.create_main_loop().run(until_empty=True)
+        self.assertEqual(zoomable.zoom_changes, 1)
+        Zoomable.flush_zoom_changed()
+        self.assertEqual(zoomable.zoom_changes, 1)
+
+    def test_dead_instances_dropped(self):
+        zoomable = ZoomableCounter()
+        dead_zoomable = ZoomableCounter()
+        del dead_zoomable
+
+        Zoomable.setZoomLevel(Zoomable.getCurrentZoomLevel() + 1)
+        common.create_main_loop().run(until_empty=True)
+        self.assertEqual(zoomable.zoom_changes, 1)
+        instances = [ref() for ref in Zoomable._instances]
+        self.assertIn(zoomable, instances)
+        self.assertNotIn(None, instances)
+
+
+class TestLayerClipsIndex(common.TestCase):
+    """Tests for the LayerClipsIndex class."""
+
+    def test_queries(self):
+        ges_timeline = GES.Timeline.new_audio_video()
+        ges_layer = ges_timeline.append_layer()
+        asset = GES.UriClipAsset.request_sync(
+            common.get_sample_uri("tears_of_steel.webm"))
+        clip1 = ges_layer.add_asset(asset, 0, 0, Gst.SECOND, GES.TrackType.UNKNOWN)
+        index = LayerClipsIndex(ges_layer)
+        clip2 = ges_layer.add_asset(asset, 10 * Gst.SECOND, 0, Gst.SECOND,
+                                    GES.TrackType.UNKNOWN)
+        self.assertEqual(len(index), 2)
+
+        self.assertEqual(index.get_clips_at(0), [clip1])
+        self.assertEqual(index.get_clips_at(Gst.SECOND), [clip1])
+        self.assertEqual(index.get_clips_at(5 * Gst.SECOND), [])
+        self.assertEqual(index.get_clips_in_interval(0, 20 * Gst.SECOND), [clip1, clip2])
+        self.assertEqual(index.get_clips_in_interval(2 * Gst.SECOND, 9 * Gst.SECOND), [])
+        for start, end in ((0, Gst.SECOND), (Gst.SECOND // 2, 11 * Gst.SECOND),
+                           (Gst.SECOND, 10 * Gst.SECOND)):
+            self.assertEqual(index.get_clips_in_interval(start, end),
+                             ges_layer.get_clips_in_interval(start, end))
+
+        # Moving a clip updates the index.
+        clip1.props.start = 20 * Gst.SECOND
+        clip2.props.start = 0
+        self.assertEqual(index.get_clips_at(0), [clip2])
+        self.assertEqual(index.get_clips_at(20 * Gst.SECOND), [clip1])
+
+        # Growing a clip updates the index.
+        clip2.props.duration = 2 * Gst.SECOND
+        self.assertEqual(index.get_clips_at(2 * Gst.SECOND), [clip2])
+        clip2.props.duration = Gst.SECOND // 2
+        self.assertEqual(index.get_clips_at(2 * Gst.SECOND), [])
+
+        ges_layer.remove_clip(clip2)
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.get_clips_at(0), [])
+
+        index.release()
+        self.assertEqual(len(index), 0)
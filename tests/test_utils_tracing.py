@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Pitivi video editor
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin St, Fifth Floor,
+# Boston, MA 02110-1301, USA.
+"""Tests for the utils.tracing module."""
+# pylint: disable=missing-docstring,protected-access
+import json
+import os
+import tempfile
+
+from pitivi.utils import tracing
+from tests import common
+
+
+class TestTracing(common.TestCase):
+
+    def setUp(self):
+        tracing.clear()
+
+    def tearDown(self):
+        tracing.disable()
+        tracing.clear()
+
+    def test_disabled(self):
+        self.assertFalse(tracing.is_enabled())
+        with tracing.span("save-project"):
+            pass
+        trace_span = tracing.begin("commit")
+        self.assertIsNone(trace_span)
+        tracing.end(trace_span)
+        self.assertEqual(tracing.get_events(), [])
+
+    def test_span(self):
+        tracing.enable()
+        with tracing.span("undo", action_group="move"):
+            pass
+
+        events = tracing.get_events()
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["name"], "undo")
+        self.assertEqual(events[0]["ph"], "X")
+        self.assertEqual(events[0]["args"], {"action_group": "move"})
+        self.assertGreaterEqual(events[0]["dur"], 0)
+
+    def test_begin_end(self):
+        tracing.enable()
+        span1 = tracing.begin("asset-discovery", uri="file:///a")
+        span2 = tracing.begin("asset-discovery", uri="file:///b")
+        tracing.end(span2)
+        tracing.end(span1, failed=True)
+
+        events = tracing.get_events()
+        self.assertEqual([event["ph"] for event in events], ["b", "b", "e", "e"])
+        self.assertEqual(events[0]["id"], events[3]["id"])
+        self.assertEqual(events[1]["id"], events[2]["id"])
+        self.assertNotEqual(events[0]["id"], events[1]["id"])
+        self.assertEqual(events[3]["args"], {"failed": True})
+        self.assertLessEqual(events[0]["ts"], events[3]["ts"])
+
+    def test_export(self):
+        tracing.enable()
+        with tracing.span("save-project", uri="file:///project.xges"):
+            pass
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "trace.json")
+            tracing.export(path)
+            with open(path) as trace_file:
+                trace = json.load(trace_file)
+
+        self.assertEqual(len(trace["traceEvents"]), 1)
+        self.assertEqual(trace["traceEvents"][0]["args"]["uri"], "file:///project.xges")